@@ -48,7 +48,6 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
-    "debug_toolbar",
     "rest_framework",
     "rest_framework_simplejwt",
     "rest_framework_simplejwt.token_blacklist",
@@ -57,8 +56,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "user.metrics.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -68,6 +67,15 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# The toolbar's middleware is sync only, under ASGI it would serialize
+# every request through a single thread.
+if DEBUG:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+        "debug_toolbar.middleware.DebugToolbarMiddleware",
+    )
+
 ROOT_URLCONF = "StarNavi_test_task.urls"
 
 TEMPLATES = [
@@ -95,7 +103,7 @@ WSGI_APPLICATION = "StarNavi_test_task.wsgi.application"
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": os.environ.get("DJANGO_DB_PATH") or BASE_DIR / "db.sqlite3",
     }
 }
 
@@ -141,6 +149,19 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 MEDIA_URL = "/media/"
 
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+    # Post images are deduplicated by content.
+    "post_images": {
+        "BACKEND": "user.storage.ContentAddressedStorage",
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -148,21 +169,139 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "user.throttling.AnonCounterThrottle",
+        "user.throttling.UserCounterThrottle",
+        "user.throttling.ScopedCounterThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "100/day", "user": "1000/day"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": "100/day",
+        "user": "1000/day",
+        "reactions": "300/hour",
+        "token": "10/min",
+        "export": "100/hour",
+    },
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+THROTTLING = {
+    "ENABLED": os.environ.get("DJANGO_THROTTLING", "") != "False",
+    "PATH": os.environ.get("DJANGO_THROTTLE_PATH") or None,
+    "TIMEOUT": 0.5,
+}
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": True,
     "UPDATE_LAST_LOGIN": True,
+    "TOKEN_OBTAIN_SERIALIZER": (
+        "user.serializers.ClaimsTokenObtainPairSerializer"
+    ),
+    "TOKEN_REFRESH_SERIALIZER": (
+        "user.serializers.CachedBlacklistTokenRefreshSerializer"
+    ),
+}
+
+TOKEN_BLACKLIST = {
+    "BLOOM_CAPACITY": 100_000,
+    "BLOOM_ERROR_RATE": 0.001,
+    "LRU_SIZE": 10_000,
+    "REFRESH_INTERVAL": 5,
+}
+
+STATELESS_JWT = {
+    "STATUS_CACHE_TTL": 60,
+}
+
+ACTIVITY_TRACKING = {
+    "FLUSH_INTERVAL": 30,
+    "FLUSH_THRESHOLD": 100,
+    "GRANULARITY": 60,
+    "BATCH_SIZE": 500,
+}
+
+LIKE_ROLLUP_DIMENSIONS = ("post", "author")
+
+SEARCH_BACKEND = "user.search.SQLiteFTS5Backend"
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "responses": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "responses",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 5000, "CULL_FREQUENCY": 4},
+    },
+}
+
+RESPONSE_CACHE = {
+    "ALIAS": "responses",
+    "ENABLED": True,
+    "TIMEOUT": 300,
+}
+
+JOB_QUEUE = {
+    "HANDLERS": {
+        "post.thumbnails": "user.thumbnails.generate_thumbnails",
+        "feed.fanout": "user.feed.fan_out",
+        "feed.catch_up": "user.feed.catch_up",
+    },
+    "PROCESSES": 2,
+    "BATCH_SIZE": 20,
+    "POLL_INTERVAL": 1,
+    "MAX_ATTEMPTS": 3,
+}
+
+FEED = {
+    "FANOUT_LIMIT": 10_000,
+    "BATCH_SIZE": 1000,
+    "BACKFILL": 50,
+}
+
+ANALYTICS = {
+    "DEFAULT_DAYS": 90,
+    "MAX_DAYS": 3660,
+}
+
+EXPORTS = {
+    "CHUNK_SIZE": 2000,
+}
+
+REACTIONS = {
+    "BULK_MAX_ITEMS": 500,
+}
+
+THUMBNAILS = {
+    "SIZES": {"small": 320, "medium": 1080},
+}
+
+METRICS = {
+    "ENABLED": True,
+    "SERVER_TIMING": DEBUG,
+    "SLOW_REQUEST_MS": 500,
+    "SLOW_QUERY_LIMIT": 10,
+    "ALLOWED_IPS": ("127.0.0.1",),
+}
+
+MEDIA_SERVING = {
+    "SERVE": True,
+    "SENDFILE": os.environ.get("DJANGO_MEDIA_SENDFILE") or None,
+    "ACCEL_REDIRECT_PREFIX": "/protected-media/",
+    "MAX_AGE": 60 * 60,
+    "IMMUTABLE_MAX_AGE": 365 * 24 * 60 * 60,
+}
+
+MEDIA_UPLOADS = {
+    "MAX_SIZE": 10 * 1024 * 1024,
+    "MAX_PIXELS": 40_000_000,
+    "FORMATS": ("JPEG", "PNG", "GIF", "WEBP"),
+    "BUFFER_SIZE": 64 * 1024,
+    "EXPIRY": 24 * 60 * 60,
 }
 
 SPECTACULAR_SETTINGS = {
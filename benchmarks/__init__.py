@@ -0,0 +1,5 @@
+"""Latency and allocation benchmarks of the API.
+
+Run them with ``python manage.py run_benchmarks``, see ``runner`` for
+the measurements and ``endpoints`` for what is measured.
+"""
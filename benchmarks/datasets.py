@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+
+from user.models import Post, Like, Dislike
+from user.seeding import insert
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+PASSWORD = "bench1234"
+
+
+def seed(rows: int, stdout, chunk_size: int = 5000) -> None:
+    """Seed ``rows`` posts with users, likes and dislikes to match.
+
+    There is one author per 20 posts, two likes and half a dislike per
+    post. Pairs are assigned arithmetically so they are unique without
+    lookups, then the counters, rollups and search index are rebuilt.
+    """
+    User = get_user_model()
+    password = make_password(PASSWORD)
+    users = max(rows // 20, 10)
+
+    user_ids = insert(
+        User,
+        (
+            User(
+                username=f"bench_{index}",
+                email=f"bench_{index}@bench.com",
+                first_name=f"first_{index}",
+                last_name=f"last_{index}",
+                password=password,
+            )
+            for index in range(users)
+        ),
+        chunk_size,
+        stdout,
+    )
+    post_ids = insert(
+        Post,
+        (
+            Post(text=f"post {index}", user_id=user_ids[index % users])
+            for index in range(rows)
+        ),
+        chunk_size,
+        stdout,
+    )
+
+    def pairs(count: int, offset: int):
+        for index in range(count):
+            post = post_ids[index % rows]
+            user = user_ids[(index % rows + index // rows + offset) % users]
+            yield post, user
+
+    insert(
+        Like,
+        (Like(post_id=p, user_id=u) for p, u in pairs(rows * 2, 0)),
+        chunk_size,
+        stdout,
+    )
+    insert(
+        Dislike,
+        (Dislike(post_id=p, user_id=u) for p, u in pairs(rows // 2, 2)),
+        chunk_size,
+        stdout,
+    )
+
+    call_command(
+        "reconcile_post_counters", chunk_size=chunk_size, stdout=stdout
+    )
+    call_command("backfill_like_rollups", batch_size=chunk_size, stdout=stdout)
+    call_command("rebuild_search_index", batch_size=chunk_size, stdout=stdout)
@@ -0,0 +1,147 @@
+from typing import NamedTuple
+
+from user.serializers import (
+    LikeListSerializer,
+    PostDetailSerializer,
+    PostListSerializer,
+    UserListSerializer,
+)
+
+
+class Endpoint(NamedTuple):
+    """A request of the benchmark.
+
+    ``args`` and ``data`` values naming a fixture of ``runner.Fixtures``
+    (``post``, ``fresh_post``, ``fresh_reactions``, ``user``,
+    ``fresh_author``, ``upload``, ``refresh``) are replaced before every
+    request, ``{n}`` by a counter.
+    """
+
+    url_name: str
+    method: str = "get"
+    args: tuple = ()
+    params: dict = {}
+    data: dict = {}
+    authenticated: bool = False
+
+
+ENDPOINTS = {
+    "user list": Endpoint("user:user-list"),
+    "user search": Endpoint("user:user-list", params={"q": "bench_1"}),
+    "user detail": Endpoint("user:user-detail", args=("user",)),
+    "profile": Endpoint("user:manage", authenticated=True),
+    "register": Endpoint(
+        "user:create",
+        method="post",
+        data={
+            "username": "new_{n}",
+            "email": "new_{n}@bench.com",
+            "password": "bench1234",
+            "first_name": "new",
+            "last_name": "user",
+        },
+    ),
+    "token": Endpoint(
+        "user:token_obtain_pair",
+        method="post",
+        data={"username": "bench_0", "password": "bench1234"},
+    ),
+    "token refresh": Endpoint(
+        "user:token_refresh", method="post", data={"refresh": "refresh"}
+    ),
+    "logout": Endpoint(
+        "user:logout",
+        method="post",
+        data={"refresh_token": "refresh"},
+        authenticated=True,
+    ),
+    "post list": Endpoint("user:post-list"),
+    "post list page 100": Endpoint("user:post-list", params={"page": 100}),
+    "post list by cursor": Endpoint(
+        "user:post-list", params={"pagination": "cursor"}
+    ),
+    "post list by author": Endpoint(
+        "user:post-list", params={"username": "bench_1"}
+    ),
+    "post search": Endpoint("user:post-list", params={"q": "post 12"}),
+    "post detail": Endpoint("user:post-detail", args=("post",)),
+    "post create": Endpoint(
+        "user:post-list",
+        method="post",
+        data={"text": "post {n}"},
+        authenticated=True,
+    ),
+    "post like": Endpoint(
+        "user:post-like",
+        method="post",
+        args=("fresh_post",),
+        authenticated=True,
+    ),
+    "post dislike": Endpoint(
+        "user:post-dislike",
+        method="post",
+        args=("fresh_post",),
+        authenticated=True,
+    ),
+    "bulk reactions": Endpoint(
+        "user:post-bulk-reactions",
+        method="post",
+        data={"reactions": "fresh_reactions"},
+        authenticated=True,
+    ),
+    "follow": Endpoint(
+        "user:user-follow",
+        method="post",
+        args=("fresh_author",),
+        authenticated=True,
+    ),
+    "feed": Endpoint("user:feed", authenticated=True),
+    "like list": Endpoint("user:like", authenticated=True),
+    "analytics": Endpoint("user:analytics", authenticated=True),
+    "analytics dashboard": Endpoint(
+        "user:analytics",
+        params={"metrics": "likes,dislikes,posts,users"},
+        authenticated=True,
+    ),
+    "analytics hourly": Endpoint(
+        "user:analytics",
+        params={"interval": "hour", "group_by": "author"},
+        authenticated=True,
+    ),
+    "activity": Endpoint("user:activity", authenticated=True),
+    "export": Endpoint("user:export", args=("likes",), authenticated=True),
+    "upload start": Endpoint(
+        "user:upload",
+        method="post",
+        data={"filename": "photo.png", "size": 1000},
+        authenticated=True,
+    ),
+    "upload offset": Endpoint(
+        "user:upload-chunk", args=("upload",), authenticated=True
+    ),
+    "async post list": Endpoint("user:async-post-list"),
+    "async post detail": Endpoint("user:async-post-detail", args=("post",)),
+    "async post like": Endpoint(
+        "user:async-post-like",
+        method="post",
+        args=("fresh_post",),
+        authenticated=True,
+    ),
+    "async post dislike": Endpoint(
+        "user:async-post-dislike",
+        method="post",
+        args=("fresh_post",),
+        authenticated=True,
+    ),
+    "async analytics": Endpoint("user:async-analytics", authenticated=True),
+    "async activity": Endpoint("user:async-activity", authenticated=True),
+}
+
+# Serializer, number of rows and the queryset they are rendered from.
+SERIALIZERS = {
+    "post list x20": (PostListSerializer, 20, "posts"),
+    "post list x100": (PostListSerializer, 100, "posts"),
+    "post detail": (PostDetailSerializer, 1, "posts"),
+    "user list x100": (UserListSerializer, 100, "users"),
+    "like list x100": (LikeListSerializer, 100, "likes"),
+}
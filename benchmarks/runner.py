@@ -0,0 +1,257 @@
+import itertools
+import statistics
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+
+from benchmarks.endpoints import ENDPOINTS, SERIALIZERS
+from user.feed import follow_author
+from user.models import Post, Like, ImageUpload
+from user.serializers import ClaimsTokenObtainPairSerializer
+from user.throttling import counter_store
+
+# Metrics compared against a baseline, latency percentiles above p50 are
+# too noisy for a fixed threshold.
+COMPARED_METRICS = ("p50_ms", "peak_kb")
+# Authors in the runner's feed, their recent posts are backfilled.
+FOLLOWED_AUTHORS = 50
+# Items of a bulk reaction request.
+BULK_REACTIONS = 100
+
+
+def summarize(latencies: list, peaks: list) -> dict:
+    quantiles = statistics.quantiles(latencies, n=100)
+
+    return {
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(quantiles[94] * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "peak_kb": round(statistics.median(peaks) / 1024, 1),
+    }
+
+
+def measure(prepare, iterations: int, warmup: int) -> dict:
+    """Time ``prepare()()`` and record its allocations.
+
+    ``prepare`` returns the call to measure, so fixtures it creates are
+    neither timed nor traced. Allocations are traced in a second pass,
+    tracemalloc slows everything down.
+    """
+    for _ in range(warmup):
+        prepare()()
+
+    latencies = []
+    for _ in range(iterations):
+        call = prepare()
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(min(iterations, 20)):
+            call = prepare()
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            call()
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+
+    return summarize(latencies, peaks)
+
+
+class Fixtures:
+    """Objects the endpoints refer to, created outside of the timings"""
+
+    def __init__(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            username="bench_runner",
+            email="runner@bench.com",
+            password="bench1234",
+        )
+        self.counter = itertools.count()
+        self.last_post = 0
+        self.last_author = 0
+        for _ in range(FOLLOWED_AUTHORS):
+            follow_author(self.user.pk, self.resolve("fresh_author"))
+
+    def resolve(self, value):
+        if value == "user":
+            return self.user.pk
+        if value == "post":
+            return Post.objects.order_by("pk").values_list("pk", flat=True)[0]
+        if value == "fresh_post":
+            # The runner has no reactions yet, every post is fresh once.
+            self.last_post = (
+                Post.objects.filter(pk__gt=self.last_post)
+                .order_by("pk")
+                .values_list("pk", flat=True)[0]
+            )
+            return self.last_post
+        if value == "fresh_reactions":
+            post_ids = list(
+                Post.objects.filter(pk__gt=self.last_post)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:BULK_REACTIONS]
+            )
+            self.last_post = post_ids[-1]
+            return [
+                {"post_id": post_id, "reaction": "like"}
+                for post_id in post_ids
+            ]
+        if value == "fresh_author":
+            self.last_author = (
+                get_user_model()
+                .objects.filter(
+                    username__startswith="bench_", pk__gt=self.last_author
+                )
+                .exclude(pk=self.user.pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[0]
+            )
+            return self.last_author
+        if value == "upload":
+            return ImageUpload.objects.create(
+                user=self.user, filename="photo.png", size=1000
+            ).pk
+        if value == "refresh":
+            return str(ClaimsTokenObtainPairSerializer.get_token(self.user))
+        if isinstance(value, str):
+            return value.format(n=next(self.counter))
+
+        return value
+
+    def reset_throttles(self) -> None:
+        # Only ever the runner's own store, see run_endpoints().
+        counter_store.clear()
+
+
+def endpoint_call(fixtures: Fixtures, endpoint):
+    client = APIClient()
+    if endpoint.authenticated:
+        token = ClaimsTokenObtainPairSerializer.get_token(fixtures.user)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token.access_token}")
+
+    def prepare():
+        fixtures.reset_throttles()
+        url = reverse(
+            endpoint.url_name,
+            args=[fixtures.resolve(arg) for arg in endpoint.args],
+        )
+        data = {
+            key: fixtures.resolve(value)
+            for key, value in endpoint.data.items()
+        }
+
+        def call():
+            if endpoint.method == "get":
+                response = client.get(url, endpoint.params)
+            else:
+                response = getattr(client, endpoint.method)(
+                    url, data, format="json"
+                )
+            if response.streaming:
+                b"".join(response.streaming_content)
+            if response.status_code >= 400:
+                raise RuntimeError(
+                    f"{endpoint.url_name} returned {response.status_code}"
+                )
+
+        return call
+
+    return prepare
+
+
+def run_endpoints(iterations: int, warmup: int, names=None) -> dict:
+    """Measure ``ENDPOINTS``, counting throttles in a store of their own.
+
+    The runner resets its counts before every request, the store of the
+    servers sharing the database is left alone.
+    """
+    with override_settings(
+        THROTTLING={**settings.THROTTLING, "PATH": ":memory:"}
+    ):
+        fixtures = Fixtures()
+        return {
+            name: measure(
+                endpoint_call(fixtures, endpoint), iterations, warmup
+            )
+            for name, endpoint in ENDPOINTS.items()
+            if not names or name in names
+        }
+
+
+def serializer_rows(source: str, count: int) -> list:
+    if source == "posts":
+        queryset = Post.objects.select_related("user")
+    elif source == "users":
+        queryset = get_user_model().objects.all()
+    else:
+        queryset = Like.objects.select_related("post", "user")
+
+    return list(queryset.order_by("-pk")[:count])
+
+
+def run_serializers(iterations: int, warmup: int, names=None) -> dict:
+    request = APIRequestFactory().get("/")
+    renderer = JSONRenderer()
+    results = {}
+
+    for name, (serializer_class, count, source) in SERIALIZERS.items():
+        if names and name not in names:
+            continue
+        rows = serializer_rows(source, count)
+        instance = rows if count > 1 else rows[0]
+
+        def prepare():
+            def call():
+                serializer = serializer_class(
+                    instance, many=count > 1, context={"request": request}
+                )
+                renderer.render(serializer.data)
+
+            return call
+
+        results[name] = measure(prepare, iterations, warmup)
+
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Metrics that grew by more than ``threshold`` over the baseline.
+
+    Returns (size, section, name, metric, baseline value, current value)
+    for every regression.
+    """
+    regressions = []
+    for size, sections in baseline.get("sizes", {}).items():
+        current_sections = results.get("sizes", {}).get(size, {})
+        for section, entries in sections.items():
+            for name, base in entries.items():
+                current = current_sections.get(section, {}).get(name)
+                if current is None:
+                    continue
+                for metric in COMPARED_METRICS:
+                    if base[metric] and current[metric] > base[metric] * (
+                        1 + threshold
+                    ):
+                        regressions.append(
+                            (
+                                size,
+                                section,
+                                name,
+                                metric,
+                                base[metric],
+                                current[metric],
+                            )
+                        )
+
+    return regressions
@@ -0,0 +1,150 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection
+from django.db.models import Case, DateTimeField, Value, When
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "FLUSH_INTERVAL": 30,
+    "FLUSH_THRESHOLD": 100,
+    "GRANULARITY": 60,
+    "BATCH_SIZE": 500,
+}
+
+
+def activity_setting(name: str):
+    return getattr(settings, "ACTIVITY_TRACKING", {}).get(name, DEFAULTS[name])
+
+
+class ActivityTracker:
+    """Write-behind buffer for ``User.last_activity``.
+
+    Requests only touch an in-process dict. Pending timestamps are written
+    in batched UPDATE statements once ``FLUSH_INTERVAL`` seconds have passed
+    or ``FLUSH_THRESHOLD`` users are dirty, a timer thread writes what is
+    left when no request comes in. A user whose stored value is younger
+    than ``GRANULARITY`` seconds is not marked dirty at all.
+
+    The stored ``last_activity`` lags by up to one flush interval. Only the
+    process holding a timestamp can read it earlier, other workers read the
+    stored value. Timestamps still pending when the process exits are lost.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: dict[int, datetime] = {}
+        self._written: dict[int, datetime] = {}
+        self._last_flush = time.monotonic()
+        self._timer = None
+
+    def touch(
+        self, user_id: int, now: datetime, stored: datetime | None = None
+    ) -> None:
+        granularity = timedelta(seconds=activity_setting("GRANULARITY"))
+
+        with self._lock:
+            known = (
+                self._pending.get(user_id)
+                or self._written.get(user_id)
+                or stored
+            )
+            if known is not None and now - known < granularity:
+                return
+            self._pending[user_id] = now
+            if self._timer is None:
+                self._timer = threading.Timer(
+                    activity_setting("FLUSH_INTERVAL"), self._flush_idle
+                )
+                self._timer.daemon = True
+                self._timer.start()
+
+        if self._should_flush():
+            self.flush()
+
+    def last_seen(self, user_id: int) -> datetime | None:
+        """Return the buffered timestamp that is not written yet, if any"""
+        with self._lock:
+            return self._pending.get(user_id)
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+
+        if pending:
+            write_last_activity(pending)
+
+        granularity = timedelta(seconds=activity_setting("GRANULARITY"))
+        with self._lock:
+            self._written.update(pending)
+            if pending:
+                horizon = max(pending.values()) - granularity
+                self._written = {
+                    user_id: seen
+                    for user_id, seen in self._written.items()
+                    if seen > horizon
+                }
+
+        return len(pending)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            self._written.clear()
+            self._last_flush = time.monotonic()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _flush_idle(self) -> None:
+        """Timer callback writing what the requests left pending"""
+        with self._lock:
+            self._timer = None
+
+        # An in-memory database is private to the connections of the
+        # requests, the next touch() flushes instead.
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            return
+
+        try:
+            self.flush()
+        except DatabaseError:
+            logger.warning("Activity flush failed", exc_info=True)
+        finally:
+            connection.close()
+
+    def _should_flush(self) -> bool:
+        with self._lock:
+            pending = len(self._pending)
+            elapsed = time.monotonic() - self._last_flush
+
+        return pending >= activity_setting(
+            "FLUSH_THRESHOLD"
+        ) or elapsed >= activity_setting("FLUSH_INTERVAL")
+
+
+def write_last_activity(timestamps: dict[int, datetime]) -> None:
+    """Write timestamps with one ``UPDATE ... SET last_activity`` per batch"""
+    user_ids = list(timestamps)
+    batch_size = activity_setting("BATCH_SIZE")
+
+    for start in range(0, len(user_ids), batch_size):
+        batch = user_ids[start : start + batch_size]
+        get_user_model().objects.filter(pk__in=batch).update(
+            last_activity=Case(
+                *[
+                    When(pk=user_id, then=Value(timestamps[user_id]))
+                    for user_id in batch
+                ],
+                output_field=DateTimeField(),
+            )
+        )
+
+
+activity_tracker = ActivityTracker()
@@ -0,0 +1,270 @@
+import datetime
+from collections import defaultdict
+from datetime import timezone as dt_timezone
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import (
+    CharField,
+    Count,
+    DateField,
+    DateTimeField,
+    F,
+    Func,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from user.models import User, Post, Like, Dislike, LikeDailyAggregate
+from user.rollups import FIRST_DAY, day_start, rollup_dimensions
+
+DEFAULTS = {
+    # Days covered when the request leaves out date_from.
+    "DEFAULT_DAYS": 90,
+    # Longest range of a request, time zone offsets are checked per day.
+    "MAX_DAYS": 3660,
+}
+
+INTERVALS = ("hour", "day", "week", "month")
+GROUPS = ("post", "author")
+
+
+class Metric(NamedTuple):
+    model: type
+    date_field: str
+    # Lookups of the post and author a row belongs to.
+    dimensions: dict
+
+
+METRICS = {
+    "likes": Metric(
+        Like, "created_at", {"post": "post_id", "author": "post__user_id"}
+    ),
+    "dislikes": Metric(
+        Dislike, "created_at", {"post": "post_id", "author": "post__user_id"}
+    ),
+    "posts": Metric(Post, "created_at", {"author": "user_id"}),
+    "users": Metric(User, "date_joined", {}),
+}
+
+
+def analytics_setting(name: str):
+    return getattr(settings, "ANALYTICS", {}).get(name, DEFAULTS[name])
+
+
+def default_range(date_from, date_to) -> tuple:
+    """Fill in the last DEFAULT_DAYS days up to today"""
+    date_to = date_to or timezone.localdate()
+    days = min(
+        analytics_setting("DEFAULT_DAYS") - 1, (date_to - FIRST_DAY).days
+    )
+    date_from = date_from or date_to - datetime.timedelta(days=days)
+
+    return date_from, date_to
+
+
+def uses_rollups(name: str, interval: str, tzinfo, filters: dict, group_by):
+    """Whether the daily like rollups can answer the request.
+
+    Rollups are kept per day of the default time zone and per post or per
+    author, never both.
+    """
+    dimensions = set(filters) | ({group_by} if group_by else set())
+
+    return (
+        name == "likes"
+        and interval != "hour"
+        and str(tzinfo) == str(timezone.get_default_timezone())
+        and len(dimensions) <= 1
+        and dimensions <= set(rollup_dimensions())
+    )
+
+
+def rollup_series(interval: str, date_from, date_to, filters, group_by):
+    dimension = group_by or next(iter(filters), None)
+    if dimension == "post":
+        queryset = LikeDailyAggregate.objects.filter(post__isnull=False)
+    elif dimension == "author":
+        queryset = LikeDailyAggregate.objects.filter(author__isnull=False)
+    else:
+        queryset = LikeDailyAggregate.objects.filter(
+            post__isnull=True, author__isnull=True
+        )
+    queryset = queryset.filter(
+        day__gte=date_from, day__lte=date_to, likes__gt=0, **filters
+    )
+
+    if interval == "day":
+        bucket = F("day")
+    else:
+        bucket = Trunc("day", interval, output_field=DateField())
+    # Ordering by the foreign keys themselves would use Post.Meta.ordering.
+    fields = ["bucket", f"{group_by}_id"] if group_by else ["bucket"]
+
+    return (
+        queryset.order_by()
+        .annotate(bucket=bucket)
+        .values_list(*fields)
+        .annotate(count=Sum("likes"))
+        .order_by(*fields)
+    )
+
+
+def utc_hour(field: str):
+    """The hour of ``field`` in UTC, truncated by the database.
+
+    SQLite's Trunc() calls back into Python for every row, its own
+    strftime() does not.
+    """
+    if connection.vendor == "sqlite":
+        return Func(
+            Value("%Y-%m-%d %H:00:00"),
+            F(field),
+            function="strftime",
+            output_field=CharField(),
+        )
+
+    return Trunc(field, "hour", tzinfo=dt_timezone.utc)
+
+
+def whole_hour_offsets(tzinfo, date_from, date_to) -> bool:
+    """Whether local buckets can be built from UTC hours"""
+    days = (date_to - date_from).days + 1
+
+    return all(
+        day_start(date_from + datetime.timedelta(days=offset), tzinfo)
+        .utcoffset()
+        .total_seconds()
+        % 3600
+        == 0
+        for offset in range(days)
+    )
+
+
+def local_bucket(hour, interval: str, tzinfo):
+    if isinstance(hour, str):
+        hour = datetime.datetime.fromisoformat(hour).replace(
+            tzinfo=dt_timezone.utc
+        )
+    local = hour.astimezone(tzinfo)
+    if interval == "hour":
+        return local
+
+    day = local.date()
+    if interval == "week":
+        return day - datetime.timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+
+    return day
+
+
+def raw_series(
+    metric: Metric,
+    interval: str,
+    tzinfo,
+    date_from,
+    date_to,
+    filters: dict,
+    group_by,
+) -> list:
+    """Count rows per bucket with a single aggregate query.
+
+    Rows are counted per UTC hour and the hours summed into local buckets,
+    unless the time zone is offset by fractions of an hour.
+    """
+    field = metric.date_field
+    queryset = metric.model.objects.filter(
+        **{
+            f"{field}__gte": day_start(date_from, tzinfo),
+            f"{field}__lt": day_start(
+                date_to + datetime.timedelta(days=1), tzinfo
+            ),
+        },
+        **{metric.dimensions[name]: value for name, value in filters.items()},
+    )
+    fields = ["bucket"]
+    if group_by:
+        fields.append(metric.dimensions[group_by])
+
+    if not whole_hour_offsets(tzinfo, date_from, date_to):
+        output_field = DateTimeField() if interval == "hour" else DateField()
+        bucket = Trunc(
+            field, interval, output_field=output_field, tzinfo=tzinfo
+        )
+        return list(
+            queryset.order_by()
+            .annotate(bucket=bucket)
+            .values_list(*fields)
+            .annotate(count=Count("pk"))
+            .order_by(*fields)
+        )
+
+    counts = defaultdict(int)
+    for hour, *group, count in (
+        queryset.order_by()
+        .annotate(bucket=utc_hour(field))
+        .values_list(*fields)
+        .annotate(count=Count("pk"))
+    ):
+        counts[(local_bucket(hour, interval, tzinfo), *group)] += count
+
+    return [(*key, count) for key, count in sorted(counts.items())]
+
+
+def bucketed_series(
+    metrics,
+    interval: str = "day",
+    tzinfo=None,
+    date_from=None,
+    date_to=None,
+    filters=None,
+    group_by=None,
+) -> dict:
+    """Count ``metrics`` per hour, day, week or month of ``tzinfo``.
+
+    ``filters`` limit the rows to a post or author and ``group_by`` splits
+    every bucket per post or author. Each metric costs one query, likes by
+    day, week or month are summed from the daily rollups. Weeks start on
+    Monday.
+    """
+    tzinfo = tzinfo or timezone.get_default_timezone()
+    date_from, date_to = default_range(date_from, date_to)
+    filters = filters or {}
+
+    series = {}
+    for name in metrics:
+        if uses_rollups(name, interval, tzinfo, filters, group_by):
+            rows = rollup_series(
+                interval, date_from, date_to, filters, group_by
+            )
+        else:
+            rows = raw_series(
+                METRICS[name],
+                interval,
+                tzinfo,
+                date_from,
+                date_to,
+                filters,
+                group_by,
+            )
+        keys = (
+            ("bucket", group_by, "count") if group_by else ("bucket", "count")
+        )
+        series[name] = [dict(zip(keys, row)) for row in rows]
+
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "interval": interval,
+        "timezone": str(tzinfo),
+        "group_by": group_by,
+        "totals": {
+            name: sum(row["count"] for row in rows)
+            for name, rows in series.items()
+        },
+        "series": series,
+    }
@@ -0,0 +1,221 @@
+from functools import wraps
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse, JsonResponse
+from rest_framework import status
+from rest_framework.exceptions import (
+    APIException,
+    MethodNotAllowed,
+    NotAuthenticated,
+    NotFound,
+    Throttled,
+)
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from user.activity import activity_tracker
+from user.analytics import bucketed_series
+from user.authentication import StatelessJWTAuthentication
+from user.models import Post, Like, Dislike
+from user.pagination import UserPagination
+from user.reactions import add_reaction, remove_reaction
+from user.search import get_search_backend
+from user.serializers import PostListSerializer, PostDetailSerializer
+from user.views import LikeAnalytics
+
+authentication = StatelessJWTAuthentication()
+
+
+def json_response(data, status_code: int = status.HTTP_200_OK):
+    return JsonResponse(
+        data, status=status_code, encoder=JSONEncoder, safe=False
+    )
+
+
+def check_throttles(request, scope=None) -> None:
+    # Scoped throttles read the scope from the view.
+    view = SimpleNamespace(throttle_scope=scope)
+    for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, view):
+            raise Throttled(throttle.wait())
+
+
+def async_api(
+    methods=("GET",), authenticated: bool = False, throttle_scope=None
+):
+    """Run an async view with the API's JWT authentication and throttles.
+
+    DRF views are synchronous, so these views are plain Django views that
+    mirror the error responses of the DRF ones.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                if request.method not in methods:
+                    raise MethodNotAllowed(request.method)
+
+                result = await authentication.aauthenticate(request)
+                request.user = result[0] if result else AnonymousUser()
+                if authenticated and not request.user.is_authenticated:
+                    raise NotAuthenticated
+
+                # Counting blocks on the throttle store's SQLite file, it
+                # never touches the default database connection.
+                await sync_to_async(check_throttles, thread_sensitive=False)(
+                    request, throttle_scope
+                )
+                return await view(request, *args, **kwargs)
+            except APIException as exc:
+                detail = exc.detail
+                if not isinstance(detail, (dict, list)):
+                    detail = {"detail": detail}
+
+                response = json_response(detail, exc.status_code)
+                if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+                    header = authentication.authenticate_header(request)
+                    response["WWW-Authenticate"] = header
+                return response
+
+        # django.views.decorators.csrf.csrf_exempt() is sync-only in 4.2.
+        wrapper.csrf_exempt = True
+        return wrapper
+
+    return decorator
+
+
+def page_number(request) -> int:
+    try:
+        page = int(request.GET.get("page", 1))
+    except ValueError:
+        raise NotFound("Invalid page.")
+
+    if page < 1:
+        raise NotFound("Invalid page.")
+
+    return page
+
+
+def page_size(request) -> int:
+    try:
+        size = int(request.GET[UserPagination.page_size_query_param])
+    except (KeyError, ValueError):
+        return UserPagination.page_size
+
+    if size <= 0:
+        return UserPagination.page_size
+
+    return min(size, UserPagination.max_page_size)
+
+
+@async_api()
+async def post_list(request):
+    params = request.GET
+    filters = {}
+    if params.get("username"):
+        filters["username"] = params["username"]
+    queryset = get_search_backend().search(
+        Post.objects.select_related("user"), params.get("q", ""), filters
+    )
+
+    page, size = page_number(request), page_size(request)
+    start = (page - 1) * size
+    count = await queryset.acount()
+    if page > 1 and start >= count:
+        raise NotFound("Invalid page.")
+
+    posts = [post async for post in queryset[start : start + size]]
+
+    url = request.build_absolute_uri()
+    next_link = previous_link = None
+    if start + size < count:
+        next_link = replace_query_param(url, "page", page + 1)
+    if page == 2:
+        previous_link = remove_query_param(url, "page")
+    elif page > 2:
+        previous_link = replace_query_param(url, "page", page - 1)
+
+    serializer = PostListSerializer(
+        posts, many=True, context={"request": request}
+    )
+
+    return json_response(
+        {
+            "count": count,
+            "next": next_link,
+            "previous": previous_link,
+            "results": serializer.data,
+        }
+    )
+
+
+@async_api()
+async def post_detail(request, pk: int):
+    try:
+        post = await Post.objects.select_related("user").aget(pk=pk)
+    except Post.DoesNotExist:
+        raise NotFound
+
+    serializer = PostDetailSerializer(post, context={"request": request})
+    return json_response(serializer.data)
+
+
+async def react(request, model, pk: int):
+    # The reaction runs raw SQL in a transaction, which the async ORM does
+    # not offer yet.
+    if request.method == "DELETE":
+        await sync_to_async(remove_reaction)(model, pk, request.user.pk)
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+    try:
+        await sync_to_async(add_reaction)(model, pk, request.user.pk)
+    except Post.DoesNotExist:
+        raise NotFound
+
+    return HttpResponse(status=status.HTTP_200_OK)
+
+
+@async_api(
+    methods=("POST", "DELETE"), authenticated=True, throttle_scope="reactions"
+)
+async def post_like(request, pk: int):
+    return await react(request, Like, pk)
+
+
+@async_api(
+    methods=("POST", "DELETE"), authenticated=True, throttle_scope="reactions"
+)
+async def post_dislike(request, pk: int):
+    return await react(request, Dislike, pk)
+
+
+@async_api(authenticated=True)
+async def like_analytics(request):
+    params = LikeAnalytics.parse_params(request.GET)
+
+    return json_response(await sync_to_async(bucketed_series)(**params))
+
+
+@async_api(authenticated=True)
+async def user_activity(request):
+    user_id = request.user.pk
+    username, last_login, last_activity = (
+        await get_user_model()
+        .objects.filter(pk=user_id)
+        .values_list("username", "last_login", "last_activity")
+        .aget()
+    )
+    last_activity = activity_tracker.last_seen(user_id) or last_activity
+
+    return json_response(
+        {
+            f"{username}'s last login": last_login,
+            f"{username}'s last request": last_activity,
+        }
+    )
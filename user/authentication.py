@@ -0,0 +1,193 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+DEFAULTS = {
+    "STATUS_CACHE_TTL": 60,
+}
+
+
+def stateless_jwt_setting(name: str):
+    return getattr(settings, "STATELESS_JWT", {}).get(name, DEFAULTS[name])
+
+
+def user_status_key(user_id) -> str:
+    return f"user-active:{user_id}"
+
+
+def is_user_active(user_id) -> bool:
+    """Check that the user exists and is active, cached for a short TTL"""
+    key = user_status_key(user_id)
+    active = cache.get(key)
+
+    if active is None:
+        active = (
+            get_user_model()
+            .objects.filter(pk=user_id, is_active=True)
+            .exists()
+        )
+        cache.set(
+            key, active, timeout=stateless_jwt_setting("STATUS_CACHE_TTL")
+        )
+
+    return active
+
+
+async def ais_user_active(user_id) -> bool:
+    key = user_status_key(user_id)
+    active = await cache.aget(key)
+
+    if active is None:
+        active = (
+            await get_user_model()
+            .objects.filter(pk=user_id, is_active=True)
+            .aexists()
+        )
+        await cache.aset(
+            key, active, timeout=stateless_jwt_setting("STATUS_CACHE_TTL")
+        )
+
+    return active
+
+
+def forget_user_status(user_id) -> None:
+    cache.delete(user_status_key(user_id))
+
+
+class LazyTokenUser(TokenUser):
+    """User built from the claims of a validated access token.
+
+    ``id``, ``username``, ``is_staff`` and ``is_superuser`` come from the
+    token. Any other attribute loads the user row on first access.
+    """
+
+    @cached_property
+    def instance(self):
+        return get_user_model().objects.get(pk=self.id)
+
+    def _claim(self, name: str):
+        if name in self.token:
+            return self.token[name]
+
+        return getattr(self.instance, name)
+
+    @cached_property
+    def username(self) -> str:
+        return self._claim("username")
+
+    @cached_property
+    def is_staff(self) -> bool:
+        return self._claim("is_staff")
+
+    @cached_property
+    def is_superuser(self) -> bool:
+        return self._claim("is_superuser")
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, get_user_model()):
+            return self.pk == other.pk
+
+        return super().__eq__(other)
+
+    __hash__ = TokenUser.__hash__
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        return getattr(self.instance, name)
+
+
+def model_user(user):
+    """Return the model instance behind ``request.user``"""
+    if isinstance(user, LazyTokenUser):
+        return user.instance
+
+    return user
+
+
+def user_values(user, *fields) -> tuple:
+    """Read ``fields`` of ``request.user``.
+
+    Token users only SELECT the requested columns instead of the full row.
+    """
+    if isinstance(user, LazyTokenUser) and "instance" not in user.__dict__:
+        return (
+            get_user_model()
+            .objects.filter(pk=user.pk)
+            .values_list(*fields)
+            .get()
+        )
+
+    return tuple(getattr(user, field) for field in fields)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWT authentication that does not SELECT the user on every request.
+
+    Deactivated or deleted users are rejected once their cached status
+    expires, see ``STATELESS_JWT["STATUS_CACHE_TTL"]``; saving a user drops
+    the cached status right away, in this process only when the default
+    cache is LocMem. ``is_staff`` is trusted from the token, so the class
+    is only used where staff rights do not matter, see
+    ``StatelessReadMixin``.
+    """
+
+    @staticmethod
+    def get_user_id(validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+    def get_user(self, validated_token) -> LazyTokenUser:
+        if not is_user_active(self.get_user_id(validated_token)):
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+
+        return LazyTokenUser(validated_token)
+
+    async def aauthenticate(self, request):
+        """Async ``authenticate`` for views outside of DRF"""
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if not await ais_user_active(self.get_user_id(validated_token)):
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+
+        return LazyTokenUser(validated_token), validated_token
+
+
+class StatelessReadMixin:
+    """Authenticate safe requests with ``StatelessJWTAuthentication``.
+
+    Other methods keep the default authentication, which loads the user
+    row and with it the current ``is_staff``.
+    """
+
+    def get_authenticators(self):
+        if self.request.method in SAFE_METHODS:
+            return [StatelessJWTAuthentication()]
+
+        return super().get_authenticators()
@@ -0,0 +1,131 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+DEFAULTS = {
+    "BLOOM_CAPACITY": 100_000,
+    "BLOOM_ERROR_RATE": 0.001,
+    "LRU_SIZE": 10_000,
+    "REFRESH_INTERVAL": 5,
+}
+# Tokens blacklisted by transactions that committed late are still seen.
+SYNC_OVERLAP = timedelta(minutes=1)
+
+
+def blacklist_setting(name: str):
+    return getattr(settings, "TOKEN_BLACKLIST", {}).get(name, DEFAULTS[name])
+
+
+class BloomFilter:
+    """Set membership with false positives but no false negatives"""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = capacity
+        self.size = max(
+            8, int(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.size
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self.bits[position // 8] |= 1 << position % 8
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self.bits[position // 8] & 1 << position % 8
+            for position in self._positions(value)
+        )
+
+
+class TokenBlacklist:
+    """In-process view of the blacklisted refresh token JTIs.
+
+    A bloom filter answers "not blacklisted" for almost every token without
+    a query; only its positives that are not in the LRU of recently revoked
+    JTIs are confirmed against the database. The filter is loaded from the
+    database on first use and picks up tokens revoked by other processes
+    every ``REFRESH_INTERVAL`` seconds. It is rebuilt from the unexpired
+    tokens once it holds more than ``BLOOM_CAPACITY`` JTIs.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bloom = None
+            self._recent = OrderedDict()
+            self._loaded_at = None
+            self._checked_at = 0.0
+
+    def _remember(self, jti: str) -> None:
+        self._bloom.add(jti)
+        self._recent[jti] = True
+        self._recent.move_to_end(jti)
+        while len(self._recent) > blacklist_setting("LRU_SIZE"):
+            self._recent.popitem(last=False)
+
+    def _sync(self) -> None:
+        """Load the JTIs blacklisted since the last sync"""
+        if (
+            self._bloom is not None
+            and time.monotonic() - self._checked_at
+            < blacklist_setting("REFRESH_INTERVAL")
+        ):
+            return
+
+        now = timezone.now()
+        tokens = BlacklistedToken.objects.filter(token__expires_at__gt=now)
+        if self._bloom is None or self._bloom.count > self._bloom.capacity:
+            self._bloom = BloomFilter(
+                blacklist_setting("BLOOM_CAPACITY"),
+                blacklist_setting("BLOOM_ERROR_RATE"),
+            )
+        elif self._loaded_at is not None:
+            tokens = tokens.filter(
+                blacklisted_at__gte=self._loaded_at - SYNC_OVERLAP
+            )
+
+        for jti in tokens.values_list("token__jti", flat=True).iterator():
+            self._bloom.add(jti)
+
+        self._loaded_at = now
+        self._checked_at = time.monotonic()
+
+    def add(self, jti: str) -> None:
+        with self._lock:
+            self._sync()
+            self._remember(jti)
+
+    def __contains__(self, jti: str) -> bool:
+        with self._lock:
+            self._sync()
+            if jti in self._recent:
+                self._recent.move_to_end(jti)
+                return True
+            if jti not in self._bloom:
+                return False
+
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+token_blacklist = TokenBlacklist()
@@ -0,0 +1,194 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils.cache import patch_vary_headers
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from user.models import Post
+
+DEFAULTS = {
+    "ALIAS": "default",
+    "ENABLED": True,
+    "TIMEOUT": 300,
+}
+
+
+def cache_setting(name: str):
+    return getattr(settings, "RESPONSE_CACHE", {}).get(name, DEFAULTS[name])
+
+
+def response_cache():
+    return caches[cache_setting("ALIAS")]
+
+
+def version_key(tag: str) -> str:
+    return f"response-version:{tag}"
+
+
+def get_versions(tags: list) -> list:
+    """Return the version stamp of every tag, creating missing ones"""
+    cache = response_cache()
+    keys = [version_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+
+    return [versions[key] for key in keys]
+
+
+def bump(*tags: str) -> None:
+    """Invalidate every cached response depending on one of ``tags``.
+
+    Stamps are replaced rather than incremented, so an evicted stamp can
+    never come back with an old value. The bump is repeated after commit
+    so a response cached while the transaction was open is dropped too.
+    """
+
+    def replace_stamps() -> None:
+        response_cache().set_many(
+            {version_key(tag): uuid.uuid4().hex for tag in tags},
+            timeout=None,
+        )
+
+    if cache_setting("ENABLED"):
+        replace_stamps()
+        transaction.on_commit(replace_stamps)
+
+
+def author_tag(username: str) -> str:
+    return f"posts:author:{username.lower()}"
+
+
+def invalidate_post(post_id: int, username: str, reordered: bool) -> None:
+    """Drop the post detail, its author's lists and the first feed page.
+
+    Creating or deleting a post shifts every feed page, ``reordered`` drops
+    all of them.
+    """
+    tags = [
+        f"post:{post_id}",
+        author_tag(username),
+        "posts:feed:first",
+        "posts:search",
+    ]
+    if reordered:
+        tags.append("posts:feed")
+
+    bump(*tags)
+
+
+def invalidate_post_fields(post_id: int, author_id: int | None = None) -> None:
+    """Drop the cached responses showing fields of a post that changed
+    without reordering any list (reaction counters, thumbnails).
+
+    Search results only pick up such changes when they expire.
+    """
+    if not cache_setting("ENABLED"):
+        return
+
+    if author_id is None:
+        usernames = Post.objects.filter(pk=post_id).values_list(
+            "user__username", flat=True
+        )
+    else:
+        usernames = get_user_model().objects.filter(pk=author_id)
+        usernames = usernames.values_list("username", flat=True)
+    username = usernames.first()
+
+    tags = [f"post:{post_id}", "posts:feed:first"]
+    if username is not None:
+        tags.append(author_tag(username))
+
+    bump(*tags)
+
+
+def invalidate_many_post_fields(usernames: dict) -> None:
+    """invalidate_post_fields() for many posts with a single bump.
+
+    ``usernames`` maps the post ids to their author's username.
+    """
+    if not usernames:
+        return
+
+    tags = {"posts:feed:first"}
+    for post_id, username in usernames.items():
+        tags.update((f"post:{post_id}", author_tag(username)))
+
+    bump(*tags)
+
+
+def invalidate_user(user_id: int, posts: bool) -> None:
+    """Drop the user's responses, ``posts`` also drops every post list"""
+    tags = [f"user:{user_id}", "users"]
+    if posts:
+        tags.extend(["posts:authors", "posts:feed", "posts:search"])
+
+    bump(*tags)
+
+
+class CachedResponseMixin:
+    """Cache list and retrieve responses of anonymous requests.
+
+    Entries are keyed on the path, the query parameters and the version
+    stamps of the tags returned by ``get_cache_tags``; signals bump the
+    stamps when the underlying rows change. Eviction (LRU/TTL) is left to
+    the configured cache backend. Responses carry an ETag so clients can
+    revalidate with If-None-Match.
+    """
+
+    def get_cache_tags(self) -> list:
+        raise NotImplementedError
+
+    def get_cache_key(self, request, tags: list) -> str:
+        parts = [request.get_host(), request.path]
+        parts.extend(
+            f"{name}={value}"
+            for name, values in sorted(request.query_params.lists())
+            for value in values
+        )
+        parts.extend(get_versions(tags))
+
+        digest = hashlib.md5("\n".join(parts).encode()).hexdigest()
+        return f"response:{digest}"
+
+    def cached_response(self, request, view, *args, **kwargs) -> Response:
+        if not cache_setting("ENABLED") or request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+
+        cache = response_cache()
+        key = self.get_cache_key(request, self.get_cache_tags())
+        entry = cache.get(key)
+
+        if entry is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+            etag = hashlib.md5(
+                JSONRenderer().render(response.data)
+            ).hexdigest()
+            entry = {"data": response.data, "etag": f'"{etag}"'}
+            cache.set(key, entry, timeout=cache_setting("TIMEOUT"))
+        elif entry["etag"] in request.headers.get("If-None-Match", ""):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(entry["data"])
+
+        response["ETag"] = entry["etag"]
+        patch_vary_headers(response, ["Authorization"])
+        return response
+
+    def list(self, request, *args, **kwargs) -> Response:
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
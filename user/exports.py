@@ -0,0 +1,139 @@
+import csv
+import datetime
+import itertools
+from typing import NamedTuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+from user.models import Post, Like, Dislike, LikeDailyAggregate
+from user.rollups import day_start
+
+DEFAULTS = {
+    # Rows fetched per round trip, the export never holds more.
+    "CHUNK_SIZE": 2000,
+}
+
+CONTENT_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+class Export(NamedTuple):
+    model: type
+    fields: tuple
+    date_field: str
+
+
+EXPORTS = {
+    "likes": Export(
+        Like, ("id", "post_id", "user_id", "created_at"), "created_at"
+    ),
+    "dislikes": Export(
+        Dislike, ("id", "post_id", "user_id", "created_at"), "created_at"
+    ),
+    "posts": Export(
+        Post,
+        (
+            "id",
+            "user_id",
+            "text",
+            "likes_count",
+            "dislikes_count",
+            "created_at",
+        ),
+        "created_at",
+    ),
+    "daily_likes": Export(
+        LikeDailyAggregate,
+        ("id", "day", "post_id", "author_id", "likes"),
+        "day",
+    ),
+}
+
+
+def export_setting(name: str):
+    return getattr(settings, "EXPORTS", {}).get(name, DEFAULTS[name])
+
+
+def export_rows(
+    kind: str, date_from=None, date_to=None, since_id=None
+) -> tuple:
+    """Return the field names and an iterator over the rows of ``kind``.
+
+    Rows come in id order as tuples, fetched in chunks from a server-side
+    cursor where the database has one. Dates are inclusive local days,
+    ``since_id`` skips the rows up to that id for incremental exports.
+    """
+    export = EXPORTS[kind]
+    queryset = export.model.objects.all()
+
+    is_datetime = isinstance(
+        export.model._meta.get_field(export.date_field), models.DateTimeField
+    )
+    if date_from:
+        start = day_start(date_from) if is_datetime else date_from
+        queryset = queryset.filter(**{f"{export.date_field}__gte": start})
+    if date_to:
+        if is_datetime:
+            end = day_start(date_to + datetime.timedelta(days=1))
+            queryset = queryset.filter(**{f"{export.date_field}__lt": end})
+        else:
+            queryset = queryset.filter(
+                **{f"{export.date_field}__lte": date_to}
+            )
+    if since_id:
+        queryset = queryset.filter(pk__gt=since_id)
+
+    rows = (
+        queryset.order_by("pk")
+        .values_list(*export.fields)
+        .iterator(chunk_size=export_setting("CHUNK_SIZE"))
+    )
+    return export.fields, rows
+
+
+class Echo:
+    """File-like object handing back what is written to it"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def render_csv(fields: tuple, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def render_ndjson(fields: tuple, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + "\n"
+
+
+RENDERERS = {"csv": render_csv, "ndjson": render_ndjson}
+
+
+def render_rows(output: str, fields: tuple, rows):
+    """Lines of ``rows`` as CSV with a header or as NDJSON"""
+    return RENDERERS[output](fields, rows)
+
+
+def batched(lines, size: int):
+    """Join ``lines`` into blocks of ``size``, one write per block"""
+    lines = iter(lines)
+    while block := "".join(itertools.islice(lines, size)):
+        yield block
+
+
+async def abatched(lines, size: int):
+    """batched() for ASGI servers.
+
+    Django consumes a whole sync iterator before sending it over ASGI,
+    the blocks are read from the sync thread one at a time instead.
+    """
+    blocks = batched(lines, size)
+    while block := await sync_to_async(next)(blocks, ""):
+        yield block
@@ -0,0 +1,255 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+
+from user.cache import bump
+from user.jobs import enqueue
+from user.models import Post, Follow, FeedEntry
+from user.pagination import KeysetPagination, keyset_filter
+
+DEFAULTS = {
+    # Posts of authors with this many followers are not copied into the
+    # timelines, feeds merge them in when they are read.
+    "FANOUT_LIMIT": 10_000,
+    # Timelines written per fan-out job.
+    "BATCH_SIZE": 1000,
+    # Recent posts of an author copied into the timeline on follow.
+    "BACKFILL": 50,
+}
+JOB_KIND = "feed.fanout"
+CATCH_UP_JOB_KIND = "feed.catch_up"
+
+
+def feed_setting(name: str):
+    return getattr(settings, "FEED", {}).get(name, DEFAULTS[name])
+
+
+def add_entries(posts, user_ids) -> None:
+    """Copy ``(post id, created_at)`` pairs into the users' timelines"""
+    FeedEntry.objects.bulk_create(
+        [
+            FeedEntry(user_id=user_id, post_id=post_id, created_at=created_at)
+            for user_id in user_ids
+            for post_id, created_at in posts
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def _insert_follow(user_id: int, author_id: int) -> bool:
+    """INSERT ... ON CONFLICT DO NOTHING, return whether a row was added"""
+    quote = connection.ops.quote_name
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(Follow._meta.db_table)} "
+            f"({quote('follower_id')}, {quote('author_id')}, "
+            f"{quote('created_at')}) VALUES (%s, %s, %s) "
+            f"ON CONFLICT ({quote('follower_id')}, {quote('author_id')}) "
+            f"DO NOTHING RETURNING {quote('id')}",
+            [
+                user_id,
+                author_id,
+                connection.ops.adapt_datetimefield_value(timezone.now()),
+            ],
+        )
+        return cursor.fetchone() is not None
+
+
+def _bump_followers(author_id: int, delta: int) -> int | None:
+    """Apply a delta to an author's follower count and return it.
+
+    Returns None when the author does not exist.
+    """
+    quote = connection.ops.quote_name
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {quote(get_user_model()._meta.db_table)} "
+            f"SET {quote('followers_count')} = "
+            f"{quote('followers_count')} + %s "
+            f"WHERE {quote('id')} = %s RETURNING {quote('followers_count')}",
+            [delta, author_id],
+        )
+        row = cursor.fetchone()
+
+    return row[0] if row else None
+
+
+def _backfill(user_id: int, author_id: int) -> None:
+    """Copy the author's recent posts into the user's timeline"""
+    quote = connection.ops.quote_name
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(FeedEntry._meta.db_table)} "
+            f"({quote('user_id')}, {quote('post_id')}, {quote('created_at')}) "
+            f"SELECT %s, {quote('id')}, {quote('created_at')} "
+            f"FROM {quote(Post._meta.db_table)} WHERE {quote('user_id')} = %s "
+            f"ORDER BY {quote('created_at')} DESC LIMIT %s "
+            f"ON CONFLICT ({quote('user_id')}, {quote('post_id')}) DO NOTHING",
+            [user_id, author_id, feed_setting("BACKFILL")],
+        )
+
+
+def follow_author(user_id: int, author_id: int) -> bool:
+    """Follow an author and backfill their recent posts.
+
+    Following again is a no-op costing a single INSERT. Raises
+    User.DoesNotExist when the author is missing. Returns whether anything
+    changed.
+    """
+    with transaction.atomic():
+        if not _insert_follow(user_id, author_id):
+            return False
+
+        followers_count = _bump_followers(author_id, 1)
+        if followers_count is None:
+            raise get_user_model().DoesNotExist
+        if followers_count < feed_setting("FANOUT_LIMIT"):
+            _backfill(user_id, author_id)
+
+    bump(f"user:{author_id}")
+    return True
+
+
+def unfollow_author(user_id: int, author_id: int) -> bool:
+    """Stop following an author and drop their posts from the timeline"""
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(
+            follower_id=user_id, author_id=author_id
+        ).delete()
+        if not deleted:
+            return False
+
+        followers_count = _bump_followers(author_id, -1)
+        FeedEntry.objects.filter(
+            user_id=user_id, post__user_id=author_id
+        ).delete()
+        if followers_count == feed_setting("FANOUT_LIMIT") - 1:
+            enqueue(CATCH_UP_JOB_KIND, author_id=author_id)
+
+    bump(f"user:{author_id}")
+    return True
+
+
+def fan_out(post_id: int, after: int = 0) -> None:
+    """Copy a post into the timelines of a batch of its author's followers.
+
+    Followers are taken in id order past ``after``, the next batch is
+    queued as a job of its own so a failure only retries one batch.
+    """
+    post = (
+        Post.objects.filter(pk=post_id)
+        .values_list("user_id", "user__followers_count", "created_at")
+        .first()
+    )
+    if post is None:
+        return
+
+    author_id, followers_count, created_at = post
+    if followers_count >= feed_setting("FANOUT_LIMIT"):
+        # Feeds merge the post in while the author stays above the limit.
+        Post.objects.filter(pk=post_id).update(fanned_out=False)
+        return
+
+    batch_size = feed_setting("BATCH_SIZE")
+    followers = list(
+        Follow.objects.filter(author_id=author_id, follower_id__gt=after)
+        .order_by("follower_id")
+        .values_list("follower_id", flat=True)[:batch_size]
+    )
+    add_entries([(post_id, created_at)], followers)
+
+    if len(followers) == batch_size:
+        enqueue(JOB_KIND, post_id=post_id, after=followers[-1])
+
+
+def catch_up(author_id: int, after: int = 0) -> None:
+    """Bring the feeds of an author's followers up to date.
+
+    Queued when the author drops below FANOUT_LIMIT, feeds stop merging
+    their posts in at that point. The first job fans out the posts held
+    back above the limit. Every job backfills the recent posts into a
+    batch of followers, who may have followed while backfills were
+    skipped, and queues the next batch.
+    """
+    followers_count = (
+        get_user_model()
+        .objects.filter(pk=author_id)
+        .values_list("followers_count", flat=True)
+        .first()
+    )
+    if followers_count is None or followers_count >= feed_setting(
+        "FANOUT_LIMIT"
+    ):
+        # Back above the limit, feeds merge the posts in again.
+        return
+
+    if not after:
+        with transaction.atomic():
+            post_ids = list(
+                Post.objects.filter(user_id=author_id, fanned_out=False)
+                .select_for_update()
+                .values_list("pk", flat=True)
+            )
+            Post.objects.filter(pk__in=post_ids).update(fanned_out=True)
+            for post_id in post_ids:
+                enqueue(JOB_KIND, post_id=post_id)
+
+    batch_size = feed_setting("BATCH_SIZE")
+    followers = list(
+        Follow.objects.filter(author_id=author_id, follower_id__gt=after)
+        .order_by("follower_id")
+        .values_list("follower_id", flat=True)[:batch_size]
+    )
+    posts = list(
+        Post.objects.filter(user_id=author_id)
+        .order_by("-created_at")
+        .values_list("pk", "created_at")[: feed_setting("BACKFILL")]
+    )
+    add_entries(posts, followers)
+
+    if len(followers) == batch_size:
+        enqueue(CATCH_UP_JOB_KIND, author_id=author_id, after=followers[-1])
+
+
+def unfanned_authors(user_id: int) -> list:
+    """Followed authors with too many followers to fan out"""
+    return list(
+        Follow.objects.filter(
+            follower_id=user_id,
+            author__followers_count__gte=feed_setting("FANOUT_LIMIT"),
+        ).values_list("author_id", flat=True)
+    )
+
+
+class FeedPagination(KeysetPagination):
+    """Page through a timeline merged with the posts of unfanned authors.
+
+    The timeline page is a single range query over the user's entries,
+    however many authors the user follows. Each followed author who is
+    not fanned out adds a range query over their own posts.
+    """
+
+    def fetch(self, queryset, cursor, limit: int) -> list:
+        entries = keyset_filter(
+            queryset.select_related("post__user"), cursor, pk="post_id"
+        )
+        posts = {entry.post_id: entry.post for entry in entries[:limit]}
+
+        for author_id in unfanned_authors(self.request.user.pk):
+            merged = keyset_filter(
+                Post.objects.filter(user_id=author_id).select_related("user"),
+                cursor,
+            )
+            for post in merged[:limit]:
+                posts.setdefault(post.pk, post)
+
+        backwards = cursor is not None and cursor[2]
+        return sorted(
+            posts.values(),
+            key=lambda post: (post.created_at, post.pk),
+            reverse=not backwards,
+        )[:limit]
@@ -0,0 +1,103 @@
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from user.models import Job
+
+DEFAULTS = {
+    "HANDLERS": {},
+    "PROCESSES": 2,
+    "BATCH_SIZE": 20,
+    "POLL_INTERVAL": 1,
+    "MAX_ATTEMPTS": 3,
+    "STALE_AFTER": 600,
+}
+
+
+def job_setting(name: str):
+    return getattr(settings, "JOB_QUEUE", {}).get(name, DEFAULTS[name])
+
+
+def enqueue(kind: str, **payload) -> Job:
+    """Queue a job, it is committed together with the caller's transaction"""
+    if kind not in job_setting("HANDLERS"):
+        raise ValueError(f"No handler for job kind {kind!r}")
+
+    return Job.objects.create(kind=kind, payload=payload)
+
+
+def enqueue_once(kind: str, **payload) -> Job:
+    """enqueue() unless the same job is still waiting to run"""
+    pending = Job.objects.filter(
+        kind=kind, payload=payload, status=Job.PENDING
+    ).first()
+
+    return pending or enqueue(kind, **payload)
+
+
+def claim_jobs(limit: int) -> list:
+    """Mark up to ``limit`` pending jobs as running and return them.
+
+    The single UPDATE ... RETURNING makes sure two workers never claim the
+    same job. Jobs left running for ``STALE_AFTER`` seconds by a worker
+    that died are claimed again.
+    """
+    table = connection.ops.quote_name(Job._meta.db_table)
+    adapt = connection.ops.adapt_datetimefield_value
+    now = timezone.now()
+    stale = now - timedelta(seconds=job_setting("STALE_AFTER"))
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} "
+            "SET status = %s, attempts = attempts + 1, updated_at = %s "
+            f"WHERE id IN (SELECT id FROM {table} WHERE status = %s "
+            "OR (status = %s AND updated_at < %s) ORDER BY id LIMIT %s) "
+            "RETURNING id, kind, payload",
+            [
+                Job.RUNNING,
+                adapt(now),
+                Job.PENDING,
+                Job.RUNNING,
+                adapt(stale),
+                limit,
+            ],
+        )
+        rows = cursor.fetchall()
+
+    payload_field = Job._meta.get_field("payload")
+    return sorted(
+        (
+            job_id,
+            kind,
+            payload_field.from_db_value(payload, None, connection),
+        )
+        for job_id, kind, payload in rows
+    )
+
+
+def run_job(job: tuple) -> bool:
+    """Run a claimed job and record the outcome, return whether it passed"""
+    job_id, kind, payload = job
+
+    try:
+        import_string(job_setting("HANDLERS")[kind])(**payload)
+    except Exception:
+        job = Job.objects.get(pk=job_id)
+        if job.attempts < job_setting("MAX_ATTEMPTS"):
+            job.status = Job.PENDING
+        else:
+            job.status = Job.FAILED
+        job.error = traceback.format_exc()
+        job.save(update_fields=["status", "error", "updated_at"])
+
+        return False
+
+    Job.objects.filter(pk=job_id).update(
+        status=Job.DONE, error="", updated_at=timezone.now()
+    )
+    return True
@@ -3,9 +3,12 @@ import random
 import uuid
 
 from django.contrib.auth import get_user_model
-from django.core.management import BaseCommand
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, call_command
 
+from user.cache import bump
 from user.models import Post, Like
+from user.seeding import insert
 
 config = configparser.ConfigParser()
 config.read("config.ini")
@@ -13,32 +16,123 @@ config.read("config.ini")
 NUMBER_OF_USERS = config.getint("DEFAULT", "number_of_users")
 MAX_POSTS_PER_USER = config.getint("DEFAULT", "max_posts_per_user")
 MAX_LIKES_PER_USER = config.getint("DEFAULT", "max_likes_per_user")
+PASSWORD = "user1234"
+
+
+def user_fields() -> dict:
+    # All 128 bits, a truncated uuid collides in seeds of a million rows.
+    name = uuid.uuid4().hex
+
+    return {
+        "username": f"username-{name}",
+        "email": f"user-{name}@user.com",
+        "first_name": f"user-{name}_first_name",
+        "last_name": f"user-{name}_last_name",
+    }
 
 
 class Command(BaseCommand):
-    def handle(self, *args, **kwargs) -> None:
+    help = "Seed the database with random users, posts and likes"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help="Insert rows with bulk_create instead of one by one",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Number of rows per bulk INSERT in bulk mode",
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options["bulk"]:
+            self.seed_bulk(options["chunk_size"])
+        else:
+            self.seed()
+
+    def seed(self) -> None:
+        post_ids = list(Post.objects.values_list("pk", flat=True))
+
         for _ in range(NUMBER_OF_USERS):
             num_posts = random.randint(1, MAX_POSTS_PER_USER)
             num_likes = random.randint(1, MAX_LIKES_PER_USER)
 
-            name = str(uuid.uuid4()).split("-")[0]
-
             user = get_user_model().objects.create_user(
-                username=f"username-{name}",
-                email=f"user-{name}@user.com",
-                password="user1234",
-                first_name=f"user-{name}_first_name",
-                last_name=f"user-{name}_last_name",
+                password=PASSWORD, **user_fields()
             )
 
             for _ in range(num_posts):
-                Post.objects.create(text="Some text", user=user)
+                post_ids.append(
+                    Post.objects.create(text="Some text", user=user).pk
+                )
 
-            posts = Post.objects.all()
-            liked_posts = random.choices(posts, k=num_likes)
+            liked_posts = random.sample(
+                post_ids, min(num_likes, len(post_ids))
+            )
             for liked_post in liked_posts:
-                Like.objects.create(user=user, post=liked_post)
+                Like.objects.create(user=user, post_id=liked_post)
 
             self.stdout.write(
                 f"User with {num_posts}posts and {num_likes}likes created"
             )
+
+    def seed_bulk(self, chunk_size: int) -> None:
+        """Seed with bulk INSERTs, then rebuild the derived data.
+
+        bulk_create sends no signals, so post counters, like rollups and
+        the search index are recomputed once at the end.
+        """
+        User = get_user_model()
+        password = make_password(PASSWORD)
+
+        user_ids = insert(
+            User,
+            (
+                User(password=password, **user_fields())
+                for _ in range(NUMBER_OF_USERS)
+            ),
+            chunk_size,
+            self.stdout,
+        )
+
+        post_ids = insert(
+            Post,
+            (
+                Post(text="Some text", user_id=user_id)
+                for user_id in user_ids
+                for _ in range(random.randint(1, MAX_POSTS_PER_USER))
+            ),
+            chunk_size,
+            self.stdout,
+        )
+
+        insert(
+            Like,
+            (
+                Like(user_id=user_id, post_id=post_id)
+                for user_id in user_ids
+                for post_id in random.sample(
+                    post_ids,
+                    min(random.randint(1, MAX_LIKES_PER_USER), len(post_ids)),
+                )
+            ),
+            chunk_size,
+            self.stdout,
+            ignore_conflicts=True,
+        )
+
+        call_command(
+            "reconcile_post_counters",
+            chunk_size=chunk_size,
+            stdout=self.stdout,
+        )
+        call_command(
+            "backfill_like_rollups", batch_size=chunk_size, stdout=self.stdout
+        )
+        call_command(
+            "rebuild_search_index", batch_size=chunk_size, stdout=self.stdout
+        )
+        bump("users", "posts:authors", "posts:feed", "posts:search")
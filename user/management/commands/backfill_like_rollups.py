@@ -0,0 +1,25 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from user.models import Like, LikeDailyAggregate
+from user.rollups import rebuild_daily_likes
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily like rollups from the likes table"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rollup rows inserted per query",
+        )
+
+    def handle(self, *args, **options) -> None:
+        with transaction.atomic():
+            created = rebuild_daily_likes(
+                Like, LikeDailyAggregate, batch_size=options["batch_size"]
+            )
+
+        self.stdout.write(f"Rebuilt {created} daily like rollup rows")
@@ -0,0 +1,190 @@
+import asyncio
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import (
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from user.models import Post
+from user.serializers import ClaimsTokenObtainPairSerializer
+from user.throttling import counter_store
+
+
+def summary(latencies: list, elapsed: float) -> str:
+    quantiles = statistics.quantiles(latencies, n=100)
+
+    return (
+        f"{len(latencies) / elapsed:>8.1f} "
+        f"{quantiles[49] * 1000:>8.1f} {quantiles[98] * 1000:>8.1f}"
+    )
+
+
+def async_middleware() -> list:
+    """MIDDLEWARE without the classes that can only run synchronously"""
+    return [
+        path
+        for path in settings.MIDDLEWARE
+        if getattr(import_string(path), "async_capable", False)
+    ]
+
+
+def adapted_middleware() -> list:
+    """Middleware the ASGI handler runs through sync_to_async/async_to_sync.
+
+    An adapted middleware runs requests one at a time in the
+    thread-sensitive executor, async views behind it gain nothing.
+    """
+    adapted = []
+
+    class RecordingHandler(ASGIHandler):
+        def adapt_method_mode(
+            self, is_async, method, method_is_async=None, **kwargs
+        ):
+            if method_is_async is None:
+                method_is_async = iscoroutinefunction(method)
+            if kwargs.get("name") and is_async != method_is_async:
+                adapted.append(kwargs["name"])
+
+            return super().adapt_method_mode(
+                is_async, method, method_is_async, **kwargs
+            )
+
+    RecordingHandler()
+    return adapted
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec of the sync (WSGI) and async (ASGI) views "
+        "in-process, pinned to a single CPU core"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=400,
+            help="Requests per endpoint and mode",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=20,
+            help="Threads (WSGI) or tasks (ASGI) sending requests",
+        )
+
+    def handle(self, *args, **options) -> None:
+        user = get_user_model().objects.order_by("pk").first()
+        post = Post.objects.order_by("pk").first()
+        if user is None or post is None:
+            raise CommandError("Seed the database first (automated_bot)")
+
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
+
+        token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        endpoints = [
+            ("post list", "user:post-list", "user:async-post-list", []),
+            (
+                "post detail",
+                "user:post-detail",
+                "user:async-post-detail",
+                [post.pk],
+            ),
+            ("activity", "user:activity", "user:async-activity", []),
+        ]
+
+        # Both modes run the same stack, without sync-only middleware such
+        # as the debug toolbar, and count throttles in a store of their own.
+        with override_settings(
+            MIDDLEWARE=async_middleware(),
+            THROTTLING={**settings.THROTTLING, "PATH": ":memory:"},
+        ):
+            adapted = adapted_middleware()
+            if adapted:
+                raise CommandError(f"Adapted under ASGI: {', '.join(adapted)}")
+            self.run_endpoints(endpoints, headers, options)
+
+    def run_endpoints(self, endpoints: list, headers: dict, options: dict):
+        setup_test_environment(debug=False)
+        try:
+            self.stdout.write(
+                f"{'endpoint':<12} {'mode':<5} {'req/s':>8} "
+                f"{'p50 ms':>8} {'p99 ms':>8}"
+            )
+            for name, sync_name, async_name, url_args in endpoints:
+                for mode, url_name, run in (
+                    ("wsgi", sync_name, self.run_wsgi),
+                    ("asgi", async_name, self.run_asgi),
+                ):
+                    url = reverse(url_name, args=url_args)
+                    # Each run starts below the user's throttle rate, the
+                    # store is the benchmark's own.
+                    counter_store.clear()
+                    latencies, elapsed = run(url, headers, options)
+                    self.stdout.write(
+                        f"{name:<12} {mode:<5} {summary(latencies, elapsed)}"
+                    )
+        finally:
+            teardown_test_environment()
+
+    @staticmethod
+    def run_wsgi(url: str, headers: dict, options: dict) -> tuple:
+        per_worker = options["requests"] // options["concurrency"]
+
+        def worker() -> list:
+            client = Client()
+            latencies = []
+            for _ in range(per_worker):
+                started = time.perf_counter()
+                client.get(url, **headers)
+                latencies.append(time.perf_counter() - started)
+            return latencies
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as executor:
+            futures = [
+                executor.submit(worker) for _ in range(options["concurrency"])
+            ]
+            latencies = [
+                latency for future in futures for latency in future.result()
+            ]
+
+        return latencies, time.perf_counter() - started
+
+    @staticmethod
+    def run_asgi(url: str, headers: dict, options: dict) -> tuple:
+        per_worker = options["requests"] // options["concurrency"]
+
+        async def worker() -> list:
+            client = AsyncClient()
+            latencies = []
+            for _ in range(per_worker):
+                started = time.perf_counter()
+                await client.get(url, **headers)
+                latencies.append(time.perf_counter() - started)
+            return latencies
+
+        async def run() -> list:
+            results = await asyncio.gather(
+                *(worker() for _ in range(options["concurrency"]))
+            )
+            return [latency for result in results for latency in result]
+
+        started = time.perf_counter()
+        latencies = asyncio.run(run())
+
+        return latencies, time.perf_counter() - started
@@ -0,0 +1,115 @@
+import os
+import time
+
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from user.cache import invalidate_post_fields
+from user.jobs import enqueue
+from user.models import Post
+from user.storage import (
+    blob_name,
+    blob_setting,
+    file_sha256,
+    orphaned_blobs,
+)
+from user.thumbnails import JOB_KIND as THUMBNAILS_JOB, delete_thumbnails
+from user.uploads import StreamedUploadedFile
+
+
+class Command(BaseCommand):
+    help = (
+        "Move post images stored before deduplication into the "
+        "content-addressed storage, keeping one file per distinct content, "
+        "and delete blob files that no MediaBlob row refers to"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Number of posts loaded at once",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the space that would be freed",
+        )
+
+    def handle(self, *args, **options) -> None:
+        storage = Post._meta.get_field("media_image").storage
+        posts = (
+            Post.objects.exclude(media_image__isnull=True)
+            .exclude(media_image="")
+            .exclude(media_image__startswith=blob_setting("DIRECTORY") + "/")
+            .order_by("pk")
+            .values_list("pk", "media_image")
+        )
+
+        moved = missing = freed = 0
+        seen = set()
+        for pk, name in posts.iterator(chunk_size=options["chunk_size"]):
+            path = storage.path(name)
+            if not os.path.exists(path):
+                missing += 1
+                continue
+
+            size = os.path.getsize(path)
+            digest = file_sha256(path)
+            blob = blob_name(digest, os.path.splitext(name)[1])
+            if blob in seen or storage.exists(blob):
+                freed += size
+            seen.add(blob)
+            moved += 1
+
+            if not options["dry_run"]:
+                self.move(storage, pk, name, size, digest)
+
+        action = "Would free" if options["dry_run"] else "Freed"
+        self.stdout.write(
+            f"Deduplicated {moved} images into {len(seen)} files, "
+            f"{action} {freed} bytes, {missing} files missing"
+        )
+        self.sweep(storage, options["chunk_size"], options["dry_run"])
+
+    def sweep(self, storage, chunk_size: int, dry_run: bool) -> None:
+        age = blob_setting("ORPHAN_AGE")
+        removed = freed = 0
+        for name in orphaned_blobs(storage, age, chunk_size):
+            path = storage.path(name)
+            try:
+                stat = os.stat(path)
+                # Saved again while the rows were checked.
+                if stat.st_mtime >= time.time() - age:
+                    continue
+                if not dry_run:
+                    os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+            freed += stat.st_size
+
+        action = "Would remove" if dry_run else "Removed"
+        self.stdout.write(f"{action} {removed} orphaned blobs, {freed} bytes")
+
+    @staticmethod
+    def move(storage, pk: int, name: str, size: int, digest: str) -> None:
+        # The duplicate is removed when the file is closed, a new blob is
+        # renamed into place.
+        with StreamedUploadedFile(
+            storage.path(name), name, None, size, sha256=digest
+        ) as file:
+            blob = storage.save(name, file)
+
+        with transaction.atomic():
+            updated = Post.objects.filter(pk=pk, media_image=name).update(
+                media_image=blob, thumbnails={}
+            )
+            if updated:
+                enqueue(THUMBNAILS_JOB, post_id=pk)
+                invalidate_post_fields(pk)
+            else:
+                storage.delete(blob)
+
+        delete_thumbnails(name)
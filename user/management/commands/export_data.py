@@ -0,0 +1,68 @@
+import argparse
+import datetime
+
+from django.core.management import BaseCommand
+
+from user.exports import EXPORTS, RENDERERS, export_rows, render_rows
+from user.rollups import FIRST_DAY, LAST_DAY
+
+
+def parse_day(value: str) -> datetime.date:
+    day = datetime.datetime.strptime(value, "%Y-%m-%d").date()
+    if not FIRST_DAY <= day <= LAST_DAY:
+        raise argparse.ArgumentTypeError(
+            f"must be between {FIRST_DAY} and {LAST_DAY}"
+        )
+
+    return day
+
+
+class Command(BaseCommand):
+    help = (
+        "Write likes, dislikes, posts or daily like totals as CSV or "
+        "NDJSON without loading them into memory"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("kind", choices=EXPORTS)
+        parser.add_argument(
+            "--format",
+            choices=RENDERERS,
+            default="csv",
+            help="Line format of the export",
+        )
+        parser.add_argument(
+            "--date-from",
+            type=parse_day,
+            help="First day, inclusive (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--date-to",
+            type=parse_day,
+            help="Last day, inclusive (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--since-id",
+            type=int,
+            help="Only rows after this id, for incremental exports",
+        )
+        parser.add_argument(
+            "--file",
+            help="Write to this file instead of stdout",
+        )
+
+    def handle(self, *args, **options) -> None:
+        fields, rows = export_rows(
+            options["kind"],
+            date_from=options["date_from"],
+            date_to=options["date_to"],
+            since_id=options["since_id"],
+        )
+        lines = render_rows(options["format"], fields, rows)
+
+        if options["file"]:
+            with open(options["file"], "w", newline="") as file:
+                file.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
@@ -0,0 +1,289 @@
+import configparser
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from multiprocessing import Pool
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+from django.core.management import BaseCommand, CommandError
+
+config = configparser.ConfigParser()
+config.read("config.ini")
+
+SECTION = "LOAD"
+DEFAULTS = {
+    "base_url": "http://127.0.0.1:8000",
+    "start_server": "yes",
+    "throttling": "no",
+    "workers": "4",
+    "users_per_worker": "5",
+    "posts_per_user": "3",
+    "reactions_per_user": "10",
+}
+PASSWORD = "user1234"
+
+
+def load_setting(name: str) -> str:
+    return config.get(SECTION, name, fallback=DEFAULTS[name])
+
+
+def call(base_url: str, method: str, path: str, data=None, token=None):
+    """Send one JSON request, return (status, parsed body, seconds).
+
+    The status is 0 when no response came back, a refused or reset
+    connection or a timeout.
+    """
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    body = json.dumps(data).encode() if data is not None else None
+    request = Request(
+        base_url + path, data=body, headers=headers, method=method
+    )
+
+    started = time.perf_counter()
+    try:
+        with urlopen(request, timeout=30) as response:
+            status, payload = response.status, response.read()
+    except HTTPError as error:
+        status, payload = error.code, error.read()
+    except (URLError, OSError):
+        status, payload = 0, None
+    elapsed = time.perf_counter() - started
+
+    try:
+        payload = json.loads(payload) if payload else None
+    except ValueError:
+        payload = None
+
+    return status, payload, elapsed
+
+
+def run_worker(options: dict) -> list:
+    """Act as ``users_per_worker`` users, return (endpoint, status, time)"""
+    base_url = options["base_url"]
+    samples = []
+
+    def timed(endpoint: str, method: str, path: str, **kwargs):
+        status, payload, elapsed = call(base_url, method, path, **kwargs)
+        samples.append((endpoint, status, elapsed))
+        return status, payload
+
+    for _ in range(options["users_per_worker"]):
+        name = uuid.uuid4().hex[:12]
+        credentials = {"username": f"load-{name}", "password": PASSWORD}
+
+        status, _ = timed(
+            "register",
+            "POST",
+            "/api/user/register/",
+            data={
+                **credentials,
+                "email": f"load-{name}@load.com",
+                "first_name": f"load-{name}_first_name",
+                "last_name": f"load-{name}_last_name",
+            },
+        )
+        if status != 201:
+            continue
+
+        status, tokens = timed(
+            "token", "POST", "/api/user/token/", data=credentials
+        )
+        if status != 200:
+            continue
+        token = tokens["access"]
+
+        post_ids = []
+        for index in range(options["posts_per_user"]):
+            status, post = timed(
+                "post create",
+                "POST",
+                "/api/user/posts/",
+                data={"text": f"Load test post {index}"},
+                token=token,
+            )
+            if status == 201:
+                post_ids.append(post["id"])
+
+        status, feed = timed("post list", "GET", "/api/user/posts/")
+        if status == 200:
+            post_ids.extend(post["id"] for post in feed["results"])
+        if not post_ids:
+            continue
+
+        for _ in range(options["reactions_per_user"]):
+            reaction = random.choice(("like", "dislike"))
+            post_id = random.choice(post_ids)
+            timed(
+                reaction,
+                "POST",
+                f"/api/user/posts/{post_id}/{reaction}/",
+                token=token,
+            )
+
+    return samples
+
+
+def percentile(quantiles: list, value: int) -> float:
+    return quantiles[value - 1] if quantiles else 0.0
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the HTTP API from parallel processes and report latency "
+        f"percentiles and throughput per endpoint (config.ini [{SECTION}]). "
+        "The started runserver only gives a rough picture, point base_url "
+        "at a production-like server and pass --no-server for real numbers"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help=f"Worker processes, overrides [{SECTION}] workers",
+        )
+        parser.add_argument(
+            "--no-server",
+            action="store_true",
+            help=(
+                "Use an already running server at base_url, it gets "
+                "users and posts written to its database"
+            ),
+        )
+
+    def handle(self, *args, **options) -> None:
+        base_url = load_setting("base_url").rstrip("/")
+        workers = options["workers"] or int(load_setting("workers"))
+        start_server = not options["no_server"] and config.getboolean(
+            SECTION, "start_server", fallback=True
+        )
+        worker_options = {
+            "base_url": base_url,
+            "users_per_worker": int(load_setting("users_per_worker")),
+            "posts_per_user": int(load_setting("posts_per_user")),
+            "reactions_per_user": int(load_setting("reactions_per_user")),
+        }
+
+        throttling = config.getboolean(SECTION, "throttling", fallback=False)
+        server = (
+            self.start_server(base_url, throttling) if start_server else None
+        )
+        try:
+            self.wait_for_server(base_url)
+
+            started = time.perf_counter()
+            with Pool(workers) as pool:
+                results = pool.map(run_worker, [worker_options] * workers)
+            elapsed = time.perf_counter() - started
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+                self.server_dir.cleanup()
+
+        self.report(
+            [sample for result in results for sample in result], elapsed
+        )
+
+    def start_server(
+        self, base_url: str, throttling: bool
+    ) -> subprocess.Popen:
+        """Start runserver on a database and throttle counts of its own.
+
+        The load would otherwise write its users and posts into the
+        development database, and earlier runs' throttle counts would
+        throttle this one. DEBUG is off so the toolbar and query logging
+        do not skew the timings.
+        """
+        address = urlsplit(base_url).netloc
+        self.stdout.write(f"Starting server on {address}")
+
+        self.server_dir = tempfile.TemporaryDirectory()
+        env = {
+            **os.environ,
+            "DJANGO_DEBUG": "False",
+            "DJANGO_DB_PATH": os.path.join(
+                self.server_dir.name, "db.sqlite3"
+            ),
+            "DJANGO_THROTTLING": "True" if throttling else "False",
+            "DJANGO_THROTTLE_PATH": os.path.join(
+                self.server_dir.name, "throttle.sqlite3"
+            ),
+        }
+        subprocess.run(
+            [sys.executable, "manage.py", "migrate", "--noinput"],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+
+        return subprocess.Popen(
+            [sys.executable, "manage.py", "runserver", "--noreload", address],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    @staticmethod
+    def wait_for_server(base_url: str, timeout: int = 30) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            status, _, _ = call(base_url, "GET", "/api/user/posts/")
+            if status:
+                return
+            time.sleep(0.2)
+
+        raise CommandError(f"Server at {base_url} did not start")
+
+    def report(self, samples: list, elapsed: float) -> None:
+        endpoints = defaultdict(list)
+        failures = defaultdict(int)
+        throttled = defaultdict(int)
+        for endpoint, status, latency in samples:
+            endpoints[endpoint].append(latency)
+            if status == 429:
+                throttled[endpoint] += 1
+            elif status == 0 or status >= 400:
+                failures[endpoint] += 1
+
+        self.stdout.write(
+            f"{'endpoint':<12} {'requests':>8} {'errors':>6} {'429s':>6} "
+            f"{'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        )
+        for endpoint, latencies in sorted(endpoints.items()):
+            quantiles = (
+                statistics.quantiles(latencies, n=100)
+                if len(latencies) > 1
+                else latencies * 99
+            )
+            self.stdout.write(
+                f"{endpoint:<12} {len(latencies):>8} "
+                f"{failures[endpoint]:>6} "
+                f"{throttled[endpoint]:>6} "
+                f"{len(latencies) / elapsed:>8.1f} "
+                f"{percentile(quantiles, 50) * 1000:>8.1f} "
+                f"{percentile(quantiles, 95) * 1000:>8.1f} "
+                f"{percentile(quantiles, 99) * 1000:>8.1f}"
+            )
+        self.stdout.write(
+            f"{len(samples)} requests in {elapsed:.1f}s "
+            f"({len(samples) / elapsed:.1f} req/s)"
+        )
+        if sum(throttled.values()):
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{sum(throttled.values())} requests were throttled, "
+                    "users whose registration, token or posts were refused "
+                    "skipped the rest of their steps"
+                )
+            )
@@ -0,0 +1,43 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding and blacklisted tokens in chunks, "
+        "meant to be run periodically (e.g. from cron)"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Number of tokens deleted per transaction",
+        )
+
+    def handle(self, *args, **options) -> None:
+        chunk_size = options["chunk_size"]
+        now = timezone.now()
+        purged = 0
+
+        while True:
+            ids = list(
+                OutstandingToken.objects.filter(expires_at__lte=now)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+
+            with transaction.atomic():
+                BlacklistedToken.objects.filter(token_id__in=ids).delete()
+                OutstandingToken.objects.filter(pk__in=ids).delete()
+            purged += len(ids)
+
+        self.stdout.write(f"Purged {purged} expired tokens")
@@ -0,0 +1,35 @@
+import os
+import time
+from datetime import timedelta
+
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from user.models import ImageUpload
+from user.uploads import discard_upload, incoming_path, upload_setting
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete unfinished chunked uploads and partial files older than "
+        "MEDIA_UPLOADS['EXPIRY'], meant to be run periodically"
+    )
+
+    def handle(self, *args, **options) -> None:
+        expiry = upload_setting("EXPIRY")
+        cutoff = timezone.now() - timedelta(seconds=expiry)
+
+        uploads = ImageUpload.objects.filter(created_at__lt=cutoff)
+        purged = 0
+        for upload in uploads.iterator():
+            discard_upload(upload)
+            purged += 1
+
+        # Files left behind by requests that died while streaming an image.
+        directory = os.path.dirname(incoming_path("."))
+        for entry in os.scandir(directory):
+            if entry.stat().st_mtime < time.time() - expiry:
+                os.remove(entry.path)
+                purged += 1
+
+        self.stdout.write(f"Purged {purged} stale uploads")
@@ -0,0 +1,13 @@
+from django.core.management import BaseCommand
+
+from user.throttling import counter_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete throttle counters of windows that have ended, meant to be "
+        "run periodically"
+    )
+
+    def handle(self, *args, **options) -> None:
+        self.stdout.write(f"Purged {counter_store.purge()} throttle counters")
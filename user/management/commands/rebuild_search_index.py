@@ -0,0 +1,24 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from user.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the user and post search index from scratch"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of documents inserted per query",
+        )
+
+    def handle(self, *args, **options) -> None:
+        with transaction.atomic():
+            indexed = get_search_backend().rebuild(
+                batch_size=options["batch_size"]
+            )
+
+        self.stdout.write(f"Indexed {indexed} documents")
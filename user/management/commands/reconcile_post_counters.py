@@ -0,0 +1,68 @@
+from django.core.management import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from user.models import Post, Like, Dislike
+
+
+def reaction_totals(model) -> Subquery:
+    return Coalesce(
+        Subquery(
+            model.objects.filter(post=OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(total=Count("id"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    help = "Recompute drifted likes_count/dislikes_count on posts"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of posts checked per query",
+        )
+
+    def handle(self, *args, **options) -> None:
+        chunk_size = options["chunk_size"]
+        last_id = 0
+        checked = fixed = 0
+
+        while True:
+            posts = list(
+                Post.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .annotate(
+                    actual_likes=reaction_totals(Like),
+                    actual_dislikes=reaction_totals(Dislike),
+                )
+                .only("id", "likes_count", "dislikes_count")[:chunk_size]
+            )
+            if not posts:
+                break
+
+            drifted = [
+                post.pk
+                for post in posts
+                if post.likes_count != post.actual_likes
+                or post.dislikes_count != post.actual_dislikes
+            ]
+            if drifted:
+                # Recount inside the UPDATE so reactions added since the
+                # check above are not lost.
+                Post.objects.filter(pk__in=drifted).update(
+                    likes_count=reaction_totals(Like),
+                    dislikes_count=reaction_totals(Dislike),
+                )
+
+            checked += len(posts)
+            fixed += len(drifted)
+            last_id = posts[-1].pk
+
+        self.stdout.write(f"Checked {checked} posts, fixed {fixed} counters")
@@ -0,0 +1,167 @@
+import json
+import platform
+import time
+
+import django
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import (
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.utils import timezone
+
+from benchmarks.datasets import SIZES, seed
+from benchmarks.runner import compare, run_endpoints, run_serializers
+from user.blacklist import token_blacklist
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure latency and allocations of every endpoint and of the "
+        "serializers on seeded temporary databases"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--size",
+            nargs="+",
+            choices=SIZES,
+            default=["10k"],
+            help="Dataset sizes (posts) to seed, one database each",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=30,
+            help="Timed requests per endpoint",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=3,
+            help="Untimed requests per endpoint before measuring",
+        )
+        parser.add_argument(
+            "--only",
+            nargs="+",
+            help="Names of the endpoints and serializers to measure",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results as JSON to this file",
+        )
+        parser.add_argument(
+            "--compare",
+            metavar="BASELINE",
+            help=(
+                "Fail on regressions against a results file. Timings "
+                "depend on the machine, write the baseline with --output "
+                "on the same machine before changing the code"
+            ),
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.25,
+            help="Allowed growth over the baseline (0.25 = 25%%)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Rows per bulk INSERT while seeding",
+        )
+
+    def handle(self, *args, **options) -> None:
+        results = {
+            "meta": {
+                "created_at": timezone.now().isoformat(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "iterations": options["iterations"],
+            },
+            "sizes": {},
+        }
+
+        setup_test_environment(debug=False)
+        try:
+            for size in options["size"]:
+                results["sizes"][size] = self.run_size(size, options)
+        finally:
+            teardown_test_environment()
+
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(results, file, indent=2)
+                file.write("\n")
+
+        if options["compare"]:
+            self.compare(results, options["compare"], options["threshold"])
+
+    def run_size(self, size: str, options: dict) -> dict:
+        """Seed a fresh test database, measure, then drop it"""
+        self.stdout.write(f"Seeding {size} posts")
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        token_blacklist.clear()
+        try:
+            started = time.perf_counter()
+            seed(SIZES[size], self.stdout, options["chunk_size"])
+            self.stdout.write(
+                f"Seeded in {time.perf_counter() - started:.1f}s"
+            )
+
+            # Responses are measured without the response cache.
+            with override_settings(RESPONSE_CACHE={"ENABLED": False}):
+                results = {
+                    "endpoints": run_endpoints(
+                        options["iterations"],
+                        options["warmup"],
+                        options["only"],
+                    ),
+                    "serializers": run_serializers(
+                        options["iterations"],
+                        options["warmup"],
+                        options["only"],
+                    ),
+                }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.report(size, results)
+        return results
+
+    def report(self, size: str, results: dict) -> None:
+        self.stdout.write(
+            f"{size:<24} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9} "
+            f"{'peak KiB':>9}"
+        )
+        for section, entries in results.items():
+            for name, metrics in entries.items():
+                self.stdout.write(
+                    f"{section[0]} {name:<22} {metrics['p50_ms']:>9.2f} "
+                    f"{metrics['p95_ms']:>9.2f} {metrics['mean_ms']:>9.2f} "
+                    f"{metrics['peak_kb']:>9.1f}"
+                )
+
+    def compare(self, results: dict, path: str, threshold: float) -> None:
+        with open(path) as file:
+            baseline = json.load(file)
+
+        regressions = compare(results, baseline, threshold)
+        for size, section, name, metric, before, after in regressions:
+            self.stdout.write(
+                f"REGRESSION {size} {section} {name} {metric}: "
+                f"{before} -> {after} (+{(after / before - 1) * 100:.0f}%)"
+            )
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} regressions over {threshold:.0%}"
+            )
+
+        self.stdout.write(f"No regressions over {threshold:.0%}")
@@ -0,0 +1,75 @@
+import time
+from multiprocessing import Pool
+
+import django
+from django.core.management import BaseCommand
+from django.db import connections
+
+from user.jobs import claim_jobs, job_setting, run_job
+
+
+def init_worker() -> None:
+    # Spawned processes start without Django, forked ones must not reuse
+    # the parent's database connections.
+    django.setup()
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (thumbnails, ...)"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=job_setting("PROCESSES"),
+            help="Size of the process pool, 0 runs jobs in this process",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=job_setting("BATCH_SIZE"),
+            help="Number of jobs claimed at once",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty instead of polling",
+        )
+
+    def handle(self, *args, **options) -> None:
+        pool = None
+        if options["processes"] > 0:
+            connections.close_all()
+            pool = Pool(options["processes"], initializer=init_worker)
+
+        try:
+            self.work(pool, options["batch_size"], options["once"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+    def work(self, pool, batch_size: int, once: bool) -> None:
+        done = failed = 0
+
+        while True:
+            jobs = claim_jobs(batch_size)
+            if not jobs:
+                if once:
+                    break
+                time.sleep(job_setting("POLL_INTERVAL"))
+                continue
+
+            if pool is None:
+                results = [run_job(job) for job in jobs]
+            else:
+                results = pool.map(run_job, jobs)
+
+            done += sum(results)
+            failed += len(results) - sum(results)
+
+        self.stdout.write(f"Ran {done} jobs, {failed} failed")
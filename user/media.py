@@ -0,0 +1,194 @@
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.urls import re_path
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from user.storage import is_blob
+
+DEFAULTS = {
+    # Serve MEDIA_URL from Django, turn off when the web server does it.
+    "SERVE": True,
+    # None streams files from Python, "x-sendfile" (Apache, lighttpd) or
+    # "x-accel-redirect" (nginx) hand them to the web server.
+    "SENDFILE": None,
+    # nginx ``internal`` location aliased to MEDIA_ROOT.
+    "ACCEL_REDIRECT_PREFIX": "/protected-media/",
+    "MAX_AGE": 60 * 60,
+    # Content-addressed files never change.
+    "IMMUTABLE_MAX_AGE": 365 * 24 * 60 * 60,
+}
+DIGEST = re.compile(r"[0-9a-f]{64}")
+BYTE_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+def media_setting(name: str):
+    return getattr(settings, "MEDIA_SERVING", {}).get(name, DEFAULTS[name])
+
+
+def media_etag(name: str, stats) -> str:
+    """Strong ETag, the digest for blobs and size/mtime otherwise.
+
+    Stored files are never rewritten in place, a change of contents
+    always comes with a new name or a new mtime.
+    """
+    stem, _ = os.path.splitext(os.path.basename(name))
+    if is_blob(name) and DIGEST.fullmatch(stem):
+        return f'"{stem}"'
+
+    return f'"{stats.st_size:x}-{stats.st_mtime_ns:x}"'
+
+
+def parse_range(header: str, size: int):
+    """The (start, end) bytes of a single range, None for the whole file.
+
+    Raises ``ValueError`` if the range cannot be satisfied. Multiple
+    ranges are answered with the whole file, which RFC 9110 allows.
+    """
+    match = BYTE_RANGE.fullmatch(header.strip())
+    if match is None or match.groups() == ("", ""):
+        return None
+
+    start, end = match.groups()
+    if not start:
+        if int(end) == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - int(end), 0), size - 1
+
+    start = int(start)
+    if end and int(end) < start:
+        return None
+    if start >= size:
+        raise ValueError("Range starts after the end of the file")
+
+    return start, min(int(end), size - 1) if end else size - 1
+
+
+class RangeFile:
+    """Read at most ``length`` bytes of ``file`` from its current position.
+
+    ``fileno`` and ``tell`` let WSGI servers send the range with
+    ``sendfile`` through ``wsgi.file_wrapper``.
+    """
+
+    def __init__(self, file, length: int) -> None:
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+
+        return data
+
+    def tell(self) -> int:
+        return self.file.tell()
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def file_response(request, path: str, size: int, etag: str):
+    if_range = request.headers.get("If-Range")
+    byte_range = None
+    if "Range" in request.headers and if_range in (None, etag):
+        try:
+            byte_range = parse_range(request.headers["Range"], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    file = open(path, "rb")
+    if byte_range is None:
+        return FileResponse(file)
+
+    start, end = byte_range
+    file.seek(start)
+    response = FileResponse(RangeFile(file, end - start + 1), status=206)
+    response["Content-Length"] = end - start + 1
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    return response
+
+
+def sendfile_response(path: str, name: str):
+    content_type, _ = mimetypes.guess_type(name)
+    response = HttpResponse(
+        content_type=content_type or "application/octet-stream"
+    )
+
+    if media_setting("SENDFILE") == "x-accel-redirect":
+        prefix = media_setting("ACCEL_REDIRECT_PREFIX").rstrip("/")
+        response["X-Accel-Redirect"] = f"{prefix}/{name}"
+    else:
+        response["X-Sendfile"] = path
+
+    return response
+
+
+@require_safe
+def serve_media(request, path: str):
+    """Serve a file of MEDIA_ROOT with validators and cache headers.
+
+    Hidden directories hold partial uploads and are never served.
+    """
+    if any(part.startswith(".") for part in path.split("/")):
+        raise Http404
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stats = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+    if not stat.S_ISREG(stats.st_mode):
+        raise Http404
+
+    etag = media_etag(path, stats)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stats.st_mtime)
+    )
+    if response is None:
+        if media_setting("SENDFILE"):
+            response = sendfile_response(full_path, path)
+        else:
+            response = file_response(request, full_path, stats.st_size, etag)
+        response["Accept-Ranges"] = "bytes"
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stats.st_mtime)
+    if is_blob(path):
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=media_setting("IMMUTABLE_MAX_AGE"),
+            immutable=True,
+        )
+    else:
+        patch_cache_control(
+            response, public=True, max_age=media_setting("MAX_AGE")
+        )
+
+    return response
+
+
+def media_urlpatterns() -> list:
+    """URL serving MEDIA_URL, unless the web server is configured to"""
+    if not media_setting("SERVE"):
+        return []
+
+    prefix = re.escape(settings.MEDIA_URL.lstrip("/"))
+    return [re_path(rf"^{prefix}(?P<path>.+)$", serve_media, name="media")]
@@ -0,0 +1,306 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, PermissionDenied
+from django.db import connections
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": True,
+    # Add a Server-Timing header with the db, serializer and total time.
+    "SERVER_TIMING": False,
+    # Log requests slower than this many milliseconds with their queries,
+    # None turns the log (and keeping the SQL) off.
+    "SLOW_REQUEST_MS": None,
+    "SLOW_QUERY_LIMIT": 10,
+    # Upper bounds in seconds of the latency histogram buckets.
+    "BUCKETS": (
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1,
+        2.5,
+        5,
+        10,
+    ),
+    "QUERY_BUCKETS": (1, 2, 3, 5, 10, 20, 50, 100),
+    # Clients allowed to read /metrics, None allows everyone.
+    "ALLOWED_IPS": ("127.0.0.1",),
+}
+
+current_metrics = ContextVar("current_metrics", default=None)
+
+
+def metrics_setting(name: str):
+    return getattr(settings, "METRICS", {}).get(name, DEFAULTS[name])
+
+
+class RequestMetrics:
+    """What a single request spent its time on"""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.view = "unmatched"
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+        self.keep_sql = metrics_setting("SLOW_REQUEST_MS") is not None
+        self.sql = []
+
+    def add_query(self, sql: str, duration: float) -> None:
+        self.queries += 1
+        self.db_time += duration
+        if self.keep_sql:
+            self.sql.append((duration, sql))
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, time.perf_counter() - started)
+
+
+def instrument_connections() -> None:
+    """Time the queries of this thread's connections"""
+    for connection in connections.all():
+        if record_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(record_query)
+
+
+class TimedSerializerMixin:
+    """Add the time spent in ``to_representation`` to the request metrics.
+
+    Nested serializers are part of their parent's time.
+    """
+
+    def to_representation(self, instance):
+        metrics = current_metrics.get()
+        if metrics is None or metrics.serializing:
+            return super().to_representation(instance)
+
+        metrics.serializing = True
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serializing = False
+            metrics.serializer_time += time.perf_counter() - started
+
+
+class Histogram:
+    def __init__(self, buckets) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self, name: str, labels: str):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        cumulative += self.counts[-1]
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}'
+        yield f"{name}_sum{{{labels}}} {self.sum}"
+        yield f"{name}_count{{{labels}}} {cumulative}"
+
+
+HISTOGRAMS = {
+    "http_request_duration_seconds": ("Request latency", "BUCKETS"),
+    "db_query_duration_seconds": ("Database time per request", "BUCKETS"),
+    "serializer_duration_seconds": ("Serializer time per request", "BUCKETS"),
+    "db_queries_per_request": ("Queries per request", "QUERY_BUCKETS"),
+}
+
+
+class MetricsRegistry:
+    """Per-process request metrics, rendered in Prometheus text format.
+
+    Every worker process keeps its own numbers, Prometheus adds them up.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.requests = {}
+            self.histograms = {name: {} for name in HISTOGRAMS}
+
+    def observe(self, metrics: RequestMetrics, method: str, status: int):
+        total = time.perf_counter() - metrics.started
+        values = {
+            "http_request_duration_seconds": total,
+            "db_query_duration_seconds": metrics.db_time,
+            "serializer_duration_seconds": metrics.serializer_time,
+            "db_queries_per_request": metrics.queries,
+        }
+
+        with self.lock:
+            key = (metrics.view, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            for name, value in values.items():
+                histogram = self.histograms[name].get(metrics.view)
+                if histogram is None:
+                    buckets = metrics_setting(HISTOGRAMS[name][1])
+                    histogram = self.histograms[name][
+                        metrics.view
+                    ] = Histogram(buckets)
+                histogram.observe(value)
+
+        return total
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_requests_total Requests by view and status",
+            "# TYPE http_requests_total counter",
+        ]
+        with self.lock:
+            for (view, method, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f'http_requests_total{{view="{view}",method="{method}",'
+                    f'status="{status}"}} {count}'
+                )
+            for name, (description, _) in HISTOGRAMS.items():
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} histogram")
+                for view, histogram in sorted(self.histograms[name].items()):
+                    lines.extend(histogram.samples(name, f'view="{view}"'))
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def view_label(view_func, method: str) -> str:
+    """``PostViewSet.list`` for viewsets, the class or function otherwise"""
+    view_class = getattr(view_func, "cls", None) or getattr(
+        view_func, "view_class", None
+    )
+    if view_class is None:
+        return f"{view_func.__module__}.{view_func.__name__}"
+
+    actions = getattr(view_func, "actions", None) or {}
+    action = actions.get(method.lower())
+    if action:
+        return f"{view_class.__name__}.{action}"
+
+    return view_class.__name__
+
+
+class RequestMetricsMiddleware:
+    """Record query count, database, serializer and total time per view"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metrics_setting("ENABLED"):
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        instrument_connections()
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        # Views reach the database from the thread sync_to_async uses.
+        await sync_to_async(instrument_connections)()
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+
+        return self.finish(request, response, metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = current_metrics.get()
+        if metrics is not None:
+            metrics.view = view_label(view_func, request.method)
+
+    @staticmethod
+    def finish(request, response, metrics: RequestMetrics):
+        total = registry.observe(metrics, request.method, response.status_code)
+
+        if metrics_setting("SERVER_TIMING"):
+            response["Server-Timing"] = (
+                f"db;dur={metrics.db_time * 1000:.1f};"
+                f'desc="{metrics.queries} queries", '
+                f"serialize;dur={metrics.serializer_time * 1000:.1f}, "
+                f"total;dur={total * 1000:.1f}"
+            )
+
+        threshold = metrics_setting("SLOW_REQUEST_MS")
+        if threshold is not None and total * 1000 >= threshold:
+            slowest = sorted(metrics.sql, key=lambda query: -query[0])
+            logger.warning(
+                "Slow request %s %s (%s): %.1f ms, %d queries in %.1f ms, "
+                "serializer %.1f ms\n%s",
+                request.method,
+                request.path,
+                metrics.view,
+                total * 1000,
+                metrics.queries,
+                metrics.db_time * 1000,
+                metrics.serializer_time * 1000,
+                "\n".join(
+                    f"  {duration * 1000:.1f} ms  {sql}"
+                    for duration, sql in slowest[
+                        : metrics_setting("SLOW_QUERY_LIMIT")
+                    ]
+                ),
+            )
+
+        return response
+
+
+def metrics_view(request) -> HttpResponse:
+    allowed = metrics_setting("ALLOWED_IPS")
+    if allowed is not None and request.META.get("REMOTE_ADDR") not in allowed:
+        raise PermissionDenied
+
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4"
+    )
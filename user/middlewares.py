@@ -1,16 +1,45 @@
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
 from django.utils import timezone
 from rest_framework.response import Response
 
+from user.activity import activity_tracker
+from user.authentication import LazyTokenUser
+
 
 class UpdateLastActivityMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request) -> Response:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
         response = self.get_response(request)
+        self.track(request)
+        return response
 
+    async def __acall__(self, request) -> Response:
+        response = await self.get_response(request)
+        # request.user may still be a lazy session lookup and touch() may
+        # flush to the database, both need a sync context.
+        await sync_to_async(self.track)(request)
+        return response
+
+    @staticmethod
+    def track(request) -> None:
         user = request.user
         if user.is_authenticated:
-            user.last_activity = timezone.now()
-            user.save()
-        return response
+            # Token users would have to load the row to read last_activity.
+            stored = (
+                None if isinstance(user, LazyTokenUser) else user.last_activity
+            )
+            activity_tracker.touch(user.pk, timezone.now(), stored=stored)
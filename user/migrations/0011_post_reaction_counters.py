@@ -0,0 +1,43 @@
+# Generated by Django 4.2.5 on 2026-10-17 20:09
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_reactions(apps, schema_editor):
+    Post = apps.get_model("user", "Post")
+
+    for related_model, field in (
+        ("Like", "likes_count"),
+        ("Dislike", "dislikes_count"),
+    ):
+        model = apps.get_model("user", related_model)
+        totals = (
+            model.objects.filter(post=OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(total=Count("id"))
+            .values("total")
+        )
+        Post.objects.update(**{field: Coalesce(Subquery(totals), 0)})
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0010_auto_20230928_1744"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="likes_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="dislikes_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_reactions, migrations.RunPython.noop),
+    ]
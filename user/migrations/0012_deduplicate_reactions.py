@@ -0,0 +1,102 @@
+# Generated by Django 4.2.5 on 2026-10-17 20:40
+
+from django.db import migrations, models
+from django.db.models import Count, Exists, Min, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 500
+
+
+def delete_duplicates(model) -> set:
+    """Keep the oldest row of every (post, user) pair, in batches"""
+    touched_posts = set()
+
+    while True:
+        duplicates = list(
+            model.objects.order_by()
+            .values("post", "user")
+            .annotate(keep=Min("id"), total=Count("id"))
+            .filter(total__gt=1)[:BATCH_SIZE]
+        )
+        if not duplicates:
+            return touched_posts
+
+        pairs = Q()
+        for duplicate in duplicates:
+            pairs |= Q(post=duplicate["post"], user=duplicate["user"])
+            touched_posts.add(duplicate["post"])
+        model.objects.filter(pairs).exclude(
+            id__in=[duplicate["keep"] for duplicate in duplicates]
+        ).delete()
+
+
+def delete_superseded(model, opposite, strict: bool) -> set:
+    """Drop reactions that the same user later replaced with the opposite"""
+    lookup = "created_at__gt" if strict else "created_at__gte"
+    newer = opposite.objects.filter(
+        post=OuterRef("post"),
+        user=OuterRef("user"),
+        **{lookup: OuterRef("created_at")},
+    )
+    touched_posts = set()
+
+    while True:
+        superseded = list(
+            model.objects.filter(Exists(newer)).values_list("id", "post")[
+                :BATCH_SIZE
+            ]
+        )
+        if not superseded:
+            return touched_posts
+
+        model.objects.filter(id__in=[pk for pk, _ in superseded]).delete()
+        touched_posts.update(post for _, post in superseded)
+
+
+def deduplicate(apps, schema_editor):
+    Post = apps.get_model("user", "Post")
+    Like = apps.get_model("user", "Like")
+    Dislike = apps.get_model("user", "Dislike")
+
+    touched_posts = (
+        delete_duplicates(Like)
+        | delete_duplicates(Dislike)
+        | delete_superseded(Like, Dislike, strict=True)
+        | delete_superseded(Dislike, Like, strict=False)
+    )
+
+    touched_posts = list(touched_posts)
+    for model, field in ((Like, "likes_count"), (Dislike, "dislikes_count")):
+        totals = (
+            model.objects.filter(post=OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(total=Count("id"))
+            .values("total")
+        )
+        for start in range(0, len(touched_posts), BATCH_SIZE):
+            Post.objects.filter(
+                pk__in=touched_posts[start : start + BATCH_SIZE]
+            ).update(**{field: Coalesce(Subquery(totals), 0)})
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0011_post_reaction_counters"),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="like",
+            constraint=models.UniqueConstraint(
+                fields=("post", "user"), name="unique_like_per_user"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dislike",
+            constraint=models.UniqueConstraint(
+                fields=("post", "user"), name="unique_dislike_per_user"
+            ),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.5 on 2026-10-17 21:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill(apps, schema_editor):
+    from user.rollups import rebuild_daily_likes
+
+    rebuild_daily_likes(
+        apps.get_model("user", "Like"),
+        apps.get_model("user", "LikeDailyAggregate"),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0012_deduplicate_reactions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LikeDailyAggregate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("likes", models.IntegerField(default=0)),
+                (
+                    "author",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_likes",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "post",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_likes",
+                        to="user.post",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["day"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="likedailyaggregate",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(
+                    ("author__isnull", True), ("post__isnull", True)
+                ),
+                fields=("day",),
+                name="unique_daily_likes_total",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="likedailyaggregate",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("post__isnull", False)),
+                fields=("day", "post"),
+                name="unique_daily_likes_per_post",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="likedailyaggregate",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("author__isnull", False)),
+                fields=("day", "author"),
+                name="unique_daily_likes_per_author",
+            ),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,116 @@
+# Generated by Django 4.2.5 on 2026-10-17 20:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0013_likedailyaggregate"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="likedailyaggregate",
+            name="unique_daily_likes_per_post",
+        ),
+        migrations.RemoveConstraint(
+            model_name="likedailyaggregate",
+            name="unique_daily_likes_per_author",
+        ),
+        migrations.AlterField(
+            model_name="likedailyaggregate",
+            name="author",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="daily_likes",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="likedailyaggregate",
+            name="post",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="daily_likes",
+                to="user.post",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dislike",
+            index=models.Index(
+                fields=["created_at", "id"], name="dislike_created_at_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dislike",
+            index=models.Index(
+                fields=["post", "created_at"],
+                name="dislike_post_created_at_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dislike",
+            index=models.Index(
+                fields=["user", "created_at"],
+                name="dislike_user_created_at_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(
+                fields=["created_at", "id"], name="like_created_at_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(
+                fields=["post", "created_at"], name="like_post_created_at_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(
+                fields=["user", "created_at"], name="like_user_created_at_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["created_at", "id"], name="post_created_at_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["user", "created_at"], name="post_user_created_at_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["first_name", "last_name"], name="user_full_name_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="likedailyaggregate",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("post__isnull", False)),
+                fields=("post", "day"),
+                name="unique_daily_likes_per_post",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="likedailyaggregate",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("author__isnull", False)),
+                fields=("author", "day"),
+                name="unique_daily_likes_per_author",
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.5 on 2026-10-17 22:05
+
+from django.db import migrations
+
+TABLES = {
+    "user_user_fts": (
+        "username, first_name, last_name, bio",
+        "SELECT id, username, first_name, last_name, bio FROM user_user",
+    ),
+    "user_post_fts": (
+        "text, username",
+        "SELECT user_post.id, user_post.text, user_user.username "
+        "FROM user_post INNER JOIN user_user "
+        "ON user_post.user_id = user_user.id",
+    ),
+}
+
+
+def create_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    for table, (columns, select) in TABLES.items():
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {table} USING fts5("
+            f"{columns}, tokenize='trigram')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {table} (rowid, {columns}) {select}"
+        )
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    for table in TABLES:
+        schema_editor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0014_query_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.5 on 2026-10-17 20:44
+
+from django.db import migrations, models
+import user.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0017_imageupload"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaBlob",
+            fields=[
+                (
+                    "name",
+                    models.CharField(
+                        max_length=255, primary_key=True, serialize=False
+                    ),
+                ),
+                ("size", models.PositiveBigIntegerField()),
+                ("refcount", models.PositiveIntegerField(default=1)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="post",
+            name="media_image",
+            field=models.ImageField(
+                null=True,
+                storage=user.models.post_image_storage,
+                upload_to=user.models.post_image_file_path,
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.5 on 2026-10-17 21:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0019_follow_feedentry"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["date_joined"], name="user_date_joined_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.5 on 2026-10-17 22:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0020_user_date_joined_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="fanned_out",
+            field=models.BooleanField(default=True, editable=False),
+        ),
+    ]
@@ -0,0 +1,152 @@
+# Generated by Django 4.2.5 on 2026-10-17 23:40
+
+import json
+
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+FIXTURE = settings.BASE_DIR / "fixture_data.json"
+
+SEARCH_TABLES = {
+    "user_user_fts": (
+        "username, first_name, last_name, bio",
+        "SELECT id, username, first_name, last_name, bio FROM user_user "
+        "WHERE id IN ({})",
+    ),
+    "user_post_fts": (
+        "text, username",
+        "SELECT user_post.id, user_post.text, user_user.username "
+        "FROM user_post INNER JOIN user_user "
+        "ON user_post.user_id = user_user.id WHERE user_post.id IN ({})",
+    ),
+}
+
+
+def build(apps, entry):
+    """An unsaved historical instance and its many-to-many values"""
+    model = apps.get_model(entry["model"])
+    instance = model(pk=model._meta.pk.to_python(entry["pk"]))
+    many_to_many = {}
+
+    for name, value in entry["fields"].items():
+        field = model._meta.get_field(name)
+        if field.many_to_many:
+            many_to_many[name] = value
+        elif field.is_relation:
+            setattr(instance, field.attname, value)
+        else:
+            setattr(instance, field.attname, field.to_python(value))
+
+    return instance, many_to_many
+
+
+def latest_reactions(likes, dislikes) -> list:
+    """The reactions 0012_deduplicate_reactions would have kept"""
+    oldest = [{}, {}]
+    for kept, instances in zip(oldest, (likes, dislikes)):
+        for instance in sorted(instances, key=lambda instance: instance.pk):
+            kept.setdefault((instance.post_id, instance.user_id), instance)
+
+    kept_likes, kept_dislikes = oldest
+    for key, dislike in list(kept_dislikes.items()):
+        like = kept_likes.get(key)
+        if like is None:
+            continue
+        if dislike.created_at > like.created_at:
+            del kept_likes[key]
+        else:
+            del kept_dislikes[key]
+
+    return [*kept_likes.values(), *kept_dislikes.values()]
+
+
+def load_fixture(apps, schema_editor):
+    from user.rollups import rebuild_daily_likes
+
+    with open(FIXTURE) as fixture:
+        entries = json.load(fixture)
+
+    User = apps.get_model("user", "User")
+    user_ids = [
+        entry["pk"] for entry in entries if entry["model"] == "user.user"
+    ]
+    if User.objects.filter(pk__in=user_ids).exists():
+        # Loaded by 0010_auto_20230928_1744 before it became a no-op.
+        return
+
+    rows, reactions = [], {"user.like": [], "user.dislike": []}
+    for entry in entries:
+        if entry["model"] in reactions:
+            reactions[entry["model"]].append(build(apps, entry)[0])
+        else:
+            rows.append(build(apps, entry))
+    rows.extend(
+        (instance, {}) for instance in latest_reactions(*reactions.values())
+    )
+
+    for instance, many_to_many in rows:
+        # Raw, as loaddata does, so auto_now_add keeps the fixture values.
+        instance.save_base(raw=True)
+        for name, value in many_to_many.items():
+            getattr(instance, name).set(value)
+
+    connection = schema_editor.connection
+    models = {type(instance) for instance, _ in rows}
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+
+    Post = apps.get_model("user", "Post")
+    post_ids = [
+        instance.pk
+        for instance, _ in rows
+        if instance._meta.label == "user.Post"
+    ]
+    for related_model, field in (
+        ("Like", "likes_count"),
+        ("Dislike", "dislikes_count"),
+    ):
+        model = apps.get_model("user", related_model)
+        totals = (
+            model.objects.filter(post=OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(total=Count("id"))
+            .values("total")
+        )
+        Post.objects.filter(pk__in=post_ids).update(
+            **{field: Coalesce(Subquery(totals), 0)}
+        )
+
+    rebuild_daily_likes(
+        apps.get_model("user", "Like"),
+        apps.get_model("user", "LikeDailyAggregate"),
+    )
+
+    if connection.vendor != "sqlite":
+        return
+    for (table, (columns, select)), ids in zip(
+        SEARCH_TABLES.items(), (user_ids, post_ids)
+    ):
+        schema_editor.execute(
+            f"INSERT INTO {table} (rowid, {columns}) "
+            + select.format(", ".join(["%s"] * len(ids))),
+            ids,
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0021_post_fanned_out"),
+        ("admin", "0003_logentry_add_action_flag_choices"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("sessions", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(load_fixture, migrations.RunPython.noop),
+    ]
@@ -3,6 +3,7 @@ import uuid
 
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.core.files.storage import storages
 from django.db import models
 from django.utils.text import slugify
 
@@ -13,19 +14,33 @@ class User(AbstractUser):
     last_name = models.CharField(max_length=60)
     bio = models.TextField(blank=True)
     last_activity = models.DateTimeField(null=True)
+    followers_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["first_name", "last_name"]
+        indexes = [
+            models.Index(
+                fields=["first_name", "last_name"], name="user_full_name_idx"
+            ),
+            models.Index(fields=["date_joined"], name="user_date_joined_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.first_name} {self.last_name}"
 
 
+POST_IMAGE_DIR = "media/uploads/users/posts"
+
+
 def post_image_file_path(instance, filename) -> str:
     _, extension = os.path.splitext(filename)
     filename = f"{slugify(instance.user)}-{uuid.uuid4()}{extension}"
 
-    return os.path.join("media/uploads/users/posts", filename)
+    return os.path.join(POST_IMAGE_DIR, filename)
+
+
+def post_image_storage():
+    return storages["post_images"]
 
 
 class Post(models.Model):
@@ -36,18 +51,84 @@ class Post(models.Model):
         on_delete=models.CASCADE,
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    media_image = models.ImageField(null=True, upload_to=post_image_file_path)
+    media_image = models.ImageField(
+        null=True, upload_to=post_image_file_path, storage=post_image_storage
+    )
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    dislikes_count = models.PositiveIntegerField(default=0, editable=False)
+    thumbnails = models.JSONField(default=dict, blank=True, editable=False)
+    # False while the post is held back from the timelines because its
+    # author has too many followers.
+    fanned_out = models.BooleanField(default=True, editable=False)
 
-    @property
-    def likes_count(self):
-        return self.likes.count()
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"], name="post_created_at_idx"
+            ),
+            models.Index(
+                fields=["user", "created_at"], name="post_user_created_at_idx"
+            ),
+        ]
 
-    @property
-    def dislikes_count(self):
-        return self.dislikes.count()
+
+class Follow(models.Model):
+    follower = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="following",
+        on_delete=models.CASCADE,
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="followers",
+        on_delete=models.CASCADE,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["follower", "author"], name="unique_follow"
+            ),
+            models.CheckConstraint(
+                check=~models.Q(follower=models.F("author")),
+                name="no_self_follow",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["author", "follower"], name="follow_author_idx"
+            ),
+        ]
+
+
+class FeedEntry(models.Model):
+    """A post of a followed author in a user's home timeline"""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="feed_entries",
+        on_delete=models.CASCADE,
+    )
+    post = models.ForeignKey(
+        Post, related_name="feed_entries", on_delete=models.CASCADE
+    )
+    # Copy of the post's created_at, timelines are read in this order.
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "post"], name="unique_feed_entry"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "created_at", "post"],
+                name="feed_user_created_at_idx",
+            ),
+        ]
 
 
 class Like(models.Model):
@@ -63,6 +144,24 @@ class Like(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "user"], name="unique_like_per_user"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"], name="like_created_at_idx"
+            ),
+            models.Index(
+                fields=["post", "created_at"],
+                name="like_post_created_at_idx",
+            ),
+            models.Index(
+                fields=["user", "created_at"],
+                name="like_user_created_at_idx",
+            ),
+        ]
 
 
 class Dislike(models.Model):
@@ -78,3 +177,127 @@ class Dislike(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "user"], name="unique_dislike_per_user"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"], name="dislike_created_at_idx"
+            ),
+            models.Index(
+                fields=["post", "created_at"],
+                name="dislike_post_created_at_idx",
+            ),
+            models.Index(
+                fields=["user", "created_at"],
+                name="dislike_user_created_at_idx",
+            ),
+        ]
+
+
+class LikeDailyAggregate(models.Model):
+    """Number of likes per day, in total and optionally per post or author.
+
+    Rows with neither ``post`` nor ``author`` hold the daily total.
+    """
+
+    day = models.DateField()
+    post = models.ForeignKey(
+        Post,
+        null=True,
+        related_name="daily_likes",
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        related_name="daily_likes",
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    likes = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["day"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day"],
+                condition=models.Q(post__isnull=True, author__isnull=True),
+                name="unique_daily_likes_total",
+            ),
+            models.UniqueConstraint(
+                fields=["post", "day"],
+                condition=models.Q(post__isnull=False),
+                name="unique_daily_likes_per_post",
+            ),
+            models.UniqueConstraint(
+                fields=["author", "day"],
+                condition=models.Q(author__isnull=False),
+                name="unique_daily_likes_per_author",
+            ),
+        ]
+
+
+class Job(models.Model):
+    """Unit of background work, run by the ``run_jobs`` command"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=60)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "id"], name="job_status_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class ImageUpload(models.Model):
+    """Resumable upload of a post image, sent in chunks"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="image_uploads",
+        on_delete=models.CASCADE,
+    )
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def is_complete(self) -> bool:
+        return self.offset == self.size
+
+
+class MediaBlob(models.Model):
+    """Reference count of a file in the content-addressed storage"""
+
+    name = models.CharField(max_length=255, primary_key=True)
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
@@ -1,7 +1,203 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class UserPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+def keyset_filter(queryset, cursor, pk: str = "pk"):
+    """Rows of ``queryset`` past ``cursor`` in its direction.
+
+    Newest first, or oldest first for a backwards cursor, ordered by
+    ``created_at`` and the ``pk`` field.
+    """
+    if cursor is None:
+        return queryset.order_by("-created_at", f"-{pk}")
+
+    created_at, position, backwards = cursor
+    if backwards:
+        return queryset.filter(
+            Q(created_at__gt=created_at)
+            | Q(created_at=created_at, **{f"{pk}__gt": position})
+        ).order_by("created_at", pk)
+
+    return queryset.filter(
+        Q(created_at__lt=created_at)
+        | Q(created_at=created_at, **{f"{pk}__lt": position})
+    ).order_by("-created_at", f"-{pk}")
+
+
+class KeysetPagination(BasePagination):
+    """Newest-first keyset pagination over ``(created_at, id)``.
+
+    Pages are selected with an opaque cursor instead of an OFFSET and no
+    total count is computed, so every page costs the same as the first one.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+
+        return min(page_size, self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None) -> list:
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        backwards = cursor is not None and cursor[2]
+
+        results = self.fetch(queryset, cursor, self.page_size + 1)
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+
+        if backwards:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = results
+        return results
+
+    def fetch(self, queryset, cursor, limit: int) -> list:
+        """Up to ``limit`` rows past the cursor, in the cursor's direction"""
+        return list(keyset_filter(queryset, cursor)[:limit])
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            position = json.loads(
+                base64.urlsafe_b64decode(encoded.encode("ascii"))
+            )
+            created_at = parse_datetime(position["c"])
+            pk = int(position["i"])
+            backwards = bool(position.get("r"))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return created_at, pk, backwards
+
+    def encode_cursor(self, instance, backwards: bool) -> str:
+        position = {"c": instance.created_at.isoformat(), "i": instance.pk}
+        if backwards:
+            position["r"] = 1
+
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(position, separators=(",", ":")).encode("ascii")
+        ).decode("ascii")
+
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next or not self.page:
+            return None
+
+        return self.encode_cursor(self.page[-1], backwards=False)
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+
+        return self.encode_cursor(self.page[0], backwards=True)
+
+    def get_paginated_response(self, data) -> Response:
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view) -> list:
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque cursor from a next/previous link",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class PaginationModeMixin:
+    """Switch a view to keyset pagination per request.
+
+    Clients opt in with ``?pagination=cursor`` or by following a cursor
+    link; views can also set ``pagination_class = KeysetPagination``.
+    """
+
+    keyset_pagination_class = KeysetPagination
+    pagination_mode_query_param = "pagination"
+
+    def use_keyset_pagination(self) -> bool:
+        request = getattr(self, "request", None)
+        if request is None:
+            return False
+
+        params = request.query_params
+        return (
+            params.get(self.pagination_mode_query_param) == "cursor"
+            or self.keyset_pagination_class.cursor_query_param in params
+        )
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator") and self.use_keyset_pagination():
+            self._paginator = self.keyset_pagination_class()
+
+        return super().paginator
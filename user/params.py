@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from rest_framework.exceptions import ValidationError
+
+from user.rollups import FIRST_DAY, LAST_DAY
+
+
+def parse_date(params, name: str):
+    value = params.get(name)
+    if not value:
+        return None
+
+    try:
+        day = datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValidationError({name: "Use the YYYY-MM-DD format."})
+    if not FIRST_DAY <= day <= LAST_DAY:
+        raise ValidationError(
+            {name: f"Must be between {FIRST_DAY} and {LAST_DAY}."}
+        )
+
+    return day
+
+
+def parse_date_range(params) -> tuple:
+    """date_from and date_to, inclusive days either of which may be None"""
+    date_from = parse_date(params, "date_from")
+    date_to = parse_date(params, "date_to")
+    if date_from and date_to and date_from > date_to:
+        raise ValidationError({"date_to": "Must not be before date_from."})
+
+    return date_from, date_to
+
+
+def parse_id(params, name: str):
+    value = params.get(name)
+    if not value:
+        return None
+
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: "Must be an integer id."})
+
+
+def parse_choice(params, name: str, choices, default=None):
+    value = params.get(name) or default
+    if value is not None and value not in choices:
+        raise ValidationError({name: f"Use one of {', '.join(choices)}."})
+
+    return value
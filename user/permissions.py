@@ -8,13 +8,15 @@ class ReadOnly(BasePermission):
 
 class IsCreatorOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj) -> bool:
-        return bool(request.method in SAFE_METHODS or obj.user == request.user)
+        return bool(
+            request.method in SAFE_METHODS or obj.user_id == request.user.pk
+        )
 
 
 class IsCreatorOrIsAdmin(BasePermission):
     def has_object_permission(self, request, view, obj) -> bool:
         return bool(
             request.method in SAFE_METHODS
-            or obj.user == request.user
+            or obj.user_id == request.user.pk
             or request.user.is_staff
         )
@@ -0,0 +1,315 @@
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from user.cache import invalidate_many_post_fields, invalidate_post_fields
+from user.models import Post, Like, Dislike
+from user.rollups import add_daily_likes, bump_daily_likes, like_day
+
+DEFAULTS = {
+    # Items accepted by a single bulk reaction request.
+    "BULK_MAX_ITEMS": 500,
+}
+
+COUNTER_FIELDS = {Like: "likes_count", Dislike: "dislikes_count"}
+OPPOSITES = {Like: Dislike, Dislike: Like}
+# Reactions of the bulk endpoint, "none" removes either.
+REACTION_MODELS = {"like": Like, "dislike": Dislike, "none": None}
+
+
+def reaction_setting(name: str):
+    return getattr(settings, "REACTIONS", {}).get(name, DEFAULTS[name])
+
+
+def _db_datetime(value) -> datetime:
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if settings.USE_TZ and timezone.is_naive(value):
+        value = timezone.make_aware(value, dt_timezone.utc)
+
+    return value
+
+
+def _insert_ignore(model, post_id: int, user_id: int, now: datetime) -> bool:
+    """INSERT ... ON CONFLICT DO NOTHING, return whether a row was added.
+
+    The row is selected from the post table, so a missing post inserts
+    nothing instead of failing the foreign key check.
+    """
+    quote = connection.ops.quote_name
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(model._meta.db_table)} "
+            f"({quote('post_id')}, {quote('user_id')}, {quote('created_at')}) "
+            f"SELECT {quote('id')}, %s, %s "
+            f"FROM {quote(Post._meta.db_table)} WHERE {quote('id')} = %s "
+            f"ON CONFLICT ({quote('post_id')}, {quote('user_id')}) DO NOTHING "
+            f"RETURNING {quote('id')}",
+            [user_id, connection.ops.adapt_datetimefield_value(now), post_id],
+        )
+        return cursor.fetchone() is not None
+
+
+def _delete(model, post_id: int, user_id: int) -> list:
+    """Delete a reaction without loading it first.
+
+    Returns the creation times of the deleted rows.
+    """
+    quote = connection.ops.quote_name
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(model._meta.db_table)} "
+            f"WHERE {quote('post_id')} = %s AND {quote('user_id')} = %s "
+            f"RETURNING {quote('created_at')}",
+            [post_id, user_id],
+        )
+        return [_db_datetime(row[0]) for row in cursor.fetchall()]
+
+
+def _bulk_insert_ignore(
+    model, post_ids: list, user_id: int, now: datetime
+) -> set:
+    """Multi-post _insert_ignore(), return the posts that got a row"""
+    if not post_ids:
+        return set()
+
+    quote = connection.ops.quote_name
+    created_at = connection.ops.adapt_datetimefield_value(now)
+    placeholders = ", ".join(["%s"] * len(post_ids))
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(model._meta.db_table)} "
+            f"({quote('post_id')}, {quote('user_id')}, {quote('created_at')}) "
+            f"SELECT {quote('id')}, %s, %s "
+            f"FROM {quote(Post._meta.db_table)} "
+            f"WHERE {quote('id')} IN ({placeholders}) "
+            f"ON CONFLICT ({quote('post_id')}, {quote('user_id')}) DO NOTHING "
+            f"RETURNING {quote('post_id')}",
+            [user_id, created_at, *post_ids],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def _bulk_delete(model, post_ids: list, user_id: int) -> list:
+    """Multi-post _delete(), return (post_id, created_at) of removed rows"""
+    if not post_ids:
+        return []
+
+    quote = connection.ops.quote_name
+    placeholders = ", ".join(["%s"] * len(post_ids))
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(model._meta.db_table)} "
+            f"WHERE {quote('user_id')} = %s "
+            f"AND {quote('post_id')} IN ({placeholders}) "
+            f"RETURNING {quote('post_id')}, {quote('created_at')}",
+            [user_id, *post_ids],
+        )
+        return [
+            (post_id, _db_datetime(created_at))
+            for post_id, created_at in cursor.fetchall()
+        ]
+
+
+def _bulk_update_counters(changes: dict) -> None:
+    """Apply counter deltas to many posts with one UPDATE.
+
+    ``changes`` maps post ids to {model: delta}.
+    """
+    if not changes:
+        return
+
+    quote = connection.ops.quote_name
+    assignments = []
+    params = []
+    for model, field in COUNTER_FIELDS.items():
+        deltas = [
+            (post_id, deltas[model])
+            for post_id, deltas in changes.items()
+            if deltas.get(model)
+        ]
+        if not deltas:
+            continue
+        cases = " ".join(["WHEN %s THEN %s"] * len(deltas))
+        assignments.append(
+            f"{quote(field)} = {quote(field)} + "
+            f"CASE {quote('id')} {cases} ELSE 0 END"
+        )
+        params.extend(value for delta in deltas for value in delta)
+
+    placeholders = ", ".join(["%s"] * len(changes))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {quote(Post._meta.db_table)} "
+            f"SET {', '.join(assignments)} "
+            f"WHERE {quote('id')} IN ({placeholders})",
+            [*params, *changes],
+        )
+
+
+def _update_counters(post_id: int, changes: dict) -> int | None:
+    """Apply counter deltas to a post and return its author id.
+
+    Returns None when the post does not exist.
+    """
+    quote = connection.ops.quote_name
+    assignments = ", ".join(
+        f"{quote(COUNTER_FIELDS[model])} = {quote(COUNTER_FIELDS[model])} + %s"
+        for model in changes
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {quote(Post._meta.db_table)} SET {assignments} "
+            f"WHERE {quote('id')} = %s RETURNING {quote('user_id')}",
+            [*changes.values(), post_id],
+        )
+        row = cursor.fetchone()
+
+    return row[0] if row else None
+
+
+def _update_rollups(
+    post_id: int, author_id: int, added: list, removed: list
+) -> None:
+    for created_at in added:
+        bump_daily_likes(like_day(created_at), post_id, author_id, 1)
+    for created_at in removed:
+        bump_daily_likes(like_day(created_at), post_id, author_id, -1)
+
+
+def add_reaction(model, post_id: int, user_id: int) -> bool:
+    """Add a like or dislike and drop the opposite reaction.
+
+    Repeating a reaction is a no-op costing an INSERT and an existence
+    check. Raises Post.DoesNotExist when the post is missing. Returns
+    whether anything changed.
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        if not _insert_ignore(model, post_id, user_id, now):
+            if not Post.objects.filter(pk=post_id).exists():
+                raise Post.DoesNotExist
+            return False
+
+        opposite = OPPOSITES[model]
+        removed = _delete(opposite, post_id, user_id)
+        author_id = _update_counters(
+            post_id, {model: 1, opposite: -len(removed)}
+        )
+        if author_id is None:
+            raise Post.DoesNotExist
+
+        if model is Like:
+            _update_rollups(post_id, author_id, added=[now], removed=[])
+        else:
+            _update_rollups(post_id, author_id, added=[], removed=removed)
+
+    invalidate_post_fields(post_id, author_id)
+    return True
+
+
+def remove_reaction(model, post_id: int, user_id: int) -> bool:
+    """Remove a like or dislike, return whether it existed"""
+    with transaction.atomic():
+        removed = _delete(model, post_id, user_id)
+        if not removed:
+            return False
+
+        author_id = _update_counters(post_id, {model: -1})
+        if model is Like and author_id is not None:
+            _update_rollups(post_id, author_id, added=[], removed=removed)
+
+    invalidate_post_fields(post_id, author_id)
+    return True
+
+
+def apply_reactions(user_id: int, reactions: dict) -> dict:
+    """Set the user's reaction on many posts in one transaction.
+
+    ``reactions`` maps post ids to Like, Dislike or None to remove both.
+    The posts are checked with one query and every table is written with
+    a single statement. Returns the outcome per post: "created",
+    "removed", "unchanged" or "not_found".
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        # Keeps the posts from being deleted until the writes are done on
+        # backends with row locks, SQLite ignores it. The inserts select
+        # from the post table either way.
+        posts = {
+            post_id: (author_id, username)
+            for post_id, author_id, username in Post.objects.filter(
+                pk__in=list(reactions)
+            )
+            .select_for_update(of=("self",))
+            .values_list("pk", "user_id", "user__username")
+        }
+        added = {}
+        removed = {}
+        for model in COUNTER_FIELDS:
+            added[model] = _bulk_insert_ignore(
+                model,
+                [
+                    post_id
+                    for post_id, wanted in reactions.items()
+                    if wanted is model and post_id in posts
+                ],
+                user_id,
+                now,
+            )
+            removed[model] = _bulk_delete(
+                model,
+                [
+                    post_id
+                    for post_id, wanted in reactions.items()
+                    if wanted is not model and post_id in posts
+                ],
+                user_id,
+            )
+
+        changes = defaultdict(dict)
+        for model in COUNTER_FIELDS:
+            for post_id in added[model]:
+                changes[post_id][model] = 1
+            for post_id, _ in removed[model]:
+                changes[post_id][model] = -1
+        _bulk_update_counters(changes)
+
+        add_daily_likes(
+            [
+                (like_day(now), post_id, posts[post_id][0], 1)
+                for post_id in added[Like]
+            ]
+            + [
+                (like_day(created_at), post_id, posts[post_id][0], -1)
+                for post_id, created_at in removed[Like]
+            ]
+        )
+
+    invalidate_many_post_fields(
+        {post_id: posts[post_id][1] for post_id in changes}
+    )
+
+    results = {}
+    for post_id, wanted in reactions.items():
+        if post_id not in posts:
+            results[post_id] = "not_found"
+        elif wanted is not None and post_id in added[wanted]:
+            results[post_id] = "created"
+        elif wanted is None and post_id in changes:
+            results[post_id] = "removed"
+        else:
+            results[post_id] = "unchanged"
+
+    return results
@@ -0,0 +1,208 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from user.models import LikeDailyAggregate
+
+DEFAULT_DIMENSIONS = ("post", "author")
+
+# Local days whose start, and the start of the day after, stay inside the
+# datetime range in every time zone
+FIRST_DAY = date.min + timedelta(days=1)
+LAST_DAY = date.max - timedelta(days=2)
+
+# Key columns of each dimension's rollup rows and the predicate of its
+# partial unique index on LikeDailyAggregate
+ROLLUP_KEYS = {
+    "total": (("day",), '"author_id" IS NULL AND "post_id" IS NULL'),
+    "post": (("post_id", "day"), '"post_id" IS NOT NULL'),
+    "author": (("author_id", "day"), '"author_id" IS NOT NULL'),
+}
+
+
+def rollup_dimensions() -> tuple:
+    return getattr(settings, "LIKE_ROLLUP_DIMENSIONS", DEFAULT_DIMENSIONS)
+
+
+def rollup_rows(post_id: int, author_id: int) -> list:
+    """Return the (dimension, post_id, author_id) rows a like counts in"""
+    dimensions = rollup_dimensions()
+    rows = [("total", None, None)]
+    if "post" in dimensions:
+        rows.append(("post", post_id, None))
+    if "author" in dimensions:
+        rows.append(("author", None, author_id))
+
+    return rows
+
+
+def bump_daily_likes(
+    day: date, post_id: int, author_id: int, delta: int
+) -> None:
+    """Add ``delta`` likes to every rollup row of a post on ``day``"""
+    add_daily_likes([(day, post_id, author_id, delta)])
+
+
+def add_daily_likes(rows) -> None:
+    """Apply many like deltas, rows are (day, post_id, author_id, delta).
+
+    Deltas are summed per rollup row first. Each dimension then costs one
+    multi-row upsert for the additions and one UPDATE for the
+    subtractions, whatever the number of rows.
+    """
+    totals = defaultdict(int)
+    for day, post_id, author_id, delta in rows:
+        for dimension, row_post_id, row_author_id in rollup_rows(
+            post_id, author_id
+        ):
+            totals[(dimension, day, row_post_id, row_author_id)] += delta
+
+    added = defaultdict(list)
+    subtracted = defaultdict(list)
+    for (dimension, day, post_id, author_id), delta in totals.items():
+        values = {
+            "day": connection.ops.adapt_datefield_value(day),
+            "post_id": post_id,
+            "author_id": author_id,
+        }
+        if delta > 0:
+            added[dimension].append((values, delta))
+        elif delta < 0:
+            subtracted[dimension].append((values, delta))
+
+    for dimension, deltas in added.items():
+        _upsert_daily_likes(dimension, deltas)
+    for dimension, deltas in subtracted.items():
+        _subtract_daily_likes(dimension, deltas)
+
+
+def _upsert_daily_likes(dimension: str, deltas: list) -> None:
+    """Add to the rollup rows of a dimension, creating missing ones"""
+    quote = connection.ops.quote_name
+    table = quote(LikeDailyAggregate._meta.db_table)
+    columns, predicate = ROLLUP_KEYS[dimension]
+    values = ", ".join(["(%s, %s, %s, %s)"] * len(deltas))
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ("day", "post_id", "author_id", "likes") '
+            f"VALUES {values} "
+            f"ON CONFLICT ({', '.join(map(quote, columns))}) "
+            f"WHERE {predicate} "
+            'DO UPDATE SET "likes" = "likes" + excluded."likes"',
+            [
+                value
+                for row, delta in deltas
+                for value in (
+                    row["day"],
+                    row["post_id"],
+                    row["author_id"],
+                    delta,
+                )
+            ],
+        )
+
+
+def _subtract_daily_likes(dimension: str, deltas: list) -> None:
+    """Take likes off existing rollup rows of a dimension with one UPDATE"""
+    quote = connection.ops.quote_name
+    table = quote(LikeDailyAggregate._meta.db_table)
+    columns, predicate = ROLLUP_KEYS[dimension]
+    match = " AND ".join(f"{quote(column)} = %s" for column in columns)
+    keys = [[row[column] for column in columns] for row, _ in deltas]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} SET "likes" = "likes" + CASE '
+            + " ".join([f"WHEN {match} THEN %s"] * len(deltas))
+            + f" ELSE 0 END WHERE {predicate} AND ("
+            + " OR ".join([f"({match})"] * len(deltas))
+            + ")",
+            [
+                *(
+                    value
+                    for key, (_, delta) in zip(keys, deltas)
+                    for value in (*key, delta)
+                ),
+                *(value for key in keys for value in key),
+            ],
+        )
+
+
+def subtract_daily_likes(rows) -> None:
+    """Take likes off the rollups, rows are (day, post_id, author_id, count)"""
+    add_daily_likes(
+        (day, post_id, author_id, -count)
+        for day, post_id, author_id, count in rows
+    )
+
+
+def like_day(created_at) -> date:
+    return timezone.localdate(created_at)
+
+
+def day_start(day: date, tzinfo=None) -> datetime:
+    """Start of a local day, the inverse of like_day()"""
+    return timezone.make_aware(datetime.combine(day, time()), tzinfo)
+
+
+def grouped_likes(likes):
+    """Count likes per (local day, post, author)"""
+    return (
+        likes.order_by()
+        .annotate(day=TruncDate("created_at"))
+        .values_list("day", "post", "post__user")
+        .annotate(count=Count("id"))
+    )
+
+
+def rebuild_daily_likes(
+    like_model, aggregate_model, dimensions=None, batch_size: int = 1000
+) -> int:
+    """Recompute every rollup row from the raw likes table.
+
+    Takes the model classes so that migrations can pass historical ones.
+    """
+    if dimensions is None:
+        dimensions = rollup_dimensions()
+
+    group_by = [((), "total")]
+    if "post" in dimensions:
+        group_by.append((("post",), "post"))
+    if "author" in dimensions:
+        group_by.append((("post__user",), "author"))
+
+    aggregate_model.objects.all().delete()
+    created = 0
+    for fields, dimension in group_by:
+        rows = (
+            like_model.objects.order_by()
+            .annotate(day=TruncDate("created_at"))
+            .values_list("day", *fields)
+            .annotate(count=Count("id"))
+            .iterator(chunk_size=batch_size)
+        )
+        batch = []
+        for day, *keys, count in rows:
+            key = keys[0] if keys else None
+            batch.append(
+                aggregate_model(
+                    day=day,
+                    post_id=key if dimension == "post" else None,
+                    author_id=key if dimension == "author" else None,
+                    likes=count,
+                )
+            )
+            if len(batch) >= batch_size:
+                aggregate_model.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        aggregate_model.objects.bulk_create(batch)
+        created += len(batch)
+
+    return created
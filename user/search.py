@@ -0,0 +1,211 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from user.models import Post
+
+TRIGRAM_LENGTH = 3
+
+
+def search_indexes() -> dict:
+    """Indexed models with their FTS table and column -> lookup mapping"""
+    return {
+        get_user_model(): {
+            "table": "user_user_fts",
+            "columns": {
+                "username": "username",
+                "first_name": "first_name",
+                "last_name": "last_name",
+                "bio": "bio",
+            },
+        },
+        Post: {
+            "table": "user_post_fts",
+            "columns": {"text": "text", "username": "user__username"},
+        },
+    }
+
+
+def lookup_value(instance, lookup: str):
+    for name in lookup.split("__"):
+        instance = getattr(instance, name)
+
+    return instance
+
+
+class SearchBackend:
+    """Full-text search over users and posts.
+
+    ``search`` narrows a queryset by a free-text ``query`` over every
+    indexed column and by per-column ``filters`` (substring matches).
+    When a query is given, results are ordered by relevance.
+    """
+
+    def search(self, queryset, query: str = "", filters=None) -> QuerySet:
+        raise NotImplementedError
+
+    def update(self, instance) -> None:
+        pass
+
+    def update_related(self, user) -> None:
+        """Refresh the posts of a user whose username may have changed"""
+
+    def delete(self, model, pk: int) -> None:
+        pass
+
+    def rebuild(self, batch_size: int = 1000) -> int:
+        return 0
+
+
+class SimpleSearchBackend(SearchBackend):
+    """Unindexed ``icontains`` search, works on every database"""
+
+    def search(self, queryset, query: str = "", filters=None) -> QuerySet:
+        columns = search_indexes()[queryset.model]["columns"]
+
+        for column, value in (filters or {}).items():
+            queryset = queryset.filter(
+                **{f"{columns[column]}__icontains": value}
+            )
+
+        for term in query.split():
+            matches = Q()
+            for lookup in columns.values():
+                matches |= Q(**{f"{lookup}__icontains": term})
+            queryset = queryset.filter(matches)
+
+        return queryset
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    """Search backed by SQLite FTS5 tables with the trigram tokenizer.
+
+    The tables live outside of the ORM and use the model's primary key as
+    rowid. Terms shorter than a trigram cannot be matched by the index,
+    such searches fall back to ``SimpleSearchBackend``.
+    """
+
+    fallback = SimpleSearchBackend()
+
+    @staticmethod
+    def phrase(value: str) -> str:
+        return '"{}"'.format(value.replace('"', '""'))
+
+    def match_expression(self, query: str, filters: dict) -> str:
+        parts = [
+            f"{column} : {self.phrase(value)}"
+            for column, value in filters.items()
+        ]
+        parts.extend(self.phrase(term) for term in query.split())
+
+        return " AND ".join(parts)
+
+    def search(self, queryset, query: str = "", filters=None) -> QuerySet:
+        filters = dict(filters or {})
+        terms = query.split() + list(filters.values())
+        if not terms:
+            return queryset
+        if any(len(term) < TRIGRAM_LENGTH for term in terms):
+            return self.fallback.search(queryset, query, filters)
+
+        quote = connection.ops.quote_name
+        model = queryset.model
+        table = quote(search_indexes()[model]["table"])
+        expression = self.match_expression(query, filters)
+
+        queryset = queryset.filter(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {table} WHERE {table} MATCH %s",
+                [expression],
+            )
+        )
+        if not query.split():
+            return queryset
+
+        rank = RawSQL(
+            f"SELECT rank FROM {table} WHERE {table} MATCH %s "
+            f"AND rowid = {quote(model._meta.db_table)}.{quote('id')}",
+            [expression],
+        )
+
+        return queryset.annotate(search_rank=rank).order_by(
+            "search_rank", *model._meta.ordering
+        )
+
+    def _insert(self, model, rows) -> None:
+        index = search_indexes()[model]
+        table = connection.ops.quote_name(index["table"])
+        columns = ", ".join(index["columns"])
+        placeholders = ", ".join(["%s"] * (len(index["columns"]) + 1))
+
+        sql = f"INSERT INTO {table} (rowid, {columns}) VALUES ({placeholders})"
+
+        with connection.cursor() as cursor:
+            # The debug toolbar's cursor wrapper cannot log executemany().
+            if len(rows) == 1:
+                cursor.execute(sql, rows[0])
+            else:
+                cursor.executemany(sql, rows)
+
+    def update(self, instance) -> None:
+        model = type(instance)
+        columns = search_indexes()[model]["columns"]
+        row = [instance.pk]
+        row.extend(
+            lookup_value(instance, lookup) for lookup in columns.values()
+        )
+
+        self.delete(model, instance.pk)
+        self._insert(model, [row])
+
+    def update_related(self, user) -> None:
+        quote = connection.ops.quote_name
+        table = quote(search_indexes()[Post]["table"])
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET username = %s WHERE rowid IN "
+                f"(SELECT id FROM {quote(Post._meta.db_table)} "
+                "WHERE user_id = %s)",
+                [user.username, user.pk],
+            )
+
+    def delete(self, model, pk: int) -> None:
+        table = connection.ops.quote_name(search_indexes()[model]["table"])
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE rowid = %s", [pk])
+
+    def rebuild(self, batch_size: int = 1000) -> int:
+        indexed = 0
+
+        for model, index in search_indexes().items():
+            table = connection.ops.quote_name(index["table"])
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {table}")
+
+            rows = model.objects.order_by().values_list(
+                "pk", *index["columns"].values()
+            )
+            batch = []
+            for row in rows.iterator(chunk_size=batch_size):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    self._insert(model, batch)
+                    indexed += len(batch)
+                    batch = []
+            if batch:
+                self._insert(model, batch)
+                indexed += len(batch)
+
+        return indexed
+
+
+@lru_cache(maxsize=None)
+def get_search_backend() -> SearchBackend:
+    return import_string(settings.SEARCH_BACKEND)()
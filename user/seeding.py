@@ -0,0 +1,35 @@
+import time
+from itertools import islice
+
+from django.db import transaction
+
+
+def chunked(objects, size: int):
+    objects = iter(objects)
+    while chunk := list(islice(objects, size)):
+        yield chunk
+
+
+def insert(model, objects, chunk_size: int, stdout, **kwargs) -> list:
+    """bulk_create ``objects`` chunk by chunk, one transaction each.
+
+    Returns the new primary keys, none with ``ignore_conflicts``.
+    """
+    started = time.perf_counter()
+    created = []
+    rows = 0
+
+    for chunk in chunked(objects, chunk_size):
+        with transaction.atomic():
+            chunk = model.objects.bulk_create(chunk, **kwargs)
+        rows += len(chunk)
+        if not kwargs.get("ignore_conflicts"):
+            created.extend(obj.pk for obj in chunk)
+
+    elapsed = time.perf_counter() - started
+    stdout.write(
+        f"{model._meta.verbose_name_plural}: {rows} rows "
+        f"in {elapsed:.1f}s ({rows / max(elapsed, 1e-6):.0f} rows/s)"
+    )
+
+    return created
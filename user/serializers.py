@@ -1,10 +1,19 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
 
-from user.models import Post, Like, Dislike
+from user.metrics import TimedSerializerMixin
+from user.models import Post, Like, Dislike, ImageUpload
+from user.reactions import REACTION_MODELS, reaction_setting
+from user.thumbnails import thumbnail_urls
+from user.tokens import CachedBlacklistRefreshToken
+from user.uploads import upload_setting, uploaded_file
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = get_user_model()
         fields = (
@@ -35,6 +44,25 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Add the claims used by ``StatelessJWTAuthentication`` to tokens"""
+
+    token_class = CachedBlacklistRefreshToken
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token["username"] = user.username
+        token["is_staff"] = user.is_staff
+        token["is_superuser"] = user.is_superuser
+
+        return token
+
+
+class CachedBlacklistTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = CachedBlacklistRefreshToken
+
+
 class UserListSerializer(UserSerializer):
     class Meta:
         model = get_user_model()
@@ -55,10 +83,11 @@ class UserDetailSerializer(UserSerializer):
             "first_name",
             "last_name",
             "bio",
+            "followers_count",
         )
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Post
         fields = ("id", "text", "user")
@@ -68,6 +97,10 @@ class PostListSerializer(PostSerializer):
     user_username = serializers.CharField(
         source="user.username", read_only=True
     )
+    thumbnails = serializers.SerializerMethodField()
+    upload = serializers.PrimaryKeyRelatedField(
+        queryset=ImageUpload.objects.all(), write_only=True, required=False
+    )
 
     class Meta:
         model = Post
@@ -76,9 +109,36 @@ class PostListSerializer(PostSerializer):
             "user_username",
             "text",
             "media_image",
+            "upload",
+            "thumbnails",
             "created_at",
+            "likes_count",
+            "dislikes_count",
         )
 
+    def get_thumbnails(self, post) -> dict:
+        return thumbnail_urls(post, self.context.get("request"))
+
+    def validate_upload(self, upload):
+        if upload.user_id != self.context["request"].user.pk:
+            raise serializers.ValidationError("Upload not found.")
+        if not upload.is_complete:
+            raise serializers.ValidationError("Upload is not complete.")
+
+        return upload
+
+    def save(self, **kwargs):
+        """Use a finished chunked upload as the post's image"""
+        upload = self.validated_data.pop("upload", None)
+        if upload is None:
+            return super().save(**kwargs)
+
+        with uploaded_file(upload) as media_image:
+            post = super().save(media_image=media_image, **kwargs)
+        upload.delete()
+
+        return post
+
 
 class PostDetailSerializer(PostListSerializer):
     class Meta:
@@ -93,13 +153,28 @@ class PostDetailSerializer(PostListSerializer):
         )
 
 
-class LikeSerializer(serializers.ModelSerializer):
+class ImageUploadSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = ImageUpload
+        fields = ("id", "filename", "size", "offset", "created_at")
+        read_only_fields = ("offset",)
+
+    def validate_size(self, size: int) -> int:
+        if size > upload_setting("MAX_SIZE"):
+            raise serializers.ValidationError(
+                f"Image is larger than {upload_setting('MAX_SIZE')} bytes."
+            )
+
+        return size
+
+
+class LikeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Like
         fields = ("id", "created_at")
 
 
-class LikeListSerializer(serializers.ModelSerializer):
+class LikeListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     post = PostSerializer(many=False, read_only=True)
     username = serializers.CharField(source="user.username", read_only=True)
 
@@ -108,7 +183,30 @@ class LikeListSerializer(serializers.ModelSerializer):
         fields = ("id", "username", "post", "created_at")
 
 
-class DislikeSerializer(serializers.ModelSerializer):
+class DislikeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Dislike
         fields = ("id", "created_at")
+
+
+class ReactionItemSerializer(serializers.Serializer):
+    post_id = serializers.IntegerField(min_value=1)
+    reaction = serializers.ChoiceField(choices=tuple(REACTION_MODELS))
+
+
+class BulkReactionSerializer(serializers.Serializer):
+    reactions = ReactionItemSerializer(many=True, allow_empty=False)
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # Checked before any item is validated.
+        self.fields["reactions"].max_length = reaction_setting(
+            "BULK_MAX_ITEMS"
+        )
+
+    def validate_reactions(self, items: list) -> list:
+        post_ids = {item["post_id"] for item in items}
+        if len(post_ids) != len(items):
+            raise serializers.ValidationError("Send each post only once.")
+
+        return items
@@ -0,0 +1,288 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, Q, QuerySet
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from user.authentication import forget_user_status
+from user.cache import (
+    bump,
+    invalidate_post,
+    invalidate_post_fields,
+    invalidate_user,
+)
+from user.feed import (
+    CATCH_UP_JOB_KIND as CATCH_UP_JOB,
+    JOB_KIND as FAN_OUT_JOB,
+    feed_setting,
+)
+from user.jobs import enqueue, enqueue_once
+from user.models import Post, Like, Dislike
+from user.reactions import COUNTER_FIELDS
+from user.rollups import (
+    bump_daily_likes,
+    grouped_likes,
+    like_day,
+    subtract_daily_likes,
+)
+from user.search import get_search_backend, search_indexes
+from user.thumbnails import JOB_KIND as THUMBNAILS_JOB, delete_thumbnails
+
+PUBLIC_USER_FIELDS = {"username", "first_name", "last_name", "bio"}
+
+
+def deleted_via(origin, model) -> bool:
+    """Check whether a delete cascade was started from ``model``"""
+    if isinstance(origin, QuerySet):
+        return issubclass(origin.model, model)
+
+    return isinstance(origin, model)
+
+
+def bump_counter(model, post_id: int, delta: int) -> None:
+    field = COUNTER_FIELDS[model]
+    Post.objects.filter(pk=post_id).update(**{field: F(field) + delta})
+
+
+def author_username(post) -> str:
+    """Username of the post's author, loaded once for all the handlers.
+
+    Posts built with ``user_id`` get the author cached with only the
+    username, which the search backend's lookups then read as well.
+    """
+    field = Post._meta.get_field("user")
+    if not field.is_cached(post):
+        field.set_cached_value(
+            post,
+            get_user_model().objects.only("username").get(pk=post.user_id),
+        )
+
+    return post.user.username
+
+
+def post_author(post_id: int) -> int:
+    return Post.objects.filter(pk=post_id).values_list("user", flat=True)[0]
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_save, sender=Dislike)
+def reaction_created(sender, instance, created, raw=False, **kwargs) -> None:
+    if created and not raw:
+        bump_counter(sender, instance.post_id, 1)
+
+        if sender is Like:
+            bump_daily_likes(
+                like_day(instance.created_at),
+                instance.post_id,
+                post_author(instance.post_id),
+                1,
+            )
+
+
+@receiver(post_delete, sender=Like)
+@receiver(post_delete, sender=Dislike)
+def reaction_deleted(sender, instance, origin=None, **kwargs) -> None:
+    # Cascades from a post or a user are handled in bulk by post_deleted()
+    # and user_deleted().
+    if deleted_via(origin, Post) or deleted_via(origin, get_user_model()):
+        return
+
+    bump_counter(sender, instance.post_id, -1)
+
+    if sender is Like:
+        bump_daily_likes(
+            like_day(instance.created_at),
+            instance.post_id,
+            post_author(instance.post_id),
+            -1,
+        )
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs) -> None:
+    """Take the post's likes off the daily totals"""
+    subtract_daily_likes(grouped_likes(Like.objects.filter(post=instance)))
+
+
+@receiver(pre_delete, sender=get_user_model())
+def user_deleted(sender, instance, **kwargs) -> None:
+    """Take the user's reactions and follows off other authors"""
+    for model, field in COUNTER_FIELDS.items():
+        reactions = (
+            model.objects.filter(user=instance)
+            .exclude(post__user=instance)
+            .values("post")
+            .annotate(total=Count("id"))
+        )
+        for reaction in reactions:
+            Post.objects.filter(pk=reaction["post"]).update(
+                **{field: F(field) - reaction["total"]}
+            )
+
+    subtract_daily_likes(
+        grouped_likes(
+            Like.objects.filter(user=instance).exclude(post__user=instance)
+        )
+    )
+
+    followed = get_user_model().objects.filter(followers__follower=instance)
+    followed.update(followers_count=F("followers_count") - 1)
+    for author_id in followed.filter(
+        followers_count=feed_setting("FANOUT_LIMIT") - 1
+    ).values_list("pk", flat=True):
+        enqueue(CATCH_UP_JOB, author_id=author_id)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_save, sender=Post)
+def search_document_saved(
+    sender, instance, raw=False, update_fields=None, **kwargs
+) -> None:
+    if raw:
+        return
+
+    columns = search_indexes()[sender]["columns"].values()
+    indexed_fields = {lookup.split("__")[0] for lookup in columns}
+    if update_fields is not None and not indexed_fields & set(update_fields):
+        return
+
+    backend = get_search_backend()
+    if sender is Post:
+        author_username(instance)
+    backend.update(instance)
+    if sender is not Post:
+        backend.update_related(instance)
+
+
+@receiver(post_delete, sender=get_user_model())
+@receiver(post_delete, sender=Post)
+def search_document_deleted(sender, instance, **kwargs) -> None:
+    get_search_backend().delete(sender, instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def post_cache_saved(sender, instance, created, raw=False, **kwargs) -> None:
+    if not raw:
+        invalidate_post(instance.pk, author_username(instance), created)
+
+
+@receiver(post_delete, sender=Post)
+def post_cache_deleted(sender, instance, origin=None, **kwargs) -> None:
+    if deleted_via(origin, get_user_model()):
+        # The author is gone already, user_cache_deleted() drops the lists.
+        bump(f"post:{instance.pk}")
+    else:
+        invalidate_post(instance.pk, author_username(instance), True)
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_save, sender=Dislike)
+@receiver(post_delete, sender=Like)
+@receiver(post_delete, sender=Dislike)
+def reaction_cache_changed(
+    sender, instance, raw=False, origin=None, **kwargs
+) -> None:
+    # Cascades are handled by post_cache_deleted() and user_cache_deleted().
+    if raw or deleted_via(origin, (Post, get_user_model())):
+        return
+
+    invalidate_post_fields(instance.post_id)
+
+
+@receiver(post_save, sender=get_user_model())
+def user_cache_saved(
+    sender, instance, created, raw=False, update_fields=None, **kwargs
+) -> None:
+    if raw:
+        return
+    if update_fields is not None and not PUBLIC_USER_FIELDS & set(
+        update_fields
+    ):
+        return
+
+    invalidate_user(instance.pk, posts=not created)
+
+
+@receiver(pre_delete, sender=get_user_model())
+def user_cache_deleted(sender, instance, **kwargs) -> None:
+    """Drop the user and the posts whose counters lose the user's reactions"""
+    reacted = Post.objects.filter(
+        Q(likes__user=instance) | Q(dislikes__user=instance)
+    ).exclude(user=instance)
+
+    bump(*{f"post:{pk}" for pk in reacted.values_list("pk", flat=True)})
+    invalidate_user(instance.pk, posts=True)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def user_status_changed(
+    sender, instance, update_fields=None, **kwargs
+) -> None:
+    if update_fields is None or "is_active" in update_fields:
+        forget_user_status(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, raw=False, **kwargs) -> None:
+    """Queue the copy of a new post into the followers' timelines"""
+    if created and not raw:
+        enqueue(FAN_OUT_JOB, post_id=instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def post_image_saved(sender, instance, raw=False, **kwargs) -> None:
+    image = instance.media_image
+    if raw or not image:
+        return
+
+    # The job reads the image when it runs, a pending one covers any save.
+    if instance.thumbnails.get("source") != image.name:
+        enqueue_once(THUMBNAILS_JOB, post_id=instance.pk)
+
+
+def release_image(storage, name: str) -> None:
+    """Drop the post's reference to an image once the change is committed"""
+
+    def release() -> None:
+        storage.delete(name)
+        if not storage.exists(name):
+            delete_thumbnails(name)
+
+    transaction.on_commit(release)
+
+
+@receiver(pre_save, sender=Post)
+def post_image_replaced(
+    sender, instance, raw=False, update_fields=None, **kwargs
+) -> None:
+    instance._replaced_image = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and "media_image" not in update_fields:
+        return
+
+    stored = (
+        Post.objects.filter(pk=instance.pk)
+        .values_list("media_image", flat=True)
+        .first()
+    )
+    if stored and stored != instance.media_image.name:
+        instance._replaced_image = stored
+
+
+@receiver(post_save, sender=Post)
+def post_image_released(sender, instance, **kwargs) -> None:
+    if getattr(instance, "_replaced_image", None):
+        release_image(instance.media_image.storage, instance._replaced_image)
+
+
+@receiver(post_delete, sender=Post)
+def post_image_deleted(sender, instance, **kwargs) -> None:
+    if instance.media_image:
+        release_image(instance.media_image.storage, instance.media_image.name)
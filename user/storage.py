@@ -0,0 +1,189 @@
+import hashlib
+import os
+import tempfile
+import time
+from itertools import islice
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, transaction
+from django.utils import timezone
+
+DEFAULTS = {
+    "DIRECTORY": "media/blobs",
+    # Characters of the digest used per directory level.
+    "SHARDS": (2, 2),
+    # Seconds before a file without a MediaBlob row counts as orphaned.
+    "ORPHAN_AGE": 24 * 60 * 60,
+}
+
+
+def blob_setting(name: str):
+    return getattr(settings, "MEDIA_BLOBS", {}).get(name, DEFAULTS[name])
+
+
+def blob_name(digest: str, extension: str) -> str:
+    """``media/blobs/ab/cd/abcd...ef.png`` for a sha256 ``digest``"""
+    shards, start = [], 0
+    for length in blob_setting("SHARDS"):
+        shards.append(digest[start : start + length])
+        start += length
+
+    return os.path.join(
+        blob_setting("DIRECTORY"), *shards, f"{digest}{extension.lower()}"
+    )
+
+
+def is_blob(name: str) -> bool:
+    return name.startswith(blob_setting("DIRECTORY") + "/")
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(64 * 1024), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def blob_model():
+    # Post.media_image creates the storage while user.models is imported.
+    return apps.get_model("user", "MediaBlob")
+
+
+def acquire(name: str, size: int) -> int:
+    """Add a reference to a blob, return its reference count"""
+    table = connection.ops.quote_name(blob_model()._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ("name", "size", "refcount", "created_at") '
+            "VALUES (%s, %s, 1, %s) "
+            'ON CONFLICT ("name") DO UPDATE SET "refcount" = "refcount" + 1 '
+            'RETURNING "refcount"',
+            [
+                name,
+                size,
+                connection.ops.adapt_datetimefield_value(timezone.now()),
+            ],
+        )
+        return cursor.fetchone()[0]
+
+
+def release(name: str):
+    """Drop a reference to a blob, return the references left.
+
+    ``None`` means the file is not a tracked blob.
+    """
+    table = connection.ops.quote_name(blob_model()._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} SET "refcount" = "refcount" - 1 '
+            'WHERE "name" = %s AND "refcount" > 0 RETURNING "refcount"',
+            [name],
+        )
+        row = cursor.fetchone()
+
+    if row is None:
+        return None
+    if row[0] == 0:
+        blob_model().objects.filter(name=name, refcount=0).delete()
+
+    return row[0]
+
+
+def orphaned_blobs(storage, age: int, batch_size: int = 500):
+    """Names of blob files older than ``age`` seconds without a MediaBlob.
+
+    A save rolled back by an outer transaction leaves its file behind.
+    """
+    root = storage.path(blob_setting("DIRECTORY"))
+    cutoff = time.time() - age
+
+    def old_files():
+        for directory, subdirectories, files in os.walk(root):
+            # Spooled uploads that are still being hashed.
+            subdirectories[:] = [
+                name for name in subdirectories if name != ".tmp"
+            ]
+            for file in files:
+                path = os.path.join(directory, file)
+                if os.path.getmtime(path) < cutoff:
+                    yield os.path.relpath(path, storage.location).replace(
+                        os.sep, "/"
+                    )
+
+    files = old_files()
+    while batch := list(islice(files, batch_size)):
+        known = set(
+            blob_model()
+            .objects.filter(name__in=batch)
+            .values_list("name", flat=True)
+        )
+        yield from (name for name in batch if name not in known)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Store each distinct file once, named after its sha256.
+
+    ``save`` adds a reference to the blob and ``delete`` only removes the
+    file once the last reference is gone. Uploads that were hashed while
+    they were received carry the digest in ``sha256``. Files of saves
+    whose transaction rolls back are removed by ``dedupe_media``.
+    """
+
+    def get_available_name(self, name, max_length=None) -> str:
+        # Equal names mean equal contents, they never need a suffix.
+        return name
+
+    def _save(self, name, content) -> str:
+        _, extension = os.path.splitext(name)
+        spooled = None
+        if hasattr(content, "temporary_file_path"):
+            source = content.temporary_file_path()
+            digest = getattr(content, "sha256", None) or file_sha256(source)
+        else:
+            spooled, digest = self.spool(content)
+            source = spooled
+
+        name = blob_name(digest, extension)
+        full_path = self.path(name)
+        try:
+            with transaction.atomic():
+                # The row is locked until the file exists, so a concurrent
+                # ``delete`` of the last reference cannot remove it.
+                acquire(name, os.path.getsize(source))
+                if os.path.exists(full_path):
+                    # Keeps it young for ``orphaned_blobs`` until the
+                    # reference is committed.
+                    os.utime(full_path)
+                else:
+                    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                    file_move_safe(source, full_path, allow_overwrite=True)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(full_path, self.file_permissions_mode)
+        finally:
+            if spooled is not None and os.path.exists(spooled):
+                os.remove(spooled)
+
+        return name
+
+    def spool(self, content) -> tuple:
+        """Copy ``content`` next to the blobs, hashing it on the way"""
+        directory = self.path(os.path.join(blob_setting("DIRECTORY"), ".tmp"))
+        os.makedirs(directory, exist_ok=True)
+
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(dir=directory, delete=False) as file:
+            for chunk in content.chunks():
+                digest.update(chunk)
+                file.write(chunk)
+
+        return file.name, digest.hexdigest()
+
+    def delete(self, name) -> None:
+        with transaction.atomic():
+            if not release(name):
+                super().delete(name)
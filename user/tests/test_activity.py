@@ -0,0 +1,125 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from user.activity import ActivityTracker, activity_tracker
+from user.models import User
+
+USER_ACTIVITY_URL = reverse("user:activity")
+
+
+def test_user(**params) -> User:
+    defaults = {
+        "username": "test_username",
+        "email": "test@test.com",
+        "password": "test1234",
+        "first_name": "test_first_name",
+        "last_name": "test_last_name",
+    }
+    defaults.update(**params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+@override_settings(
+    ACTIVITY_TRACKING={
+        "FLUSH_INTERVAL": 3600,
+        "FLUSH_THRESHOLD": 2,
+        "GRANULARITY": 60,
+        "BATCH_SIZE": 500,
+    }
+)
+class ActivityTrackerTests(TestCase):
+    def setUp(self) -> None:
+        self.tracker = ActivityTracker()
+        self.user1 = test_user()
+        self.user2 = test_user(username="spider", email="test2@test.com")
+
+    def test_touch_is_buffered_until_threshold(self) -> None:
+        now = timezone.now()
+
+        self.tracker.touch(self.user1.pk, now)
+        self.user1.refresh_from_db()
+
+        self.assertIsNone(self.user1.last_activity)
+        self.assertEqual(self.tracker.last_seen(self.user1.pk), now)
+
+    def test_threshold_flushes_in_one_update(self) -> None:
+        now = timezone.now()
+        self.tracker.touch(self.user1.pk, now)
+
+        with self.assertNumQueries(1):
+            self.tracker.touch(self.user2.pk, now + timedelta(seconds=1))
+
+        self.user1.refresh_from_db()
+        self.user2.refresh_from_db()
+        self.assertEqual(self.user1.last_activity, now)
+        self.assertEqual(self.user2.last_activity, now + timedelta(seconds=1))
+        self.assertIsNone(self.tracker.last_seen(self.user1.pk))
+
+    def test_touch_within_granularity_is_skipped(self) -> None:
+        now = timezone.now()
+
+        self.tracker.touch(
+            self.user1.pk,
+            now,
+            stored=now - timedelta(seconds=10),
+        )
+        self.tracker.touch(self.user2.pk, now)
+        self.tracker.touch(self.user2.pk, now + timedelta(seconds=5))
+
+        self.assertIsNone(self.tracker.last_seen(self.user1.pk))
+        self.assertEqual(self.tracker.last_seen(self.user2.pk), now)
+
+    @mock.patch("user.activity.threading.Timer")
+    def test_timer_flushes_when_requests_stop(self, timer) -> None:
+        now = timezone.now()
+        self.tracker.touch(self.user1.pk, now)
+        self.tracker.touch(self.user1.pk, now + timedelta(seconds=5))
+
+        timer.assert_called_once_with(3600, self.tracker._flush_idle)
+        timer.return_value.start.assert_called_once_with()
+
+        # The timer thread owns its connection, the test's is kept open.
+        with mock.patch.object(
+            connection, "is_in_memory_db", return_value=False
+        ), mock.patch.object(connection, "close"):
+            self.tracker._flush_idle()
+
+        self.user1.refresh_from_db()
+        self.assertEqual(self.user1.last_activity, now)
+
+
+@override_settings(
+    ACTIVITY_TRACKING={
+        "FLUSH_INTERVAL": 3600,
+        "FLUSH_THRESHOLD": 100,
+        "GRANULARITY": 60,
+        "BATCH_SIZE": 500,
+    }
+)
+class ActivityApiTests(TestCase):
+    def setUp(self) -> None:
+        activity_tracker.clear()
+        self.client = APIClient()
+        self.user = test_user()
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self) -> None:
+        activity_tracker.clear()
+
+    def test_activity_reads_buffered_value(self) -> None:
+        self.client.get(USER_ACTIVITY_URL)
+        buffered = activity_tracker.last_seen(self.user.pk)
+
+        response = self.client.get(USER_ACTIVITY_URL)
+
+        self.assertIsNotNone(buffered)
+        self.assertEqual(
+            response.data["test_username's last request"], buffered
+        )
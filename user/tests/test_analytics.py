@@ -0,0 +1,234 @@
+from datetime import timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.models import User, Post, Like, Dislike, LikeDailyAggregate
+
+ANALYTICS_URL = reverse("user:analytics")
+
+
+def test_user(**params) -> User:
+    defaults = {
+        "username": "test_username",
+        "email": "test@test.com",
+        "password": "test1234",
+        "first_name": "test_first_name",
+        "last_name": "test_last_name",
+    }
+    defaults.update(**params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def like_url(post_id: int):
+    return reverse("user:post-like", args=[post_id])
+
+
+class LikeAnalyticsApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = test_user()
+        self.author = test_user(username="spider", email="test2@test.com")
+        self.client.force_authenticate(self.user)
+        self.post1 = Post.objects.create(text="post 1", user=self.author)
+        self.post2 = Post.objects.create(text="post 2", user=self.author)
+        self.today = timezone.localdate()
+
+    def get_analytics(self, **params):
+        params.setdefault("date_from", self.today.isoformat())
+        return self.client.get(ANALYTICS_URL, params)
+
+    def test_likes_are_counted_per_day(self) -> None:
+        self.client.post(like_url(self.post1.id))
+        self.client.post(like_url(self.post2.id))
+        self.client.post(like_url(self.post2.id))
+
+        response = self.get_analytics()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["totals"], {"likes": 2})
+        self.assertEqual(
+            response.data["series"]["likes"],
+            [{"bucket": self.today, "count": 2}],
+        )
+
+    def test_filter_by_post_and_author(self) -> None:
+        self.client.post(like_url(self.post1.id))
+        self.client.post(like_url(self.post2.id))
+
+        response1 = self.get_analytics(post=self.post1.id)
+        response2 = self.get_analytics(author=self.author.id)
+        response3 = self.get_analytics(author=self.user.id)
+
+        self.assertEqual(response1.data["totals"]["likes"], 1)
+        self.assertEqual(response2.data["totals"]["likes"], 2)
+        self.assertEqual(response3.data["totals"]["likes"], 0)
+
+    def test_unlike_and_post_delete_are_subtracted(self) -> None:
+        self.client.post(like_url(self.post1.id))
+        self.client.post(like_url(self.post2.id))
+        Like.objects.create(post=self.post2, user=self.author)
+
+        self.client.delete(like_url(self.post1.id))
+        self.post2.delete()
+
+        response = self.get_analytics()
+
+        self.assertEqual(response.data["totals"]["likes"], 0)
+
+    def test_range_excludes_other_days(self) -> None:
+        self.client.post(like_url(self.post1.id))
+
+        yesterday = (self.today - timedelta(days=1)).isoformat()
+
+        response = self.get_analytics(date_from=yesterday, date_to=yesterday)
+
+        self.assertEqual(response.data["totals"]["likes"], 0)
+        self.assertEqual(response.data["series"]["likes"], [])
+
+    def test_metrics_grouped_by_author(self) -> None:
+        self.client.post(like_url(self.post1.id))
+        self.client.post(reverse("user:post-dislike", args=[self.post2.id]))
+
+        response = self.get_analytics(
+            metrics="likes,dislikes,posts", group_by="author"
+        )
+
+        row = {"bucket": self.today, "author": self.author.id}
+        self.assertEqual(
+            response.data["series"],
+            {
+                "likes": [{**row, "count": 1}],
+                "dislikes": [{**row, "count": 1}],
+                "posts": [{**row, "count": 2}],
+            },
+        )
+
+    def test_rollups_and_raw_rows_agree(self) -> None:
+        self.client.post(like_url(self.post1.id))
+        self.client.post(like_url(self.post2.id))
+
+        # Grouping by post with an author filter needs the raw likes.
+        rollups = self.get_analytics(group_by="post")
+        raw = self.get_analytics(group_by="post", author=self.author.id)
+
+        self.assertEqual(len(rollups.data["series"]["likes"]), 2)
+        self.assertEqual(
+            rollups.data["series"]["likes"], raw.data["series"]["likes"]
+        )
+
+    def test_hourly_buckets_in_time_zone(self) -> None:
+        self.client.post(like_url(self.post1.id))
+        like = Like.objects.get(post=self.post1)
+
+        response = self.get_analytics(
+            metrics="likes,users",
+            interval="hour",
+            tz="UTC",
+            date_from=(self.today - timedelta(days=1)).isoformat(),
+            date_to=(self.today + timedelta(days=1)).isoformat(),
+        )
+
+        hour = like.created_at.astimezone(dt_timezone.utc).replace(
+            minute=0, second=0, microsecond=0
+        )
+        self.assertEqual(response.data["timezone"], "UTC")
+        self.assertEqual(
+            response.data["series"]["likes"], [{"bucket": hour, "count": 1}]
+        )
+        self.assertEqual(response.data["totals"]["users"], 2)
+
+    def test_half_hour_time_zone(self) -> None:
+        self.client.post(reverse("user:post-dislike", args=[self.post1.id]))
+        dislike = Dislike.objects.get(post=self.post1)
+        kolkata = ZoneInfo("Asia/Kolkata")
+        day = timezone.localdate(dislike.created_at, kolkata)
+
+        response = self.get_analytics(
+            metrics="dislikes",
+            tz="Asia/Kolkata",
+            date_from=day.isoformat(),
+            date_to=day.isoformat(),
+        )
+
+        self.assertEqual(
+            response.data["series"]["dislikes"],
+            [{"bucket": day, "count": 1}],
+        )
+
+    def test_weekly_buckets_start_on_monday(self) -> None:
+        self.client.post(like_url(self.post1.id))
+
+        response = self.get_analytics(interval="week")
+
+        monday = self.today - timedelta(days=self.today.weekday())
+        self.assertEqual(
+            response.data["series"]["likes"],
+            [{"bucket": monday, "count": 1}],
+        )
+
+    def test_default_range(self) -> None:
+        response = self.client.get(ANALYTICS_URL)
+
+        self.assertEqual(response.data["date_to"], self.today)
+        self.assertEqual(
+            response.data["date_from"], self.today - timedelta(days=89)
+        )
+
+    def test_range_near_the_first_day(self) -> None:
+        response = self.client.get(
+            ANALYTICS_URL,
+            {"date_to": "0001-01-05", "tz": "Pacific/Kiritimati"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["date_from"].isoformat(), "0001-01-02")
+
+    def test_invalid_params(self) -> None:
+        for params in (
+            {"date_from": "28.09.2023"},
+            {"metrics": "likes,views"},
+            {"interval": "minute"},
+            {"tz": "Mars/Olympus"},
+            {"metrics": "users", "group_by": "author"},
+            {"metrics": "posts", "post": self.post1.id},
+            {"date_from": "0001-01-01", "metrics": "posts"},
+            {"date_to": "9999-12-31"},
+            {"date_from": "2000-01-01"},
+            {"date_from": self.today + timedelta(days=1)},
+        ):
+            with self.subTest(params=params):
+                response = self.get_analytics(**params)
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+
+    def test_backfill_matches_incremental_rollups(self) -> None:
+        self.client.post(like_url(self.post1.id))
+        Like.objects.create(post=self.post1, user=self.author)
+        self.client.post(like_url(self.post2.id))
+        self.client.delete(like_url(self.post2.id))
+        rows = set(
+            LikeDailyAggregate.objects.filter(likes__gt=0).values_list(
+                "day", "post", "author", "likes"
+            )
+        )
+
+        call_command("backfill_like_rollups", stdout=StringIO())
+
+        self.assertEqual(
+            set(
+                LikeDailyAggregate.objects.values_list(
+                    "day", "post", "author", "likes"
+                )
+            ),
+            rows,
+        )
@@ -0,0 +1,115 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.management.commands.benchmark_asgi import (
+    adapted_middleware,
+    async_middleware,
+)
+from user.models import User, Post
+from user.throttling import counter_store
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+ASYNC_POST_URL = reverse("user:async-post-list")
+
+
+def test_user(**params) -> User:
+    defaults = {
+        "username": "test_username",
+        "email": "test@test.com",
+        "password": "test1234",
+        "first_name": "test_first_name",
+        "last_name": "test_last_name",
+    }
+    defaults.update(**params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self) -> None:
+        counter_store.clear()
+        cache.clear()
+        self.user = test_user()
+        self.post = Post.objects.create(text="new post", user=self.user)
+
+        token = APIClient().post(
+            TOKEN_URL, {"username": "test_username", "password": "test1234"}
+        )
+        self.headers = {"Authorization": f"Bearer {token.data['access']}"}
+
+    async def test_list_matches_sync_view(self) -> None:
+        params = {"username": "test_username"}
+
+        response = await self.async_client.get(ASYNC_POST_URL, params)
+        expected = await self.async_client.get(
+            reverse("user:post-list"), params
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), expected.json())
+
+    async def test_missing_post_returns_not_found(self) -> None:
+        response = await self.async_client.get(
+            reverse("user:async-post-detail", args=[self.post.id + 1000])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_like_and_unlike(self) -> None:
+        url = reverse("user:async-post-like", args=[self.post.id])
+
+        liked = await self.async_client.post(url, headers=self.headers)
+        detail = await self.async_client.get(
+            reverse("user:async-post-detail", args=[self.post.id])
+        )
+        unliked = await self.async_client.delete(url, headers=self.headers)
+
+        self.assertEqual(liked.status_code, status.HTTP_200_OK)
+        self.assertEqual(detail.json()["likes_count"], 1)
+        self.assertEqual(unliked.status_code, status.HTTP_204_NO_CONTENT)
+
+    async def test_reaction_requires_authentication(self) -> None:
+        response = await self.async_client.post(
+            reverse("user:async-post-dislike", args=[self.post.id])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_activity(self) -> None:
+        response = await self.async_client.get(
+            reverse("user:async-activity"), headers=self.headers
+        )
+
+        self.assertIn("test_username's last login", response.json())
+
+    async def test_analytics_rejects_bad_date(self) -> None:
+        response = await self.async_client.get(
+            reverse("user:async-analytics"),
+            {"date_from": "yesterday"},
+            headers=self.headers,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncMiddlewareTests(SimpleTestCase):
+    def test_stack_runs_without_adaptation(self) -> None:
+        middleware = [
+            path
+            for path in settings.MIDDLEWARE
+            if not path.startswith("debug_toolbar.")
+        ]
+
+        with override_settings(MIDDLEWARE=middleware):
+            self.assertEqual(adapted_middleware(), [])
+
+    def test_sync_only_middleware_is_stripped(self) -> None:
+        toolbar = "debug_toolbar.middleware.DebugToolbarMiddleware"
+
+        with override_settings(MIDDLEWARE=[*settings.MIDDLEWARE, toolbar]):
+            self.assertEqual(adapted_middleware(), [f"middleware {toolbar}"])
+            self.assertNotIn(toolbar, async_middleware())
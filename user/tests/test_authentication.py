@@ -0,0 +1,95 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.activity import activity_tracker
+from user.models import User, Post
+from user.throttling import counter_store
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+ACTIVITY_URL = reverse("user:activity")
+
+
+def test_user(**params) -> User:
+    defaults = {
+        "username": "test_username",
+        "email": "test@test.com",
+        "password": "test1234",
+        "first_name": "test_first_name",
+        "last_name": "test_last_name",
+    }
+    defaults.update(**params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    def setUp(self) -> None:
+        counter_store.clear()
+        cache.clear()
+        activity_tracker.clear()
+        self.user = test_user()
+        self.client = APIClient()
+
+        response = self.client.post(
+            TOKEN_URL, {"username": "test_username", "password": "test1234"}
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {response.data['access']}"
+        )
+
+    def test_activity_runs_without_auth_queries(self) -> None:
+        self.client.get(ACTIVITY_URL)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(ACTIVITY_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("test_username's last login", response.data)
+
+    def test_deactivated_user_is_rejected(self) -> None:
+        self.client.get(ACTIVITY_URL)
+
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(ACTIVITY_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_user_can_edit_own_post(self) -> None:
+        post = Post.objects.create(text="new post", user=self.user)
+
+        response = self.client.patch(
+            reverse("user:post-detail", args=[post.id]), {"text": "edited"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        post.refresh_from_db()
+        self.assertEqual(post.text, "edited")
+
+    def test_profile_loads_full_user(self) -> None:
+        response = self.client.get(reverse("user:manage"))
+
+        self.assertEqual(response.data["email"], "test@test.com")
+
+    def test_revoked_staff_claim_cannot_delete(self) -> None:
+        author = test_user(username="author", email="author@test.com")
+        post = Post.objects.create(text="new post", user=author)
+        self.user.is_staff = True
+        self.user.save()
+        client = APIClient()
+        response = client.post(
+            TOKEN_URL, {"username": "test_username", "password": "test1234"}
+        )
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {response.data['access']}"
+        )
+
+        self.user.is_staff = False
+        self.user.save()
+        response = client.delete(reverse("user:post-detail", args=[post.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(Post.objects.filter(pk=post.pk).exists())
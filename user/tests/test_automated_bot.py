@@ -0,0 +1,25 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+
+from user.management.commands.automated_bot import NUMBER_OF_USERS
+from user.models import Post
+
+
+class AutomatedBotTests(TestCase):
+    def test_bulk_mode_keeps_counters_consistent(self) -> None:
+        users_before = get_user_model().objects.count()
+        out = StringIO()
+
+        call_command("automated_bot", bulk=True, chunk_size=2, stdout=out)
+
+        self.assertEqual(
+            get_user_model().objects.count(), users_before + NUMBER_OF_USERS
+        )
+        self.assertIn("rows/s", out.getvalue())
+        posts = Post.objects.annotate(actual_likes=Count("likes"))
+        for post in posts:
+            self.assertEqual(post.likes_count, post.actual_likes)
@@ -0,0 +1,52 @@
+from django.test import TestCase
+
+from benchmarks.runner import compare, measure
+
+
+def results(p50_ms: float, peak_kb: float) -> dict:
+    return {
+        "sizes": {
+            "10k": {
+                "endpoints": {
+                    "post list": {
+                        "p50_ms": p50_ms,
+                        "p95_ms": p50_ms * 2,
+                        "mean_ms": p50_ms,
+                        "peak_kb": peak_kb,
+                    }
+                }
+            }
+        }
+    }
+
+
+class BenchmarkTests(TestCase):
+    def test_measure(self) -> None:
+        calls = []
+
+        def prepare():
+            return lambda: calls.append(bytearray(64 * 1024))
+
+        summary = measure(prepare, iterations=5, warmup=2)
+
+        self.assertEqual(len(calls), 12)
+        self.assertEqual(
+            set(summary), {"p50_ms", "p95_ms", "mean_ms", "peak_kb"}
+        )
+        self.assertGreaterEqual(summary["peak_kb"], 64)
+
+    def test_compare_flags_regressions_over_threshold(self) -> None:
+        baseline = results(p50_ms=10, peak_kb=100)
+
+        self.assertEqual(compare(results(12, 110), baseline, 0.25), [])
+        self.assertEqual(
+            compare(results(20, 110), baseline, 0.25),
+            [("10k", "endpoints", "post list", "p50_ms", 10, 20)],
+        )
+        self.assertEqual(
+            compare(results(10, 200), baseline, 0.25),
+            [("10k", "endpoints", "post list", "peak_kb", 100, 200)],
+        )
+
+    def test_compare_skips_missing_entries(self) -> None:
+        self.assertEqual(compare({"sizes": {}}, results(10, 100), 0.25), [])
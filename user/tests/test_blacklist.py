@@ -0,0 +1,95 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from user.blacklist import BloomFilter, token_blacklist
+from user.throttling import counter_store
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+REFRESH_URL = reverse("user:token_refresh")
+LOGOUT_URL = reverse("user:logout")
+
+
+class BloomFilterTests(TestCase):
+    def test_no_false_negatives(self) -> None:
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        values = [f"jti-{index}" for index in range(1000)]
+        for value in values:
+            bloom.add(value)
+
+        self.assertTrue(all(value in bloom for value in values))
+        false_positives = sum(
+            f"other-{index}" in bloom for index in range(1000)
+        )
+        self.assertLess(false_positives, 50)
+
+
+class TokenBlacklistTests(TestCase):
+    def setUp(self) -> None:
+        token_blacklist.clear()
+        counter_store.clear()
+        self.user = get_user_model().objects.create_user(
+            username="test_username",
+            email="test@test.com",
+            password="test1234",
+        )
+        self.client = APIClient()
+        self.tokens = self.client.post(
+            TOKEN_URL, {"username": "test_username", "password": "test1234"}
+        ).data
+
+    def test_refresh_does_not_query_blacklist(self) -> None:
+        self.client.post(REFRESH_URL, {"refresh": self.tokens["refresh"]})
+
+        with self.assertNumQueries(0):
+            response = self.client.post(
+                REFRESH_URL, {"refresh": self.tokens["refresh"]}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_logged_out_token_cannot_refresh(self) -> None:
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}"
+        )
+        self.client.post(LOGOUT_URL, {"refresh_token": self.tokens["refresh"]})
+
+        response = self.client.post(
+            REFRESH_URL, {"refresh": self.tokens["refresh"]}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_blacklist_is_loaded_from_database(self) -> None:
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}"
+        )
+        self.client.post(LOGOUT_URL, {"refresh_token": self.tokens["refresh"]})
+        token_blacklist.clear()
+
+        response = self.client.post(
+            REFRESH_URL, {"refresh": self.tokens["refresh"]}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_purge_deletes_only_expired_tokens(self) -> None:
+        OutstandingToken.objects.create(
+            user=self.user,
+            jti="expired",
+            token="expired",
+            expires_at=timezone.now() - timedelta(days=1),
+        )
+
+        call_command("purge_expired_tokens", stdout=StringIO())
+
+        self.assertEqual(OutstandingToken.objects.count(), 1)
+        self.assertFalse(OutstandingToken.objects.filter(jti="expired"))
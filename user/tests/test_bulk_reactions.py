@@ -0,0 +1,206 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.models import User, Post, Like, Dislike, LikeDailyAggregate
+from user.reactions import _bulk_insert_ignore, _insert_ignore
+from user.throttling import counter_store
+
+BULK_URL = reverse("user:post-bulk-reactions")
+
+
+def test_user(**params) -> User:
+    defaults = {
+        "username": "test_username",
+        "email": "test@test.com",
+        "password": "test1234",
+        "first_name": "test_first_name",
+        "last_name": "test_last_name",
+    }
+    defaults.update(**params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+class BulkReactionApiTests(TestCase):
+    def setUp(self) -> None:
+        counter_store.clear()
+        self.client = APIClient()
+        self.user = test_user()
+        self.author = test_user(username="author", email="author@test.com")
+        self.client.force_authenticate(self.user)
+        self.posts = [
+            Post.objects.create(text=f"post {index}", user=self.author)
+            for index in range(4)
+        ]
+
+    def send(self, *items):
+        return self.client.post(
+            BULK_URL,
+            {
+                "reactions": [
+                    {"post_id": post_id, "reaction": reaction}
+                    for post_id, reaction in items
+                ]
+            },
+            format="json",
+        )
+
+    def test_apply_batch(self) -> None:
+        first, second, third, fourth = self.posts
+        Like.objects.create(post=second, user=self.user)
+        Like.objects.create(post=third, user=self.user)
+        Dislike.objects.create(post=fourth, user=self.user)
+
+        missing = fourth.pk + 1
+
+        response = self.send(
+            (first.pk, "like"),
+            (second.pk, "dislike"),
+            (third.pk, "like"),
+            (fourth.pk, "none"),
+            (missing, "like"),
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"],
+            [
+                {"post_id": first.pk, "status": "created"},
+                {"post_id": second.pk, "status": "created"},
+                {"post_id": third.pk, "status": "unchanged"},
+                {"post_id": fourth.pk, "status": "removed"},
+                {"post_id": missing, "status": "not_found"},
+            ],
+        )
+        self.assertEqual(
+            set(self.user.likes.values_list("post_id", flat=True)),
+            {first.pk, third.pk},
+        )
+        self.assertEqual(
+            list(self.user.dislikes.values_list("post_id", flat=True)),
+            [second.pk],
+        )
+        counters = dict(
+            Post.objects.filter(user=self.author).values_list(
+                "pk", "likes_count"
+            )
+        )
+        self.assertEqual(
+            counters,
+            {first.pk: 1, second.pk: 0, third.pk: 1, fourth.pk: 0},
+        )
+        second.refresh_from_db()
+        fourth.refresh_from_db()
+        self.assertEqual(second.dislikes_count, 1)
+        self.assertEqual(fourth.dislikes_count, 0)
+
+    def test_rollups_follow_the_batch(self) -> None:
+        first, second, *_ = self.posts
+        Like.objects.create(post=second, user=self.user)
+
+        self.send((first.pk, "like"), (second.pk, "none"))
+
+        today = timezone.localdate()
+        self.assertEqual(
+            LikeDailyAggregate.objects.get(
+                day=today, post=None, author=None
+            ).likes,
+            1,
+        )
+        self.assertEqual(
+            LikeDailyAggregate.objects.get(day=today, post=first).likes, 1
+        )
+        self.assertEqual(
+            LikeDailyAggregate.objects.get(day=today, post=second).likes, 0
+        )
+
+    def test_queries_do_not_grow_with_the_batch(self) -> None:
+        items = [(post.pk, "like") for post in self.posts]
+
+        # Savepoint, posts, likes, dislikes, counters, one batch per
+        # rollup dimension and the release.
+        with self.assertNumQueries(9):
+            self.send(*items)
+
+        # Removals subtract from the rollups with one UPDATE per dimension.
+        with self.assertNumQueries(9):
+            self.send(*[(post.pk, "none") for post in self.posts])
+
+    def test_switch_queries_do_not_grow_with_the_batch(self) -> None:
+        liked, disliked = self.posts[:2], self.posts[2:]
+        for post in liked:
+            Like.objects.create(post=post, user=self.user)
+        for post in disliked:
+            Dislike.objects.create(post=post, user=self.user)
+
+        # Savepoint, posts, an insert and a delete per reaction, counters,
+        # one upsert and one UPDATE for the posts and the release. The
+        # total and author rows net out.
+        with self.assertNumQueries(10):
+            self.send(
+                *[(post.pk, "dislike") for post in liked],
+                *[(post.pk, "like") for post in disliked],
+            )
+
+        today = timezone.localdate()
+        self.assertEqual(
+            LikeDailyAggregate.objects.get(
+                day=today, post=None, author=None
+            ).likes,
+            2,
+        )
+        self.assertEqual(
+            dict(
+                LikeDailyAggregate.objects.filter(
+                    day=today, post__isnull=False
+                ).values_list("post_id", "likes")
+            ),
+            {post.pk: 0 for post in liked} | {post.pk: 1 for post in disliked},
+        )
+        self.assertEqual(
+            LikeDailyAggregate.objects.get(
+                day=today, author=self.author
+            ).likes,
+            2,
+        )
+
+    def test_inserts_skip_missing_posts(self) -> None:
+        post = self.posts[0]
+        missing = self.posts[-1].pk + 1
+        now = timezone.now()
+
+        self.assertFalse(_insert_ignore(Like, missing, self.user.pk, now))
+        self.assertEqual(
+            _bulk_insert_ignore(
+                Dislike, [post.pk, missing], self.user.pk, now
+            ),
+            {post.pk},
+        )
+        # No row points at the missing post, the foreign keys hold.
+        connection.check_constraints()
+
+    def test_duplicate_posts_rejected(self) -> None:
+        post = self.posts[0]
+
+        response = self.send((post.pk, "like"), (post.pk, "dislike"))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Like.objects.filter(user=self.user).exists())
+
+    @override_settings(REACTIONS={"BULK_MAX_ITEMS": 2})
+    def test_too_many_items_rejected(self) -> None:
+        response = self.send(*[(post.pk, "like") for post in self.posts])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Like.objects.filter(user=self.user).exists())
+
+    def test_auth_required(self) -> None:
+        self.client.force_authenticate(None)
+
+        response = self.send((self.posts[0].pk, "like"))
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.cache import response_cache
+from user.models import User, Post
+
+POST_URL = reverse("user:post-list")
+
+
+def test_user(**params) -> User:
+    defaults = {
+        "username": "test_username",
+        "email": "test@test.com",
+        "password": "test1234",
+        "first_name": "test_first_name",
+        "last_name": "test_last_name",
+    }
+    defaults.update(**params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def post_detail_url(post_id: int) -> str:
+    return reverse("user:post-detail", args=[post_id])
+
+
+def user_detail_url(user_id: int) -> str:
+    return reverse("user:user-detail", args=[user_id])
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self) -> None:
+        response_cache().clear()
+        self.client = APIClient()
+        self.user = test_user()
+        self.post = Post.objects.create(text="new post", user=self.user)
+
+    def test_anonymous_list_is_cached(self) -> None:
+        first = self.client.get(POST_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(POST_URL)
+
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_if_none_match_returns_not_modified(self) -> None:
+        etag = self.client.get(post_detail_url(self.post.id))["ETag"]
+
+        response = self.client.get(
+            post_detail_url(self.post.id), HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_authenticated_requests_bypass_cache(self) -> None:
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(POST_URL)
+
+        self.assertNotIn("ETag", response)
+
+    def test_new_post_refreshes_feed_and_author_list(self) -> None:
+        self.client.get(POST_URL)
+        self.client.get(POST_URL, {"username": "test_username"})
+
+        post = Post.objects.create(text="another post", user=self.user)
+
+        feed = self.client.get(POST_URL)
+        author = self.client.get(POST_URL, {"username": "test_username"})
+        self.assertEqual(feed.data["results"][0]["id"], post.id)
+        self.assertEqual(author.data["count"], 2)
+
+    def test_reaction_refreshes_post_detail(self) -> None:
+        url = post_detail_url(self.post.id)
+        etag = self.client.get(url)["ETag"]
+
+        reader = APIClient()
+        reader.force_authenticate(self.user)
+        reader.post(reverse("user:post-like", args=[self.post.id]))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["likes_count"], 1)
+
+    def test_profile_update_refreshes_user_detail(self) -> None:
+        self.client.get(user_detail_url(self.user.id))
+
+        self.user.bio = "updated"
+        self.user.save()
+
+        response = self.client.get(user_detail_url(self.user.id))
+        self.assertEqual(response.data["bio"], "updated")
+
+    def test_user_delete_drops_post_detail(self) -> None:
+        self.client.get(post_detail_url(self.post.id))
+
+        self.user.delete()
+
+        response = self.client.get(post_detail_url(self.post.id))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
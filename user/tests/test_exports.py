@@ -0,0 +1,140 @@
+import csv
+import datetime
+import json
+from io import StringIO
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.exports import abatched
+from user.models import User, Post, Like
+from user.throttling import counter_store
+
+
+def test_user(**params) -> User:
+    defaults = {
+        "username": "test_username",
+        "email": "test@test.com",
+        "password": "test1234",
+        "first_name": "test_first_name",
+        "last_name": "test_last_name",
+    }
+    defaults.update(**params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def export_url(kind: str) -> str:
+    return reverse("user:export", args=[kind])
+
+
+class ExportApiTests(TestCase):
+    def setUp(self) -> None:
+        counter_store.clear()
+        self.client = APIClient()
+        self.user = test_user()
+        self.client.force_authenticate(self.user)
+        self.post = Post.objects.create(text="post", user=self.user)
+        Like.objects.all().delete()
+        self.likes = [
+            Like.objects.create(post=self.post, user=test_user(**params))
+            for params in (
+                {"username": "first", "email": "first@test.com"},
+                {"username": "second", "email": "second@test.com"},
+            )
+        ]
+
+    def get(self, kind: str, **params):
+        response = self.client.get(export_url(kind), params)
+        content = b"".join(response.streaming_content).decode()
+
+        return response, content
+
+    def test_csv(self) -> None:
+        response, content = self.get("likes")
+
+        rows = list(csv.reader(StringIO(content)))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(rows[0], ["id", "post_id", "user_id", "created_at"])
+        self.assertEqual(
+            [int(row[0]) for row in rows[1:]],
+            [like.pk for like in self.likes],
+        )
+
+    def test_ndjson_since_id(self) -> None:
+        first, second = self.likes
+
+        response, content = self.get(
+            "likes", output="ndjson", since_id=first.pk
+        )
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["id"], second.pk)
+        self.assertEqual(rows[0]["user_id"], second.user_id)
+
+    def test_date_range(self) -> None:
+        first, second = self.likes
+        Like.objects.filter(pk=first.pk).update(
+            created_at=timezone.now() - datetime.timedelta(days=3)
+        )
+        today = timezone.localdate().isoformat()
+
+        _, content = self.get(
+            "likes", output="ndjson", date_from=today, date_to=today
+        )
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row["id"] for row in rows], [second.pk])
+
+    def test_invalid_params(self) -> None:
+        unknown = self.client.get(export_url("users"))
+        output = self.client.get(export_url("likes"), {"output": "xml"})
+        date = self.client.get(export_url("likes"), {"date_from": "today"})
+        last = self.client.get(export_url("likes"), {"date_to": "9999-12-31"})
+        reversed_range = self.client.get(
+            export_url("likes"),
+            {"date_from": "2023-09-30", "date_to": "2023-09-01"},
+        )
+
+        self.assertEqual(unknown.status_code, status.HTTP_404_NOT_FOUND)
+        for response in (output, date, last, reversed_range):
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_auth_required(self) -> None:
+        self.client.force_authenticate(None)
+
+        response = self.client.get(export_url("posts"))
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_asgi_blocks(self) -> None:
+        async def collect(lines) -> list:
+            return [block async for block in abatched(lines, 2)]
+
+        blocks = async_to_sync(collect)(["a\n", "b\n", "c\n"])
+
+        self.assertEqual(blocks, ["a\nb\n", "c\n"])
+
+    def test_command(self) -> None:
+        out = StringIO()
+
+        call_command(
+            "export_data",
+            "posts",
+            format="ndjson",
+            since_id=self.post.pk - 1,
+            stdout=out,
+        )
+
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["text"], "post")
+        self.assertEqual(rows[0]["likes_count"], 2)
@@ -0,0 +1,251 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.feed import (
+    CATCH_UP_JOB_KIND,
+    JOB_KIND,
+    follow_author,
+    unfollow_author,
+)
+from user.models import User, Post, Job, FeedEntry
+from user.serializers import ClaimsTokenObtainPairSerializer
+
+FEED_URL = reverse("user:feed")
+POST_URL = reverse("user:post-list")
+
+
+def test_user(**params) -> User:
+    defaults = {
+        "username": "test_username",
+        "email": "test@test.com",
+        "password": "test1234",
+        "first_name": "test_first_name",
+        "last_name": "test_last_name",
+    }
+    defaults.update(**params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def authenticated_client(user) -> APIClient:
+    client = APIClient()
+    token = ClaimsTokenObtainPairSerializer.get_token(user)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token.access_token}")
+
+    return client
+
+
+def run_jobs() -> None:
+    call_command("run_jobs", once=True, processes=0, stdout=StringIO())
+
+
+def follow_url(user) -> str:
+    return reverse("user:user-follow", args=[user.id])
+
+
+class FollowTests(TestCase):
+    def setUp(self) -> None:
+        self.user = test_user()
+        self.author = test_user(username="author", email="author@test.com")
+        self.client = authenticated_client(self.user)
+
+    def test_follow_backfills_recent_posts(self) -> None:
+        post = Post.objects.create(text="new post", user=self.author)
+
+        response = self.client.post(follow_url(self.author))
+        self.client.post(follow_url(self.author))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.followers_count, 1)
+        self.assertQuerySetEqual(
+            FeedEntry.objects.filter(user=self.user).values_list(
+                "post", flat=True
+            ),
+            [post.id],
+        )
+
+    def test_unfollow_drops_posts(self) -> None:
+        Post.objects.create(text="new post", user=self.author)
+        self.client.post(follow_url(self.author))
+
+        response = self.client.delete(follow_url(self.author))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.followers_count, 0)
+        self.assertFalse(FeedEntry.objects.filter(user=self.user).exists())
+
+    def test_cannot_follow_self_or_missing_user(self) -> None:
+        self.assertEqual(
+            self.client.post(follow_url(self.user)).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.assertEqual(
+            self.client.post(
+                reverse("user:user-follow", args=[10**6])
+            ).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+    def test_deleted_follower_is_not_counted(self) -> None:
+        follow_author(self.user.id, self.author.id)
+
+        self.user.delete()
+
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.followers_count, 0)
+
+
+class FeedTests(TestCase):
+    def setUp(self) -> None:
+        self.author = test_user(username="author", email="author@test.com")
+        self.followers = [
+            test_user(username=f"reader_{index}", email=f"{index}@test.com")
+            for index in range(5)
+        ]
+        for follower in self.followers:
+            follow_author(follower.id, self.author.id)
+
+    def test_new_post_is_fanned_out_in_batches(self) -> None:
+        client = authenticated_client(self.author)
+
+        with override_settings(FEED={"BATCH_SIZE": 2}):
+            response = client.post(POST_URL, {"text": "new post"})
+            run_jobs()
+
+        self.assertEqual(
+            Job.objects.filter(kind=JOB_KIND, status=Job.DONE).count(), 3
+        )
+        feed = authenticated_client(self.followers[-1]).get(FEED_URL)
+        self.assertEqual(
+            [post["id"] for post in feed.data["results"]],
+            [response.data["id"]],
+        )
+
+    def test_feed_is_newest_first_across_pages(self) -> None:
+        other = test_user(username="other", email="other@test.com")
+        reader = self.followers[0]
+        follow_author(reader.id, other.id)
+        posts = [
+            Post.objects.create(text=f"post {index}", user=author)
+            for index, author in enumerate([self.author, other] * 3)
+        ]
+        run_jobs()
+        client = authenticated_client(reader)
+
+        first = client.get(FEED_URL, {"page_size": 4})
+        second = client.get(first.data["next"])
+
+        ids = [post["id"] for post in first.data["results"]]
+        ids += [post["id"] for post in second.data["results"]]
+        self.assertEqual(ids, [post.id for post in reversed(posts)])
+        self.assertIsNone(second.data["next"])
+
+    @override_settings(FEED={"FANOUT_LIMIT": 5})
+    def test_high_follower_author_is_merged_on_read(self) -> None:
+        small = test_user(username="small", email="small@test.com")
+        reader = self.followers[0]
+        follow_author(reader.id, small.id)
+        older = Post.objects.create(text="older", user=small)
+        newer = Post.objects.create(text="newer", user=self.author)
+        run_jobs()
+
+        response = authenticated_client(reader).get(FEED_URL)
+
+        self.assertFalse(FeedEntry.objects.filter(post=newer).exists())
+        self.assertEqual(
+            [post["id"] for post in response.data["results"]],
+            [newer.id, older.id],
+        )
+
+    @override_settings(FEED={"FANOUT_LIMIT": 5})
+    def test_held_back_posts_are_fanned_out_below_the_limit(self) -> None:
+        post = Post.objects.create(text="new post", user=self.author)
+        run_jobs()
+        post.refresh_from_db()
+        self.assertFalse(post.fanned_out)
+
+        unfollow_author(self.followers[0].id, self.author.id)
+        self.followers[1].delete()
+        run_jobs()
+        run_jobs()
+
+        self.assertEqual(
+            set(
+                FeedEntry.objects.filter(post=post).values_list(
+                    "user", flat=True
+                )
+            ),
+            {follower.id for follower in self.followers[2:]},
+        )
+        response = authenticated_client(self.followers[2]).get(FEED_URL)
+        self.assertEqual(
+            [post["id"] for post in response.data["results"]], [post.id]
+        )
+
+    @override_settings(FEED={"FANOUT_LIMIT": 5})
+    def test_deleted_follower_releases_held_back_posts(self) -> None:
+        post = Post.objects.create(text="new post", user=self.author)
+        run_jobs()
+
+        self.followers[0].delete()
+        run_jobs()
+        run_jobs()
+
+        self.assertEqual(FeedEntry.objects.filter(post=post).count(), 4)
+
+    @override_settings(FEED={"FANOUT_LIMIT": 5, "BATCH_SIZE": 2})
+    def test_followers_above_the_limit_are_backfilled(self) -> None:
+        unfollow_author(self.followers[0].id, self.author.id)
+        post = Post.objects.create(text="new post", user=self.author)
+        run_jobs()
+        late = test_user(username="late", email="late@test.com")
+        follow_author(late.id, self.author.id)
+        self.assertFalse(FeedEntry.objects.filter(user=late).exists())
+
+        unfollow_author(self.followers[1].id, self.author.id)
+        for _ in range(3):
+            run_jobs()
+
+        self.assertQuerySetEqual(
+            FeedEntry.objects.filter(user=late).values_list("post", flat=True),
+            [post.id],
+        )
+        self.assertFalse(
+            Job.objects.filter(kind=CATCH_UP_JOB_KIND)
+            .exclude(status=Job.DONE)
+            .exists()
+        )
+
+    def test_query_count_does_not_grow_with_follows(self) -> None:
+        reader = self.followers[0]
+        client = authenticated_client(reader)
+        client.get(FEED_URL)
+
+        with self.assertNumQueries(2) as first:
+            client.get(FEED_URL)
+
+        for index in range(10):
+            author = test_user(username=f"a_{index}", email=f"a{index}@t.com")
+            follow_author(reader.id, author.id)
+            Post.objects.create(text="new post", user=author)
+        run_jobs()
+
+        with self.assertNumQueries(len(first)):
+            response = client.get(FEED_URL)
+        self.assertEqual(len(response.data["results"]), 10)
+
+    def test_unfollow_after_fan_out(self) -> None:
+        Post.objects.create(text="new post", user=self.author)
+        run_jobs()
+
+        unfollow_author(self.followers[0].id, self.author.id)
+
+        response = authenticated_client(self.followers[0]).get(FEED_URL)
+        self.assertEqual(response.data["results"], [])
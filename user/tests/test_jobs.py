@@ -0,0 +1,131 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from user.jobs import enqueue
+from user.models import User, Post, Job
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def test_user(**params) -> User:
+    defaults = {
+        "username": "test_username",
+        "email": "test@test.com",
+        "password": "test1234",
+        "first_name": "test_first_name",
+        "last_name": "test_last_name",
+    }
+    defaults.update(**params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def test_image(width: int = 2000, height: int = 1000) -> SimpleUploadedFile:
+    exif = Image.Exif()
+    exif[0x010F] = "Camera maker"
+
+    output = BytesIO()
+    Image.new("RGB", (width, height), "red").save(
+        output, format="JPEG", exif=exif
+    )
+
+    return SimpleUploadedFile(
+        "photo.jpg", output.getvalue(), content_type="image/jpeg"
+    )
+
+
+def run_jobs() -> None:
+    call_command("run_jobs", once=True, processes=0, stdout=StringIO())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ThumbnailJobTests(TestCase):
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.user = test_user()
+        self.post = Post.objects.create(
+            text="new post", user=self.user, media_image=test_image()
+        )
+
+    def test_image_upload_queues_job(self) -> None:
+        job = Job.objects.get(kind="post.thumbnails")
+
+        self.assertEqual(job.kind, "post.thumbnails")
+        self.assertEqual(job.payload, {"post_id": self.post.id})
+
+    def test_renditions_are_resized_and_stripped(self) -> None:
+        run_jobs()
+
+        self.post.refresh_from_db()
+        self.assertEqual(
+            Job.objects.get(kind="post.thumbnails").status, Job.DONE
+        )
+        storage = self.post.media_image.storage
+        for extension in ("webp", "jpeg"):
+            name = self.post.thumbnails["small"][extension]
+            with Image.open(storage.open(name)) as image:
+                self.assertEqual(image.size, (320, 160))
+                self.assertNotIn("exif", image.info)
+
+    def test_transparency_is_kept_or_flattened_onto_white(self) -> None:
+        output = BytesIO()
+        Image.new("RGBA", (640, 320), (255, 0, 0, 0)).save(
+            output, format="PNG"
+        )
+        self.post.media_image = SimpleUploadedFile(
+            "logo.png", output.getvalue(), content_type="image/png"
+        )
+        self.post.save()
+
+        run_jobs()
+
+        self.post.refresh_from_db()
+        storage = self.post.media_image.storage
+        files = self.post.thumbnails["small"]
+        with Image.open(storage.open(files["webp"])) as image:
+            self.assertEqual(image.mode, "RGBA")
+            self.assertEqual(image.getpixel((0, 0))[3], 0)
+        with Image.open(storage.open(files["jpeg"])) as image:
+            self.assertEqual(image.mode, "RGB")
+            self.assertTrue(all(band > 250 for band in image.getpixel((0, 0))))
+
+    def test_saving_again_does_not_queue_another_job(self) -> None:
+        self.post.text = "edited"
+        self.post.save()
+        self.post.save()
+
+        self.assertEqual(Job.objects.filter(kind="post.thumbnails").count(), 1)
+
+    def test_list_exposes_thumbnail_urls(self) -> None:
+        run_jobs()
+
+        response = APIClient().get(
+            reverse("user:post-list"), {"username": "test_username"}
+        )
+
+        thumbnails = response.data["results"][0]["thumbnails"]
+        self.assertEqual(set(thumbnails), {"small", "medium"})
+        self.assertTrue(thumbnails["small"]["webp"].endswith("-small.webp"))
+
+    def test_failing_job_is_retried_then_failed(self) -> None:
+        Job.objects.all().delete()
+        enqueue("post.thumbnails", unexpected=1)
+
+        run_jobs()
+
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 3)
+        self.assertIn("TypeError", job.error)
@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from user.storage import blob_name
+
+MEDIA_ROOT = tempfile.mkdtemp()
+CONTENT = bytes(range(256)) * 4
+DIGEST = "ab" * 32
+
+
+def media_file(name: str, content: bytes = CONTENT) -> str:
+    path = os.path.join(MEDIA_ROOT, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(content)
+
+    return f"/media/{name}"
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class MediaServingTests(TestCase):
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.url = media_file(blob_name(DIGEST, ".png"))
+
+    def test_blob_is_served_with_immutable_headers(self) -> None:
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(response["ETag"], f'"{DIGEST}"')
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_legacy_file_is_revalidated(self) -> None:
+        response = self.client.get(media_file("media/uploads/old.png"))
+
+        self.assertEqual(response["Cache-Control"], "public, max-age=3600")
+        response = self.client.get(
+            "/media/media/uploads/old.png",
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_range_request(self) -> None:
+        response = self.client.get(self.url, HTTP_RANGE="bytes=10-19")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 10-19/1024")
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[10:20])
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=-4")
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[-4:])
+
+    def test_range_is_ignored_for_stale_if_range(self) -> None:
+        response = self.client.get(
+            self.url, HTTP_RANGE="bytes=10-19", HTTP_IF_RANGE='"other"'
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_unsatisfiable_range(self) -> None:
+        response = self.client.get(self.url, HTTP_RANGE="bytes=2000-")
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */1024")
+
+    @override_settings(
+        MEDIA_SERVING={
+            "SENDFILE": "x-accel-redirect",
+            "ACCEL_REDIRECT_PREFIX": "/protected/",
+        }
+    )
+    def test_accel_redirect(self) -> None:
+        response = self.client.get(self.url)
+
+        self.assertEqual(
+            response["X-Accel-Redirect"],
+            "/protected/" + blob_name(DIGEST, ".png"),
+        )
+        self.assertEqual(response.content, b"")
+
+    def test_hidden_and_outside_files_are_not_served(self) -> None:
+        incoming = media_file("media/uploads/users/posts/.incoming/a.part")
+
+        self.assertEqual(self.client.get(incoming).status_code, 404)
+        self.assertEqual(
+            self.client.get("/media/../manage.py").status_code, 404
+        )
@@ -0,0 +1,57 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from user.metrics import registry
+
+POST_URL = reverse("user:post-list")
+METRICS_URL = reverse("metrics")
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        registry.clear()
+
+    def test_requests_are_recorded_per_view(self) -> None:
+        self.client.get(POST_URL)
+
+        metrics = self.client.get(METRICS_URL).content.decode()
+
+        self.assertIn(
+            'http_requests_total{view="PostViewSet.list",method="GET",'
+            'status="200"} 1',
+            metrics,
+        )
+        self.assertIn(
+            'db_queries_per_request_count{view="PostViewSet.list"} 1',
+            metrics,
+        )
+        self.assertIn(
+            'serializer_duration_seconds_bucket{view="PostViewSet.list",'
+            'le="+Inf"} 1',
+            metrics,
+        )
+
+    @override_settings(METRICS={"SERVER_TIMING": True})
+    def test_server_timing_header(self) -> None:
+        response = self.client.get(POST_URL)
+
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^db;dur=[\d.]+;desc="\d+ queries", serialize;dur=[\d.]+, '
+            r"total;dur=[\d.]+$",
+        )
+
+    @override_settings(METRICS={"SLOW_REQUEST_MS": 0})
+    def test_slow_requests_log_their_queries(self) -> None:
+        with self.assertLogs("user.metrics", "WARNING") as logs:
+            self.client.get(POST_URL, {"page": 2})
+
+        self.assertIn("PostViewSet.list", logs.output[0])
+        self.assertIn("SELECT", logs.output[0])
+
+    def test_metrics_are_limited_to_allowed_ips(self) -> None:
+        response = self.client.get(METRICS_URL, REMOTE_ADDR="10.0.0.1")
+
+        self.assertEqual(response.status_code, 403)
@@ -1,5 +1,8 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.urls import reverse, reverse_lazy
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -170,6 +173,141 @@ class AuthenticatedUserApiTests(TestCase):
         self.assertEqual(response1.data["dislikes_count"], post1_dislikes)
         self.assertEqual(response2.data["dislikes_count"], post2_dislikes)
 
+    def test_like_endpoint_updates_counter(self) -> None:
+        post = test_post(user=self.user)
+
+        response = self.client.post(reverse("user:post-like", args=[post.id]))
+        post.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(post.likes_count, 1)
+        self.assertEqual(post.dislikes_count, 0)
+
+    def test_delete_reaction_updates_counter(self) -> None:
+        post = test_post(user=self.user)
+        like = test_like(post=post, user=self.user)
+        test_dislike(post=post, user=self.user)
+
+        like.delete()
+        post.refresh_from_db()
+
+        self.assertEqual(post.likes_count, 0)
+        self.assertEqual(post.dislikes_count, 1)
+
+    # A due activity flush would add its writes to the request.
+    @override_settings(
+        ACTIVITY_TRACKING={
+            "FLUSH_INTERVAL": 10**6,
+            "FLUSH_THRESHOLD": 10**6,
+        }
+    )
+    def test_list_posts_counts_without_extra_queries(self) -> None:
+        for index in range(5):
+            post = test_post(text=f"post {index}", user=self.user)
+            test_like(post=post, user=self.user)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(POST_URL, {"username": "user_"})
+
+        self.assertTrue(
+            all(post["likes_count"] == 1 for post in response.data["results"])
+        )
+
+    def test_like_is_idempotent(self) -> None:
+        post = test_post(user=self.user)
+        url = reverse("user:post-like", args=[post.id])
+
+        self.client.post(url)
+        response = self.client.post(url)
+        post.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Like.objects.filter(post=post).count(), 1)
+        self.assertEqual(post.likes_count, 1)
+
+    def test_dislike_replaces_like(self) -> None:
+        post = test_post(user=self.user)
+        test_like(post=post, user=self.user)
+
+        response = self.client.post(
+            reverse("user:post-dislike", args=[post.id])
+        )
+        post.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(Like.objects.filter(post=post).exists())
+        self.assertTrue(Dislike.objects.filter(post=post).exists())
+        self.assertEqual(post.likes_count, 0)
+        self.assertEqual(post.dislikes_count, 1)
+
+    def test_unlike_post(self) -> None:
+        post = test_post(user=self.user)
+        test_like(post=post, user=self.user)
+        url = reverse("user:post-like", args=[post.id])
+
+        response1 = self.client.delete(url)
+        response2 = self.client.delete(url)
+        post.refresh_from_db()
+
+        self.assertEqual(response1.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(response2.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Like.objects.filter(post=post).exists())
+        self.assertEqual(post.likes_count, 0)
+
+    def test_like_missing_post(self) -> None:
+        response = self.client.post(reverse("user:post-like", args=[0]))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Like.objects.filter(post_id=0).exists())
+
+    def test_list_posts_with_cursor(self) -> None:
+        for index in range(5):
+            test_post(text=f"post {index}", user=self.user)
+        expected = list(
+            Post.objects.order_by("-created_at", "-id").values_list(
+                "id", flat=True
+            )
+        )
+
+        seen = []
+        response = self.client.get(
+            POST_URL, {"pagination": "cursor", "page_size": 3}
+        )
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            seen.extend(post["id"] for post in response.data["results"])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+
+        previous = self.client.get(response.data["previous"])
+        last_page_start = (len(expected) - 1) // 3 * 3
+
+        self.assertEqual(seen, expected)
+        self.assertEqual(
+            [post["id"] for post in previous.data["results"]],
+            expected[last_page_start - 3 : last_page_start],
+        )
+
+    def test_list_posts_invalid_cursor(self) -> None:
+        response = self.client.get(POST_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reconcile_post_counters(self) -> None:
+        post = test_post(user=self.user)
+        test_like(post=post, user=self.user)
+        Post.objects.filter(pk=post.pk).update(
+            likes_count=10, dislikes_count=3
+        )
+
+        call_command("reconcile_post_counters", stdout=StringIO())
+        post.refresh_from_db()
+
+        self.assertEqual(post.likes_count, 1)
+        self.assertEqual(post.dislikes_count, 0)
+
 
 class AdminMovieSessionApiTest(TestCase):
     def setUp(self) -> None:
@@ -0,0 +1,292 @@
+import itertools
+from typing import NamedTuple
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from user.blacklist import token_blacklist
+from user.models import User, Post, Like, Dislike, ImageUpload
+from user.search import get_search_backend
+from user.serializers import ClaimsTokenObtainPairSerializer
+from user.throttling import counter_store
+
+
+class Budget(NamedTuple):
+    """Exact number of queries a route may run.
+
+    ``args`` and ``data`` values name fixtures of the harness: ``post`` is
+    an existing post, ``fresh_post`` one created for the request,
+    ``fresh_reactions`` likes of posts created for the request,
+    ``fresh_author`` a user the client does not follow yet, ``upload`` an
+    upload of the client and ``refresh`` a new refresh token. ``{n}`` in
+    data is replaced by a counter.
+    """
+
+    url_name: str
+    queries: int
+    method: str = "get"
+    args: tuple = ()
+    params: dict = {}
+    data: dict = {}
+    authenticated: bool = True
+    paginated: bool = False
+
+
+# Authenticated requests check the user's status once, the default cache
+# and the blacklist filter are cleared before every request.
+BUDGETS = {
+    "user list": Budget(
+        "user:user-list", 2, authenticated=False, paginated=True
+    ),
+    "user search": Budget(
+        "user:user-list",
+        2,
+        params={"q": "user"},
+        authenticated=False,
+        paginated=True,
+    ),
+    "user detail": Budget(
+        "user:user-detail", 1, args=("user",), authenticated=False
+    ),
+    "profile": Budget("user:manage", 1),
+    "post list": Budget(
+        "user:post-list", 2, authenticated=False, paginated=True
+    ),
+    "post list by cursor": Budget(
+        "user:post-list",
+        1,
+        params={"pagination": "cursor"},
+        authenticated=False,
+        paginated=True,
+    ),
+    "post list by author": Budget(
+        "user:post-list",
+        2,
+        params={"username": "user_1"},
+        authenticated=False,
+        paginated=True,
+    ),
+    "post search": Budget(
+        "user:post-list",
+        2,
+        params={"q": "post"},
+        authenticated=False,
+        paginated=True,
+    ),
+    "post detail": Budget(
+        "user:post-detail", 1, args=("post",), authenticated=False
+    ),
+    "post create": Budget(
+        "user:post-list", 5, method="post", data={"text": "post {n}"}
+    ),
+    "post like": Budget(
+        "user:post-like", 9, method="post", args=("fresh_post",)
+    ),
+    "post dislike": Budget(
+        "user:post-dislike", 6, method="post", args=("fresh_post",)
+    ),
+    "bulk reactions": Budget(
+        "user:post-bulk-reactions",
+        10,
+        method="post",
+        data={"reactions": "fresh_reactions"},
+    ),
+    "follow": Budget(
+        "user:user-follow", 6, method="post", args=("fresh_author",)
+    ),
+    "feed": Budget("user:feed", 3, paginated=True),
+    "like list": Budget("user:like", 3, paginated=True),
+    "analytics": Budget("user:analytics", 2),
+    "analytics dashboard": Budget(
+        "user:analytics",
+        5,
+        params={"metrics": "likes,dislikes,posts,users"},
+    ),
+    "analytics by author": Budget(
+        "user:analytics",
+        2,
+        params={"interval": "week", "group_by": "author"},
+    ),
+    "activity": Budget("user:activity", 2),
+    "export": Budget("user:export", 2, args=("likes",)),
+    "register": Budget(
+        "user:create",
+        5,
+        method="post",
+        data={
+            "username": "new_{n}",
+            "email": "new_{n}@test.com",
+            "password": "test1234",
+            "first_name": "new",
+            "last_name": "user",
+        },
+        authenticated=False,
+    ),
+    "token": Budget(
+        "user:token_obtain_pair",
+        3,
+        method="post",
+        data={"username": "user_0", "password": "test1234"},
+        authenticated=False,
+    ),
+    "token refresh": Budget(
+        "user:token_refresh",
+        1,
+        method="post",
+        data={"refresh": "refresh"},
+        authenticated=False,
+    ),
+    "logout": Budget(
+        "user:logout", 7, method="post", data={"refresh_token": "refresh"}
+    ),
+    "upload start": Budget(
+        "user:upload",
+        2,
+        method="post",
+        data={"filename": "photo.png", "size": 100},
+    ),
+    "upload offset": Budget("user:upload-chunk", 2, args=("upload",)),
+    "async post list": Budget(
+        "user:async-post-list", 2, authenticated=False, paginated=True
+    ),
+    "async post detail": Budget(
+        "user:async-post-detail", 1, args=("post",), authenticated=False
+    ),
+    "async post like": Budget(
+        "user:async-post-like", 9, method="post", args=("fresh_post",)
+    ),
+    "async post dislike": Budget(
+        "user:async-post-dislike", 6, method="post", args=("fresh_post",)
+    ),
+    "async analytics": Budget("user:async-analytics", 2),
+    "async activity": Budget("user:async-activity", 2),
+}
+
+# Users, posts per user and reactions per post seeded, each volume adds
+# to the previous one.
+VOLUMES = ((3, 2, 2), (12, 5, 6))
+PAGE_SIZES = (1, 10, 50)
+
+
+def test_user(**params) -> User:
+    defaults = {
+        "username": "test_username",
+        "email": "test@test.com",
+        "password": "test1234",
+        "first_name": "test_first_name",
+        "last_name": "test_last_name",
+    }
+    defaults.update(**params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+@override_settings(
+    RESPONSE_CACHE={"ENABLED": False},
+    ACTIVITY_TRACKING={"FLUSH_INTERVAL": 10**6, "FLUSH_THRESHOLD": 10**6},
+)
+class QueryBudgetTests(TestCase):
+    def setUp(self) -> None:
+        self.user = test_user(username="user_0")
+        self.counter = itertools.count()
+        self.users = [self.user]
+
+    def seed(self, users: int, posts_per_user: int, reactions: int) -> None:
+        model = get_user_model()
+        start = len(self.users)
+        model.objects.bulk_create(
+            model(
+                username=f"user_{index}",
+                email=f"user_{index}@test.com",
+                first_name="first",
+                last_name="last",
+            )
+            for index in range(start, users)
+        )
+        self.users = list(model.objects.filter(username__startswith="user_"))
+
+        posts = Post.objects.bulk_create(
+            Post(text=f"post {index}", user=user)
+            for user in self.users
+            for index in range(posts_per_user)
+        )
+        for post in posts:
+            for index, user in enumerate(self.users[:reactions]):
+                reaction = Like if index % 2 else Dislike
+                reaction.objects.get_or_create(post=post, user=user)
+        get_search_backend().rebuild()
+
+    def resolve(self, value):
+        if value == "user":
+            return self.user.pk
+        if value == "post":
+            return Post.objects.order_by("pk").first().pk
+        if value == "fresh_post":
+            return Post.objects.create(text="fresh", user=self.users[-1]).pk
+        if value == "fresh_reactions":
+            posts = Post.objects.bulk_create(
+                Post(text="fresh", user=user) for user in self.users
+            )
+            return [{"post_id": post.pk, "reaction": "like"} for post in posts]
+        if value == "fresh_author":
+            author = test_user(username=f"author_{next(self.counter)}")
+            Post.objects.create(text="new post", user=author)
+            return author.pk
+        if value == "upload":
+            return ImageUpload.objects.create(
+                user=self.user, filename="photo.png", size=100
+            ).pk
+        if value == "refresh":
+            return str(ClaimsTokenObtainPairSerializer.get_token(self.user))
+        if isinstance(value, str):
+            return value.format(n=next(self.counter))
+
+        return value
+
+    def request(self, budget: Budget, page_size=None):
+        client = APIClient()
+        if budget.authenticated:
+            token = ClaimsTokenObtainPairSerializer.get_token(self.user)
+            client.credentials(
+                HTTP_AUTHORIZATION=f"Bearer {token.access_token}"
+            )
+
+        url = reverse(
+            budget.url_name,
+            args=[self.resolve(arg) for arg in budget.args],
+        )
+        params = dict(budget.params)
+        if page_size is not None:
+            params["page_size"] = page_size
+        data = {key: self.resolve(value) for key, value in budget.data.items()}
+
+        cache.clear()
+        token_blacklist.clear()
+        counter_store.clear()
+        with self.assertNumQueries(budget.queries):
+            if budget.method == "get":
+                response = client.get(url, params)
+            else:
+                response = getattr(client, budget.method)(
+                    url, data, format="json"
+                )
+            if response.streaming:
+                content = b"".join(response.streaming_content)
+            else:
+                content = response.content
+
+        self.assertLess(response.status_code, 300, content)
+
+    def test_query_counts_are_constant(self) -> None:
+        for volume in VOLUMES:
+            self.seed(*volume)
+
+            for name, budget in BUDGETS.items():
+                page_sizes = PAGE_SIZES if budget.paginated else (None,)
+                for page_size in page_sizes:
+                    with self.subTest(
+                        route=name, volume=volume, page_size=page_size
+                    ):
+                        self.request(budget, page_size)
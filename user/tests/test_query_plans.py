@@ -0,0 +1,127 @@
+import re
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from user.feed import follow_author
+from user.models import Post, Like
+
+FULL_SCAN = re.compile(r"^SCAN (\S+)$")
+
+
+def query_plan(sql: str) -> list:
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite")
+class QueryPlanTests(TestCase):
+    """Each endpoint's main query must be answered from an index"""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = get_user_model().objects.create_user(
+            username="user_username",
+            email="user@test.com",
+            password="user1234",
+            first_name="user_first_name",
+            last_name="user_last_name",
+        )
+        for index in range(30):
+            post = Post.objects.create(text=f"post {index}", user=cls.user)
+            Like.objects.create(post=post, user=cls.user)
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def main_query(self, url: str, table: str, **params) -> str:
+        """Return the SELECT that reads rows from ``table``"""
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url, params)
+
+        selects = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("SELECT")
+            and "COUNT(*)" not in query["sql"]
+            and f'FROM "{table}"' in query["sql"]
+        ]
+        self.assertTrue(selects, f"No query on {table} for {url}")
+
+        return selects[0]
+
+    def assertUsesIndex(self, sql: str) -> None:
+        plan = query_plan(sql)
+
+        for step in plan:
+            self.assertIsNone(FULL_SCAN.match(step), f"{step} in {plan}")
+            self.assertNotIn("USE TEMP B-TREE FOR ORDER BY", step)
+
+    def test_post_list(self) -> None:
+        self.assertUsesIndex(
+            self.main_query(reverse("user:post-list"), "user_post")
+        )
+
+    def test_post_list_cursor(self) -> None:
+        self.assertUsesIndex(
+            self.main_query(
+                reverse("user:post-list"), "user_post", pagination="cursor"
+            )
+        )
+
+    def test_like_list(self) -> None:
+        self.assertUsesIndex(
+            self.main_query(reverse("user:like"), "user_like")
+        )
+
+    def test_user_list(self) -> None:
+        self.assertUsesIndex(
+            self.main_query(reverse("user:user-list"), "user_user")
+        )
+
+    def test_analytics(self) -> None:
+        self.assertUsesIndex(
+            self.main_query(
+                reverse("user:analytics"),
+                "user_likedailyaggregate",
+                date_from="2023-09-01",
+                date_to="2023-09-30",
+            )
+        )
+
+    def test_analytics_raw_rows(self) -> None:
+        for table, metric in (
+            ("user_dislike", "dislikes"),
+            ("user_post", "posts"),
+            ("user_user", "users"),
+        ):
+            with self.subTest(metric=metric):
+                self.assertUsesIndex(
+                    self.main_query(
+                        reverse("user:analytics"),
+                        table,
+                        metrics=metric,
+                        interval="hour",
+                    )
+                )
+
+    @override_settings(FEED={"FANOUT_LIMIT": 1})
+    def test_feed(self) -> None:
+        author = get_user_model().objects.create_user(
+            username="author_username", email="author@test.com"
+        )
+        Post.objects.create(text="new post", user=author)
+        follow_author(self.user.pk, author.pk)
+
+        for table in ("user_feedentry", "user_post"):
+            with self.subTest(table=table):
+                self.assertUsesIndex(
+                    self.main_query(reverse("user:feed"), table)
+                )
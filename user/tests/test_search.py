@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from user.models import User, Post
+
+USER_URL = reverse("user:user-list")
+POST_URL = reverse("user:post-list")
+
+
+def test_user(**params) -> User:
+    defaults = {
+        "username": "test_username",
+        "email": "test@test.com",
+        "password": "test1234",
+        "first_name": "test_first_name",
+        "last_name": "test_last_name",
+    }
+    defaults.update(**params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+class SearchApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = test_user(bio="Loves mountain hiking")
+        self.spider = test_user(
+            username="spider",
+            email="test2@test.com",
+            first_name="Peter",
+            last_name="Parker",
+        )
+
+    def result_ids(self, url: str, **params) -> list:
+        response = self.client.get(url, params)
+        return [item["id"] for item in response.data["results"]]
+
+    def test_search_users_by_bio_and_name(self) -> None:
+        self.assertEqual(
+            self.result_ids(USER_URL, q="mountain"), [self.user.id]
+        )
+        self.assertEqual(
+            self.result_ids(USER_URL, q="park pete"), [self.spider.id]
+        )
+
+    def test_search_posts_ranked(self) -> None:
+        post1 = Post.objects.create(text="holiday photos", user=self.user)
+        post2 = Post.objects.create(
+            text="holiday holiday holiday", user=self.spider
+        )
+        Post.objects.create(text="work", user=self.spider)
+
+        self.assertEqual(
+            self.result_ids(POST_URL, q="holiday"), [post2.id, post1.id]
+        )
+
+    def test_search_posts_by_username(self) -> None:
+        post = Post.objects.create(text="new post", user=self.spider)
+        Post.objects.create(text="new post", user=self.user)
+
+        self.assertEqual(self.result_ids(POST_URL, username="spid"), [post.id])
+
+    def test_index_follows_rename_and_delete(self) -> None:
+        post = Post.objects.create(text="new post", user=self.spider)
+
+        self.spider.username = "venom"
+        self.spider.save()
+
+        self.assertEqual(
+            self.result_ids(POST_URL, username="venom"), [post.id]
+        )
+        self.assertEqual(self.result_ids(POST_URL, username="spider"), [])
+
+        post.delete()
+
+        self.assertEqual(self.result_ids(POST_URL, username="venom"), [])
+
+    def test_short_terms_fall_back_to_substring_match(self) -> None:
+        self.assertEqual(
+            self.result_ids(USER_URL, first_name="pe"), [self.spider.id]
+        )
@@ -0,0 +1,144 @@
+import os
+import shutil
+import tempfile
+import time
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from user.models import User, Post, MediaBlob, POST_IMAGE_DIR
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def test_user(**params) -> User:
+    defaults = {
+        "username": "test_username",
+        "email": "test@test.com",
+        "password": "test1234",
+        "first_name": "test_first_name",
+        "last_name": "test_last_name",
+    }
+    defaults.update(**params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def image_bytes(color: str = "red") -> bytes:
+    output = BytesIO()
+    Image.new("RGB", (100, 100), color).save(output, format="PNG")
+
+    return output.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ContentAddressedStorageTests(TestCase):
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.user = test_user()
+
+    def create_post(self, content: bytes) -> Post:
+        return Post.objects.create(
+            text="new post",
+            user=self.user,
+            media_image=SimpleUploadedFile("photo.png", content),
+        )
+
+    def test_identical_images_are_stored_once(self) -> None:
+        first = self.create_post(image_bytes())
+        second = self.create_post(image_bytes())
+
+        self.assertEqual(first.media_image.name, second.media_image.name)
+        self.assertRegex(
+            first.media_image.name,
+            r"^media/blobs/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.png$",
+        )
+        blob = MediaBlob.objects.get()
+        self.assertEqual(blob.refcount, 2)
+        self.assertEqual(blob.size, len(image_bytes()))
+
+    def test_file_is_deleted_with_last_reference(self) -> None:
+        first = self.create_post(image_bytes())
+        second = self.create_post(image_bytes())
+        storage = first.media_image.storage
+        name = first.media_image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(storage.exists(name))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_replaced_image_is_released(self) -> None:
+        post = self.create_post(image_bytes())
+        old_name = post.media_image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.media_image = SimpleUploadedFile(
+                "photo.png", image_bytes("blue")
+            )
+            post.save()
+
+        self.assertFalse(post.media_image.storage.exists(old_name))
+        self.assertEqual(
+            list(MediaBlob.objects.values_list("name", flat=True)),
+            [post.media_image.name],
+        )
+
+    def test_dedupe_media_moves_legacy_files(self) -> None:
+        storage = Post._meta.get_field("media_image").storage
+        os.makedirs(storage.path(POST_IMAGE_DIR), exist_ok=True)
+        legacy = []
+        for index in range(2):
+            name = os.path.join(POST_IMAGE_DIR, f"legacy-{index}.png")
+            with open(storage.path(name), "wb") as file:
+                file.write(image_bytes())
+            legacy.append(
+                Post.objects.create(
+                    text="legacy", user=self.user, media_image=name
+                )
+            )
+
+        output = StringIO()
+        call_command("dedupe_media", stdout=output)
+
+        names = {
+            post.media_image.name
+            for post in Post.objects.filter(text="legacy")
+        }
+        self.assertEqual(len(names), 1)
+        self.assertEqual(MediaBlob.objects.get().refcount, 2)
+        for post in legacy:
+            self.assertFalse(storage.exists(post.media_image.name))
+        self.assertIn("into 1 files", output.getvalue())
+
+    def test_dedupe_media_sweeps_rolled_back_blobs(self) -> None:
+        kept = self.create_post(image_bytes())
+        try:
+            with transaction.atomic():
+                rolled_back = self.create_post(image_bytes("blue"))
+                raise ValueError
+        except ValueError:
+            pass
+        storage = kept.media_image.storage
+        day_ago = time.time() - 24 * 60 * 60 - 1
+        for post in (kept, rolled_back):
+            os.utime(storage.path(post.media_image.name), (day_ago, day_ago))
+
+        output = StringIO()
+        call_command("dedupe_media", stdout=output)
+
+        self.assertTrue(storage.exists(kept.media_image.name))
+        self.assertFalse(storage.exists(rolled_back.media_image.name))
+        self.assertIn("Removed 1 orphaned blobs", output.getvalue())
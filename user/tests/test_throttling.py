@@ -0,0 +1,136 @@
+import os
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.models import User, Post
+from user.serializers import ClaimsTokenObtainPairSerializer
+from user.throttling import (
+    CounterStore,
+    ScopedCounterThrottle,
+    counter_store,
+)
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+POST_URL = reverse("user:post-list")
+
+
+def test_user(**params) -> User:
+    defaults = {
+        "username": "test_username",
+        "email": "test@test.com",
+        "password": "test1234",
+        "first_name": "test_first_name",
+        "last_name": "test_last_name",
+    }
+    defaults.update(**params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+@mock.patch.dict(
+    ScopedCounterThrottle.THROTTLE_RATES,
+    {"reactions": "2/min", "token": "1/min"},
+)
+class ScopedThrottleTests(TestCase):
+    def setUp(self) -> None:
+        counter_store.clear()
+        self.user = test_user()
+        self.client = APIClient()
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {token.access_token}"
+        )
+        self.posts = [
+            Post.objects.create(text="new post", user=self.user)
+            for _ in range(3)
+        ]
+
+    def test_reactions_share_a_scope(self) -> None:
+        for name, post in zip(("like", "dislike", "like"), self.posts):
+            response = self.client.post(
+                reverse(f"user:post-{name}", args=[post.id])
+            )
+
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertIn("Retry-After", response)
+        self.assertEqual(
+            self.client.get(POST_URL).status_code, status.HTTP_200_OK
+        )
+
+    def test_async_reactions_use_the_scope(self) -> None:
+        for name, post in zip(("like", "dislike", "like"), self.posts):
+            response = self.client.post(
+                reverse(f"user:async-post-{name}", args=[post.id])
+            )
+
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+
+    def test_token_has_its_own_scope(self) -> None:
+        credentials = {"username": "test_username", "password": "test1234"}
+        first = APIClient().post(TOKEN_URL, credentials)
+        second = APIClient().post(TOKEN_URL, credentials)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(THROTTLING={"ENABLED": False})
+    def test_disabled_lets_every_request_through(self) -> None:
+        credentials = {"username": "test_username", "password": "test1234"}
+        responses = [
+            APIClient().post(TOKEN_URL, credentials) for _ in range(3)
+        ]
+
+        self.assertEqual(
+            [response.status_code for response in responses],
+            [status.HTTP_200_OK] * 3,
+        )
+
+
+class CounterStoreTests(TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.mkdtemp()
+        self.settings = override_settings(
+            THROTTLING={"PATH": os.path.join(directory, "throttle.sqlite3")}
+        )
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+
+    def test_counts_are_shared_between_stores(self) -> None:
+        # Every worker process opens the same file.
+        first, second = CounterStore(), CounterStore()
+        expires = int(time.time()) + 60
+
+        self.assertEqual(first.hit("throttle_user_1", expires), 1)
+        self.assertEqual(second.hit("throttle_user_1", expires), 2)
+        self.assertEqual(first.hit("throttle_user_2", expires), 1)
+
+    def test_new_window_restarts_the_count(self) -> None:
+        store = CounterStore()
+        expires = int(time.time()) + 60
+        store.hit("throttle_user_1", expires)
+        store.hit("throttle_user_1", expires)
+
+        self.assertEqual(store.hit("throttle_user_1", expires + 60), 1)
+
+    def test_purge_deletes_ended_windows(self) -> None:
+        ended, current = int(time.time()) - 1, int(time.time()) + 60
+        counter_store.hit("throttle_user_1", ended)
+        counter_store.hit("throttle_user_2", current)
+
+        out = StringIO()
+        call_command("purge_throttle_counters", stdout=out)
+
+        self.assertIn("Purged 1 throttle counters", out.getvalue())
+        self.assertEqual(counter_store.hit("throttle_user_2", current), 2)
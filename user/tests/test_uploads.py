@@ -0,0 +1,178 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from user.models import User, Post, ImageUpload, POST_IMAGE_DIR
+
+MEDIA_ROOT = tempfile.mkdtemp()
+POST_URL = reverse("user:post-list")
+UPLOAD_URL = reverse("user:upload")
+
+
+def test_user(**params) -> User:
+    defaults = {
+        "username": "test_username",
+        "email": "test@test.com",
+        "password": "test1234",
+        "first_name": "test_first_name",
+        "last_name": "test_last_name",
+    }
+    defaults.update(**params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def image_bytes(width: int = 800, height: int = 600) -> bytes:
+    output = BytesIO()
+    Image.effect_noise((width, height), 64).save(output, format="PNG")
+
+    return output.getvalue()
+
+
+def incoming_files() -> list:
+    directory = os.path.join(MEDIA_ROOT, POST_IMAGE_DIR, ".incoming")
+    if not os.path.isdir(directory):
+        return []
+
+    return os.listdir(directory)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class StreamingUploadTests(TestCase):
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(test_user())
+
+    def create_post(self, content: bytes, name: str = "photo.png"):
+        return self.client.post(
+            POST_URL,
+            {
+                "text": "new post",
+                "media_image": SimpleUploadedFile(name, content),
+            },
+            format="multipart",
+        )
+
+    def test_image_is_moved_into_place(self) -> None:
+        response = self.create_post(image_bytes())
+
+        self.assertEqual(response.status_code, 201)
+        post = Post.objects.get(text="new post")
+        self.assertTrue(post.media_image.name.startswith("media/blobs/"))
+        self.assertTrue(post.media_image.storage.exists(post.media_image.name))
+        self.assertEqual(incoming_files(), [])
+
+    def test_invalid_header_is_rejected(self) -> None:
+        response = self.create_post(b"not an image" * 1000, "photo.jpg")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("media_image", response.data)
+        self.assertFalse(Post.objects.filter(text="new post").exists())
+        self.assertEqual(incoming_files(), [])
+
+    @override_settings(MEDIA_UPLOADS={"MAX_SIZE": 100_000})
+    def test_oversize_image_is_rejected(self) -> None:
+        response = self.create_post(image_bytes())
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("larger than", str(response.data["media_image"]))
+        self.assertEqual(incoming_files(), [])
+
+    @override_settings(MEDIA_UPLOADS={"MAX_PIXELS": 1000})
+    def test_too_many_pixels_is_rejected(self) -> None:
+        response = self.create_post(image_bytes())
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Post.objects.filter(text="new post").exists())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ChunkedUploadTests(TestCase):
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(test_user())
+
+    def start(self, content: bytes) -> str:
+        response = self.client.post(
+            UPLOAD_URL, {"filename": "photo.png", "size": len(content)}
+        )
+        self.assertEqual(response.status_code, 201)
+
+        return reverse("user:upload-chunk", args=[response.data["id"]])
+
+    def send(self, url: str, chunk: bytes, offset: int):
+        return self.client.patch(
+            url,
+            chunk,
+            content_type="application/octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def test_resumed_upload_is_attached_to_post(self) -> None:
+        content = image_bytes()
+        url = self.start(content)
+        middle = len(content) // 2
+
+        self.send(url, content[:middle], 0)
+        response = self.send(url, content[middle:], 0)
+        self.assertEqual(response.status_code, 409)
+
+        offset = self.client.get(url).data["offset"]
+        self.assertEqual(offset, middle)
+        response = self.send(url, content[offset:], offset)
+        self.assertEqual(response["Upload-Offset"], str(len(content)))
+
+        upload = ImageUpload.objects.get()
+        response = self.client.post(
+            POST_URL, {"text": "new post", "upload": str(upload.pk)}
+        )
+
+        self.assertEqual(response.status_code, 201)
+        post = Post.objects.get(text="new post")
+        with post.media_image.open("rb") as file:
+            self.assertEqual(file.read(), content)
+        self.assertFalse(ImageUpload.objects.exists())
+        self.assertEqual(incoming_files(), [])
+
+    def test_incomplete_upload_cannot_be_attached(self) -> None:
+        content = image_bytes()
+        url = self.start(content)
+        self.send(url, content[:1000], 0)
+
+        response = self.client.post(
+            POST_URL,
+            {"text": "new post", "upload": str(ImageUpload.objects.get().pk)},
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("upload", response.data)
+
+        self.client.delete(url)
+        self.assertEqual(incoming_files(), [])
+
+    def test_invalid_image_discards_upload(self) -> None:
+        content = b"not an image" * 100
+        url = self.start(content)
+
+        response = self.send(url, content, 0)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ImageUpload.objects.exists())
+        self.assertEqual(incoming_files(), [])
@@ -0,0 +1,146 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from user.cache import invalidate_post_fields
+from user.models import Post
+
+DEFAULTS = {
+    # Longest side in pixels, images are never upscaled.
+    "SIZES": {"small": 320, "medium": 1080},
+    "FORMATS": {
+        "webp": {"format": "WEBP", "quality": 80, "method": 4},
+        "jpeg": {
+            "format": "JPEG",
+            "quality": 82,
+            "optimize": True,
+            "progressive": True,
+        },
+    },
+}
+JOB_KIND = "post.thumbnails"
+
+
+def thumbnail_setting(name: str):
+    return getattr(settings, "THUMBNAILS", {}).get(name, DEFAULTS[name])
+
+
+def thumbnail_name(source: str, size: str, extension: str) -> str:
+    directory, filename = os.path.split(source)
+    stem, _ = os.path.splitext(filename)
+
+    return os.path.join(directory, "thumbnails", f"{stem}-{size}.{extension}")
+
+
+def has_alpha(image: Image.Image) -> bool:
+    return image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+
+
+def flatten(image: Image.Image) -> Image.Image:
+    """Paste a transparent image onto white"""
+    background = Image.new("RGB", image.size, "white")
+    background.paste(image, mask=image.getchannel("A"))
+
+    return background
+
+
+def render(image: Image.Image, options: dict) -> bytes:
+    """Encode ``image`` without any of the source's metadata.
+
+    EXIF, XMP and ICC data are only written by Pillow when passed to
+    ``save``, so the renditions carry pixels only. Formats without an
+    alpha channel get transparent images flattened onto white.
+    """
+    if image.mode == "RGBA" and options["format"] == "JPEG":
+        image = flatten(image)
+
+    output = BytesIO()
+    image.save(output, **options)
+
+    return output.getvalue()
+
+
+def thumbnail_names(source: str) -> dict:
+    return {
+        size: {
+            extension: thumbnail_name(source, size, extension)
+            for extension in thumbnail_setting("FORMATS")
+        }
+        for size in thumbnail_setting("SIZES")
+    }
+
+
+def delete_thumbnails(source: str) -> None:
+    """Remove the renditions of an image that is no longer stored"""
+    for files in thumbnail_names(source).values():
+        for name in files.values():
+            default_storage.delete(name)
+
+
+def generate_thumbnails(post_id: int) -> None:
+    """Job handler writing the resized renditions of a post's image.
+
+    Renditions are written next to the source with plain names, so posts
+    sharing a deduplicated image reuse the existing files.
+    """
+    post = Post.objects.filter(pk=post_id).only("media_image").first()
+    if post is None or not post.media_image:
+        return
+
+    source = post.media_image.name
+    thumbnails = {"source": source, **thumbnail_names(source)}
+    missing = [
+        (size, extension, name)
+        for size, files in thumbnail_names(source).items()
+        for extension, name in files.items()
+        if not default_storage.exists(name)
+    ]
+
+    if missing:
+        with post.media_image.open("rb") as file:
+            image = ImageOps.exif_transpose(Image.open(file))
+            image = image.convert("RGBA" if has_alpha(image) else "RGB")
+
+    resized = {}
+    for size, extension, name in missing:
+        if size not in resized:
+            width = thumbnail_setting("SIZES")[size]
+            resized[size] = image.copy()
+            resized[size].thumbnail((width, width), Image.Resampling.LANCZOS)
+
+        options = thumbnail_setting("FORMATS")[extension]
+        default_storage.save(name, ContentFile(render(resized[size], options)))
+
+    # The image may have been replaced while this job ran.
+    if Post.objects.filter(pk=post_id, media_image=source).update(
+        thumbnails=thumbnails
+    ):
+        invalidate_post_fields(post_id)
+
+
+def thumbnail_urls(post, request=None) -> dict:
+    """URLs of the post's renditions, empty until they are generated"""
+    thumbnails = post.thumbnails or {}
+    if (
+        not post.media_image
+        or thumbnails.get("source") != post.media_image.name
+    ):
+        return {}
+
+    storage = post.media_image.storage
+    urls = {}
+    for size, files in thumbnails.items():
+        if size == "source":
+            continue
+        urls[size] = {}
+        for extension, name in files.items():
+            url = storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls[size][extension] = url
+
+    return urls
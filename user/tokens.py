@@ -0,0 +1,20 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from user.blacklist import token_blacklist
+
+
+class CachedBlacklistRefreshToken(RefreshToken):
+    """Refresh token checked against the in-process blacklist"""
+
+    def check_blacklist(self) -> None:
+        if self.payload[api_settings.JTI_CLAIM] in token_blacklist:
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        blacklisted = super().blacklist()
+        token_blacklist.add(self.payload[api_settings.JTI_CLAIM])
+
+        return blacklisted
@@ -0,0 +1,262 @@
+import hashlib
+import os
+import uuid
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import (
+    FileUploadHandler,
+    StopFutureHandlers,
+)
+from PIL import Image, UnidentifiedImageError
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from user.models import POST_IMAGE_DIR
+
+DEFAULTS = {
+    "MAX_SIZE": 10 * 1024 * 1024,
+    "MAX_PIXELS": 40_000_000,
+    "FORMATS": ("JPEG", "PNG", "GIF", "WEBP"),
+    # Bytes of the file kept in memory until its header is recognised.
+    "HEADER_SIZE": 256 * 1024,
+    # Bytes read from the request at once by the chunked upload endpoint.
+    "BUFFER_SIZE": 64 * 1024,
+    # Seconds after which unfinished chunked uploads are purged.
+    "EXPIRY": 24 * 60 * 60,
+}
+FIELD_NAME = "media_image"
+
+
+def upload_setting(name: str):
+    return getattr(settings, "MEDIA_UPLOADS", {}).get(name, DEFAULTS[name])
+
+
+def incoming_path(name: str) -> str:
+    """Partial files live next to the final images, so saving is a rename"""
+    directory = os.path.join(settings.MEDIA_ROOT, POST_IMAGE_DIR, ".incoming")
+    os.makedirs(directory, exist_ok=True)
+
+    return os.path.join(directory, name)
+
+
+class OffsetConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Chunk does not start at the upload's offset."
+    default_code = "conflict"
+
+
+def upload_error(message: str) -> ValidationError:
+    return ValidationError({FIELD_NAME: [message]})
+
+
+def check_size(size: int) -> None:
+    if size > upload_setting("MAX_SIZE"):
+        raise upload_error(
+            f"Image is larger than {upload_setting('MAX_SIZE')} bytes."
+        )
+
+
+class ImageHeaderValidator:
+    """Recognise the image format from the first bytes of a file.
+
+    Data is buffered until Pillow can read the header (``Image.open`` does
+    not decode pixels), at most ``HEADER_SIZE`` bytes.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = BytesIO()
+        self.format = None
+
+    def feed(self, data: bytes, final: bool = False) -> None:
+        if self.format is not None:
+            return
+
+        header_size = upload_setting("HEADER_SIZE")
+        self.buffer.write(data[: header_size - self.buffer.tell()])
+        try:
+            self.inspect()
+        except Image.DecompressionBombError:
+            raise upload_error("Image has too many pixels.")
+        except (UnidentifiedImageError, OSError, SyntaxError):
+            if final or self.buffer.tell() >= header_size:
+                raise upload_error("Upload a valid image.")
+
+    def close(self) -> None:
+        self.feed(b"", final=True)
+
+    def inspect(self) -> None:
+        self.buffer.seek(0)
+        with Image.open(self.buffer) as image:
+            image_format, (width, height) = image.format, image.size
+        self.buffer.seek(0, os.SEEK_END)
+
+        if image_format not in upload_setting("FORMATS"):
+            raise upload_error(f"{image_format} images are not supported.")
+        if width * height > upload_setting("MAX_PIXELS"):
+            raise upload_error("Image has too many pixels.")
+
+        self.format = image_format
+        self.buffer = BytesIO()
+
+
+class StreamedUploadedFile(UploadedFile):
+    """A fully received upload, stored at ``temporary_file_path``.
+
+    ``FileSystemStorage`` moves such files into place instead of copying
+    them. The file is removed on close unless it has been moved.
+    ``sha256`` is the digest computed while the file was received.
+    """
+
+    def __init__(
+        self, path, name, content_type, size, charset=None, sha256=None
+    ) -> None:
+        super().__init__(open(path, "rb"), name, content_type, size, charset)
+        self.path = path
+        self.sha256 = sha256
+
+    def temporary_file_path(self) -> str:
+        return self.path
+
+    def close(self) -> None:
+        super().close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class StreamingImageUploadHandler(FileUploadHandler):
+    """Validate post images while they are received.
+
+    The header and the size limit are checked chunk by chunk, so an
+    invalid or oversize file aborts the request before the rest is read.
+    Other file fields are passed on to the next handlers.
+    """
+
+    def new_file(self, field_name, *args, **kwargs) -> None:
+        super().new_file(field_name, *args, **kwargs)
+        self.active = field_name == FIELD_NAME
+        if not self.active:
+            return
+
+        if self.content_length is not None:
+            check_size(self.content_length)
+        self.path = incoming_path(f"{uuid.uuid4()}.part")
+        self.file = open(self.path, "wb")
+        self.size = 0
+        self.digest = hashlib.sha256()
+        self.validator = ImageHeaderValidator()
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+
+        self.size += len(raw_data)
+        try:
+            check_size(self.size)
+            self.validator.feed(raw_data)
+        except ValidationError:
+            self.discard()
+            raise
+        self.file.write(raw_data)
+        self.digest.update(raw_data)
+
+    def file_complete(self, file_size):
+        if not self.active:
+            return None
+
+        try:
+            self.validator.close()
+        except ValidationError:
+            self.discard()
+            raise
+        self.file.close()
+        self.active = False
+
+        return StreamedUploadedFile(
+            self.path,
+            self.file_name,
+            self.content_type,
+            self.size,
+            self.charset,
+            self.digest.hexdigest(),
+        )
+
+    def upload_interrupted(self) -> None:
+        if getattr(self, "active", False):
+            self.discard()
+
+    def discard(self) -> None:
+        self.active = False
+        self.file.close()
+        os.remove(self.path)
+
+
+class StreamingUploadMixin:
+    """Parse multipart requests of the view with the streaming handler"""
+
+    def initial(self, request, *args, **kwargs) -> None:
+        request.upload_handlers.insert(
+            0, StreamingImageUploadHandler(request._request)
+        )
+        super().initial(request, *args, **kwargs)
+
+
+def part_path(upload) -> str:
+    return incoming_path(f"{upload.pk}.part")
+
+
+def append_chunk(upload, stream, offset: int, length: int) -> None:
+    """Append ``length`` bytes of ``stream`` to a chunked upload.
+
+    The request body is copied through a ``BUFFER_SIZE`` buffer, the image
+    header is checked once the first bytes are stored.
+    """
+    if offset != upload.offset:
+        raise OffsetConflict(f"Expected offset {upload.offset}.")
+    if offset + length > upload.size:
+        raise ValidationError({"offset": ["Chunk exceeds the upload size."]})
+
+    buffer_size = upload_setting("BUFFER_SIZE")
+    received = 0
+    with open(part_path(upload), "ab") as file:
+        file.truncate(offset)
+        while received < length:
+            data = stream.read(min(buffer_size, length - received))
+            if not data:
+                break
+            file.write(data)
+            received += len(data)
+
+    upload.offset = offset + received
+    header_size = upload_setting("HEADER_SIZE")
+    if offset < header_size and (
+        upload.offset >= header_size or upload.is_complete
+    ):
+        validator = ImageHeaderValidator()
+        with open(part_path(upload), "rb") as file:
+            header = file.read(header_size)
+        try:
+            validator.feed(header, final=True)
+        except ValidationError:
+            discard_upload(upload)
+            raise
+    upload.save(update_fields=["offset"])
+
+
+def uploaded_file(upload) -> StreamedUploadedFile:
+    """The finished upload as a file to assign to ``Post.media_image``"""
+    return StreamedUploadedFile(
+        part_path(upload), upload.filename, None, upload.size
+    )
+
+
+def discard_upload(upload) -> None:
+    try:
+        os.remove(part_path(upload))
+    except FileNotFoundError:
+        pass
+    upload.delete()
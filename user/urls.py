@@ -1,19 +1,22 @@
 from django.urls import path, include
 from rest_framework import routers
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from rest_framework_simplejwt.views import TokenRefreshView
 
+from user import async_views
 from user.views import (
     CreateUserView,
     ManageUserView,
     LogoutView,
+    TokenObtainView,
     UserViewSet,
     PostViewSet,
     LikeList,
+    FeedView,
     UserActivity,
     LikeAnalytics,
+    ExportView,
+    ImageUploadView,
+    ImageUploadChunkView,
 )
 
 router = routers.DefaultRouter()
@@ -23,14 +26,44 @@ router.register("posts", PostViewSet)
 
 urlpatterns = [
     path("register/", CreateUserView.as_view(), name="create"),
-    path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path("token/", TokenObtainView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("logout/", LogoutView.as_view(), name="logout"),
     path("profile/", ManageUserView.as_view(), name="manage"),
     path("", include(router.urls)),
+    path("uploads/", ImageUploadView.as_view(), name="upload"),
+    path(
+        "uploads/<uuid:pk>/",
+        ImageUploadChunkView.as_view(),
+        name="upload-chunk",
+    ),
+    path("feed/", FeedView.as_view(), name="feed"),
     path("likes/", LikeList.as_view(), name="like"),
     path("analytics/", LikeAnalytics.as_view(), name="analytics"),
     path("activity/", UserActivity.as_view(), name="activity"),
+    path("export/<str:kind>/", ExportView.as_view(), name="export"),
+    path("async/posts/", async_views.post_list, name="async-post-list"),
+    path(
+        "async/posts/<int:pk>/",
+        async_views.post_detail,
+        name="async-post-detail",
+    ),
+    path(
+        "async/posts/<int:pk>/like/",
+        async_views.post_like,
+        name="async-post-like",
+    ),
+    path(
+        "async/posts/<int:pk>/dislike/",
+        async_views.post_dislike,
+        name="async-post-dislike",
+    ),
+    path(
+        "async/analytics/",
+        async_views.like_analytics,
+        name="async-analytics",
+    ),
+    path("async/activity/", async_views.user_activity, name="async-activity"),
 ]
 
 app_name = "user"
@@ -1,10 +1,13 @@
-from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIRequest
 from django.db.models import QuerySet
+from django.http import Http404, StreamingHttpResponse
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import generics, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import (
     IsAuthenticated,
     IsAdminUser,
@@ -13,10 +16,45 @@ from rest_framework.permissions import (
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
-
-from user.models import Post, Like, Dislike
-from user.pagination import UserPagination
+from rest_framework_simplejwt.views import TokenObtainPairView
+
+from user.activity import activity_tracker
+from user.analytics import (
+    GROUPS,
+    INTERVALS,
+    METRICS,
+    analytics_setting,
+    bucketed_series,
+    default_range,
+)
+from user.authentication import (
+    StatelessReadMixin,
+    model_user,
+    user_values,
+)
+from user.cache import CachedResponseMixin, author_tag
+from user.exports import (
+    CONTENT_TYPES,
+    EXPORTS,
+    abatched,
+    batched,
+    export_rows,
+    export_setting,
+    render_rows,
+)
+from user.feed import FeedPagination, follow_author, unfollow_author
+from user.models import Post, Like, Dislike, ImageUpload, FeedEntry
+from user.pagination import PaginationModeMixin, UserPagination
+from user.params import parse_choice, parse_date_range, parse_id
+from user.reactions import (
+    REACTION_MODELS,
+    add_reaction,
+    apply_reactions,
+    remove_reaction,
+)
+from user.search import get_search_backend
+from user.tokens import CachedBlacklistRefreshToken
+from user.uploads import StreamingUploadMixin, append_chunk, discard_upload
 from user.permissions import ReadOnly, IsCreatorOrReadOnly, IsCreatorOrIsAdmin
 from user.serializers import (
     UserSerializer,
@@ -28,6 +66,8 @@ from user.serializers import (
     LikeListSerializer,
     LikeSerializer,
     DislikeSerializer,
+    ImageUploadSerializer,
+    BulkReactionSerializer,
 )
 
 
@@ -40,7 +80,11 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
-        return self.request.user
+        return model_user(self.request.user)
+
+
+class TokenObtainView(TokenObtainPairView):
+    throttle_scope = "token"
 
 
 class LogoutView(APIView):
@@ -49,7 +93,7 @@ class LogoutView(APIView):
     def post(self, request) -> Response:
         try:
             refresh_token = request.data["refresh_token"]
-            token = RefreshToken(refresh_token)
+            token = CachedBlacklistRefreshToken(refresh_token)
             token.blacklist()
 
             return Response(status=status.HTTP_205_RESET_CONTENT)
@@ -57,7 +101,52 @@ class LogoutView(APIView):
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class ImageUploadView(generics.CreateAPIView):
+    """Start a resumable upload of a post image"""
+
+    serializer_class = ImageUploadSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def perform_create(self, serializer):
+        serializer.save(user_id=self.request.user.pk)
+
+
+class ImageUploadChunkView(generics.RetrieveDestroyAPIView):
+    """Send the image in chunks with PATCH.
+
+    Each chunk is the raw request body, starting at the ``Upload-Offset``
+    header. GET returns the offset to resume from, a finished upload is
+    attached to a post by passing its id as ``upload``.
+    """
+
+    serializer_class = ImageUploadSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self) -> QuerySet:
+        return ImageUpload.objects.filter(user_id=self.request.user.pk)
+
+    def perform_destroy(self, instance) -> None:
+        discard_upload(instance)
+
+    def patch(self, request, *args, **kwargs) -> Response:
+        upload = self.get_object()
+        try:
+            offset = int(request.headers["Upload-Offset"])
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except (KeyError, ValueError):
+            raise ValidationError(
+                {"Upload-Offset": ["Send the offset of the chunk."]}
+            )
+
+        append_chunk(upload, request.stream, offset, length)
+
+        return Response(
+            self.get_serializer(upload).data,
+            headers={"Upload-Offset": str(upload.offset)},
+        )
+
+
+class UserViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = get_user_model().objects.all()
     serializer_class = UserSerializer
     permission_classes = (ReadOnly,)
@@ -80,19 +169,20 @@ class UserViewSet(viewsets.ModelViewSet):
     def get_queryset(self) -> QuerySet:
         queryset = super().get_queryset()
 
-        username = self.request.query_params.get("username")
-        if username:
-            queryset = queryset.filter(username__icontains=username)
+        filters = {
+            field: self.request.query_params[field]
+            for field in ("username", "first_name", "last_name")
+            if self.request.query_params.get(field)
+        }
+        query = self.request.query_params.get("q", "")
 
-        first_name = self.request.query_params.get("first_name")
-        if first_name:
-            queryset = queryset.filter(first_name__icontains=first_name)
+        return get_search_backend().search(queryset, query, filters)
 
-        last_name = self.request.query_params.get("last_name")
-        if last_name:
-            queryset = queryset.filter(last_name__icontains=last_name)
+    def get_cache_tags(self) -> list:
+        if self.action == "retrieve":
+            return [f"user:{self.kwargs['pk']}"]
 
-        return queryset.distinct()
+        return ["users"]
 
     @extend_schema(
         parameters=[
@@ -111,17 +201,56 @@ class UserViewSet(viewsets.ModelViewSet):
                 description="Filter by last_name (ex. ?last_name=Pitt)",
                 type=str,
             ),
+            OpenApiParameter(
+                name="q",
+                description="Search username, names and bio (ex. ?q=brad)",
+                type=str,
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @action(
+        methods=["POST", "DELETE"],
+        detail=True,
+        url_path="follow",
+        permission_classes=(IsAuthenticated,),
+    )
+    def follow(self, request, pk=None) -> Response:
+        """Endpoint for following (POST) or unfollowing (DELETE) a user"""
+        try:
+            author_id = int(pk)
+        except (TypeError, ValueError):
+            raise NotFound
+
+        if request.method == "DELETE":
+            unfollow_author(request.user.pk, author_id)
+            return Response(status=status.HTTP_204_NO_CONTENT)
 
-class PostViewSet(viewsets.ModelViewSet):
+        if author_id == request.user.pk:
+            raise ValidationError("You cannot follow yourself.")
+        try:
+            follow_author(request.user.pk, author_id)
+        except get_user_model().DoesNotExist:
+            raise NotFound
+
+        return Response(status=status.HTTP_200_OK)
+
+
+class PostViewSet(
+    StatelessReadMixin,
+    PaginationModeMixin,
+    CachedResponseMixin,
+    StreamingUploadMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,)
     pagination_class = UserPagination
+    # Set on the reaction actions.
+    throttle_scope = None
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -132,11 +261,14 @@ class PostViewSet(viewsets.ModelViewSet):
             return LikeSerializer
         if self.action == "dislike":
             return DislikeSerializer
+        if self.action == "bulk_reactions":
+            return BulkReactionSerializer
 
         return PostListSerializer
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        # The author row is reused by the search and cache signals.
+        serializer.save(user=model_user(self.request.user))
 
     def get_permissions(self):
         if self.action in ("update", "partial_update"):
@@ -149,15 +281,43 @@ class PostViewSet(viewsets.ModelViewSet):
     def get_queryset(self) -> QuerySet:
         queryset = self.queryset
 
+        filters = {}
         username = self.request.query_params.get("username")
         if username:
-            queryset = queryset.filter(user__username__icontains=username)
+            filters["username"] = username
+        query = self.request.query_params.get("q", "")
+
+        queryset = get_search_backend().search(queryset, query, filters)
 
         if self.action in ("list", "retrieve"):
-            queryset = queryset.prefetch_related("user")
+            queryset = queryset.select_related("user")
 
         return queryset
 
+    def get_cache_tags(self) -> list:
+        """Tags of the cached response.
+
+        Author lists are tagged with the exact username, lists filtered by
+        a partial username only pick up new posts when they expire.
+        """
+        if self.action == "retrieve":
+            return [f"post:{self.kwargs['pk']}"]
+
+        params = self.request.query_params
+        tags = []
+        if params.get("username"):
+            tags.extend([author_tag(params["username"]), "posts:authors"])
+        if params.get("q"):
+            tags.append("posts:search")
+        if tags:
+            return tags
+
+        tags.append("posts:feed")
+        if params.get("page", "1") == "1" and "cursor" not in params:
+            tags.append("posts:feed:first")
+
+        return tags
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -165,43 +325,94 @@ class PostViewSet(viewsets.ModelViewSet):
                 description="Filter by username (ex. ?username=user1)",
                 type=str,
             ),
+            OpenApiParameter(
+                name="q",
+                description="Search post text and author (ex. ?q=holiday)",
+                type=str,
+            ),
+            OpenApiParameter(
+                name="pagination",
+                description="Use keyset pagination (ex. ?pagination=cursor)",
+                type=str,
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    def _react(self, model, pk) -> Response:
+        try:
+            post_id = int(pk)
+        except (TypeError, ValueError):
+            raise NotFound
+
+        if self.request.method == "DELETE":
+            remove_reaction(model, post_id, self.request.user.pk)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        try:
+            add_reaction(model, post_id, self.request.user.pk)
+        except Post.DoesNotExist:
+            raise NotFound
+
+        return Response(status=status.HTTP_200_OK)
+
     @action(
-        methods=["POST"],
+        methods=["POST", "DELETE"],
         detail=True,
         url_path="like",
         permission_classes=(IsAuthenticated,),
+        throttle_scope="reactions",
     )
     def like(self, request, pk=None) -> Response:
-        """Endpoint for liking specific post"""
-        post = self.get_object()
-        user = self.request.user
-
-        Like.objects.create(post=post, user=user, created_at=datetime.now())
-
-        return Response(status=status.HTTP_200_OK)
+        """Endpoint for liking (POST) or unliking (DELETE) specific post"""
+        return self._react(Like, pk)
 
     @action(
-        methods=["POST"],
+        methods=["POST", "DELETE"],
         detail=True,
         url_path="dislike",
         permission_classes=(IsAuthenticated,),
+        throttle_scope="reactions",
     )
     def dislike(self, request, pk=None) -> Response:
-        """Endpoint for liking specific post"""
-        post = self.get_object()
-        user = self.request.user
-
-        Dislike.objects.create(post=post, user=user, created_at=datetime.now())
+        """Endpoint for disliking (POST) or undoing a dislike (DELETE)"""
+        return self._react(Dislike, pk)
 
-        return Response(status=status.HTTP_200_OK)
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="reactions/bulk",
+        permission_classes=(IsAuthenticated,),
+        throttle_scope="reactions",
+    )
+    def bulk_reactions(self, request) -> Response:
+        """Endpoint for setting many reactions at once.
+
+        Takes ``{"reactions": [{"post_id": 1, "reaction": "like"}]}`` where
+        the reaction is "like", "dislike" or "none", and returns the
+        outcome of every item.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        reactions = {
+            item["post_id"]: REACTION_MODELS[item["reaction"]]
+            for item in serializer.validated_data["reactions"]
+        }
+        results = apply_reactions(request.user.pk, reactions)
+
+        return Response(
+            {
+                "results": [
+                    {"post_id": post_id, "status": outcome}
+                    for post_id, outcome in results.items()
+                ]
+            }
+        )
 
 
-class LikeList(generics.ListAPIView):
+class LikeList(PaginationModeMixin, generics.ListAPIView):
     queryset = Like.objects.all()
     serializer_class = LikeListSerializer
     permission_classes = (IsAuthenticated,)
@@ -213,42 +424,199 @@ class LikeList(generics.ListAPIView):
         return queryset
 
 
+class FeedView(StatelessReadMixin, generics.ListAPIView):
+    """Posts of the followed authors, newest first"""
+
+    serializer_class = PostListSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = FeedPagination
+
+    def get_queryset(self) -> QuerySet:
+        return FeedEntry.objects.filter(user_id=self.request.user.pk)
+
+
 class LikeAnalytics(APIView):
+    """Likes, dislikes, posts and new users per hour, day, week or month"""
+
     permission_classes = (IsAuthenticated,)
 
+    @staticmethod
+    def parse_params(params) -> dict:
+        """Validated keyword arguments of bucketed_series()"""
+        metrics = params.get("metrics", "likes").split(",")
+        if not set(metrics) <= set(METRICS):
+            raise ValidationError(
+                {"metrics": f"Use some of {', '.join(METRICS)}."}
+            )
+
+        filters = {
+            name: parse_id(params, name) for name in GROUPS if params.get(name)
+        }
+        group_by = parse_choice(params, "group_by", GROUPS)
+        for name in [*filters, *([group_by] if group_by else [])]:
+            unsupported = [
+                metric
+                for metric in metrics
+                if name not in METRICS[metric].dimensions
+            ]
+            if unsupported:
+                raise ValidationError(
+                    {name: f"{', '.join(unsupported)} have no {name}."}
+                )
+
+        try:
+            tzinfo = ZoneInfo(params["tz"]) if params.get("tz") else None
+        except (ValueError, ZoneInfoNotFoundError):
+            raise ValidationError({"tz": "Unknown time zone."})
+
+        date_from, date_to = default_range(*parse_date_range(params))
+        if date_from > date_to:
+            raise ValidationError({"date_to": "Must not be before date_from."})
+        max_days = analytics_setting("MAX_DAYS")
+        if (date_to - date_from).days >= max_days:
+            raise ValidationError(
+                {"date_from": f"Ranges cover at most {max_days} days."}
+            )
+
+        return {
+            "metrics": metrics,
+            "interval": parse_choice(params, "interval", INTERVALS, "day"),
+            "tzinfo": tzinfo,
+            "date_from": date_from,
+            "date_to": date_to,
+            "filters": filters,
+            "group_by": group_by,
+        }
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="metrics",
+                description=(
+                    "Comma separated likes, dislikes, posts, users "
+                    "(ex. ?metrics=likes,dislikes)"
+                ),
+                type=str,
+            ),
+            OpenApiParameter(
+                name="interval",
+                description="hour, day (default), week or month",
+                type=str,
+            ),
+            OpenApiParameter(
+                name="date_from",
+                description="First day, inclusive (ex. ?date_from=2023-09-01)",
+                type=str,
+            ),
+            OpenApiParameter(
+                name="date_to",
+                description="Last day, inclusive (ex. ?date_to=2023-09-30)",
+                type=str,
+            ),
+            OpenApiParameter(
+                name="tz",
+                description="Time zone of the buckets (ex. ?tz=UTC)",
+                type=str,
+            ),
+            OpenApiParameter(
+                name="group_by",
+                description="Split the buckets per post or author",
+                type=str,
+            ),
+            OpenApiParameter(
+                name="post",
+                description="Only count rows of a post (ex. ?post=1)",
+                type=int,
+            ),
+            OpenApiParameter(
+                name="author",
+                description="Only count rows of an author's posts (ex. ?author=1)",
+                type=int,
+            ),
+        ]
+    )
     def get(self, request: Request) -> Response:
-        queryset = Like.objects.all()
-
-        from_str = ""
-        date_from = self.request.query_params.get("date_from")
-        if date_from:
-            from_str = f" from {date_from}"
-            date_from = datetime.strptime(date_from, "%Y-%m-%d").date()
-            queryset = queryset.filter(created_at__gt=date_from)
-
-        to_str = ""
-        date_to = self.request.query_params.get("date_to")
-        if date_to:
-            to_str = f" to {date_to}"
-            date_to = datetime.strptime(
-                date_to, "%Y-%m-%d"
-            ).date() + timedelta(days=1)
-            queryset = queryset.filter(created_at__lte=date_to)
-
-        response_message = (
-            f"Number of likes in period{from_str}{to_str}: {queryset.count()}"
+        series = bucketed_series(**self.parse_params(request.query_params))
+
+        return Response(series, status=status.HTTP_200_OK)
+
+
+class ExportView(APIView):
+    """Stream every like, dislike, post or daily like total.
+
+    Replaces paging through the lists for reports, rows are read in
+    chunks while the response is sent.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    throttle_scope = "export"
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="output",
+                description="csv (default) or ndjson (ex. ?output=ndjson)",
+                type=str,
+            ),
+            OpenApiParameter(
+                name="date_from",
+                description="First day, inclusive (ex. ?date_from=2023-09-01)",
+                type=str,
+            ),
+            OpenApiParameter(
+                name="date_to",
+                description="Last day, inclusive (ex. ?date_to=2023-09-30)",
+                type=str,
+            ),
+            OpenApiParameter(
+                name="since_id",
+                description="Only rows after this id (ex. ?since_id=1000)",
+                type=int,
+            ),
+        ]
+    )
+    def get(self, request: Request, kind: str) -> StreamingHttpResponse:
+        if kind not in EXPORTS:
+            raise Http404
+
+        params = request.query_params
+        output = params.get("output", "csv")
+        if output not in CONTENT_TYPES:
+            raise ValidationError({"output": "Use csv or ndjson."})
+
+        date_from, date_to = parse_date_range(params)
+        fields, rows = export_rows(
+            kind,
+            date_from=date_from,
+            date_to=date_to,
+            since_id=parse_id(params, "since_id"),
         )
+        lines = render_rows(output, fields, rows)
+        size = export_setting("CHUNK_SIZE")
+        if isinstance(request._request, ASGIRequest):
+            content = abatched(lines, size)
+        else:
+            content = batched(lines, size)
+
+        response = StreamingHttpResponse(
+            content, content_type=CONTENT_TYPES[output]
+        )
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="{kind}.{output}"'
 
-        return Response(response_message, status=status.HTTP_200_OK)
+        return response
 
 
-class UserActivity(APIView):
+class UserActivity(StatelessReadMixin, APIView):
     permission_classes = (IsAuthenticated,)
 
     def get(self, request: Request) -> Response:
         user = self.request.user
-        last_login = user.last_login
-        last_activity = user.last_activity
+        last_login, last_activity = user_values(
+            user, "last_login", "last_activity"
+        )
+        last_activity = activity_tracker.last_seen(user.pk) or last_activity
 
         response_dict = {
             f"{user.username}'s last login": last_login,